@@ -1,4 +1,31 @@
 from .types import TargetType, Action
-from .core_ai import ShootingGameEnv
 
-__all__ = ["TargetType", "Action", "ShootingGameEnv"]
+__all__ = [
+    "TargetType",
+    "Action",
+    "ShootingGameEnv",
+    "VecShootingGameEnv",
+    "FrameSkip",
+    "Recorder",
+    "Recording",
+]
+
+# environments are imported on first access so that ``import game.settings``
+# (e.g. in worker processes) does not pay for numpy
+_LAZY = {
+    "ShootingGameEnv": ".core_ai",
+    "VecShootingGameEnv": ".vec_env",
+    "FrameSkip": ".wrappers",
+    "Recorder": ".recording",
+    "Recording": ".recording",
+}
+
+
+def __getattr__(name):
+    if name in _LAZY:
+        from importlib import import_module
+
+        value = getattr(import_module(_LAZY[name], __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,4 +1,6 @@
 from game.entities import *
+from game.graphics.renderer import Renderer
+from game.utils.broadphase import collision_pairs, first_overlap, remove_all, settle
 from .settings import *
 from .types import *
 import pygame as pg
@@ -14,11 +16,14 @@ class Game:
         self.clock = pg.time.Clock()
         self.running = True
         self.font = pg.font.SysFont("Comic Sans", 30)
+        self.renderer = Renderer(self.screen, self.font)
 
         # Game entities
         self.player = Player(WIDTH // 2 - 25, HEIGHT - 50)
+        # bullets in firing order, targets sorted by y (lowest first)
         self.bullets = []
         self.targets = []
+        self.next_seq = 0
 
         # Game state
         self.score = 0
@@ -34,7 +39,8 @@ class Game:
             self.player.move_right()
         if keys[pg.K_SPACE]:
             if self.player.shoot():
-                bullet = Bullet(self.player.rect.centerx - 2, self.player.rect.top)
+                bullet = Bullet(self.player.centerx - 2, self.player.top, self.next_seq)
+                self.next_seq += 1
                 self.bullets.append(bullet)
 
     def spawn_targets(self):
@@ -42,47 +48,50 @@ class Game:
         self.target_spawn_timer += 1
         if self.target_spawn_timer >= self.target_spawn_delay:
             self.target_spawn_timer = 0
-            x = random.randint(0, WIDTH - 30)
+            x = random.randint(0, WIDTH - TARGET_SIZE)
             target_type = (
                 TargetType.OPPONENT
                 if random.random() > SPAWN_CHANCE_ALLY
                 else TargetType.ALLY
             )
-            target = Target(x, -30, target_type)
+            target = Target(x, -TARGET_SIZE, random, target_type, self.next_seq)
+            self.next_seq += 1
             self.targets.append(target)
 
     def update_entities(self):
         """Update all game entities"""
         self.player.update()
 
-        # Update bullets
-        for bullet in self.bullets[:]:
+        # Update bullets, the oldest ones leave the screen first
+        for bullet in self.bullets:
             bullet.update()
-            if bullet.is_off_screen():
-                self.bullets.remove(bullet)
+        gone = 0
+        while gone < len(self.bullets) and self.bullets[gone].is_off_screen():
+            gone += 1
+        del self.bullets[:gone]
 
-        # Update targets
-        for target in self.targets[:]:
+        # Update targets, the lowest ones fall off first
+        for target in self.targets:
             target.update()
-            if target.is_off_screen():
-                self.score += target.no_collision_reward
-                self.targets.remove(target)
+        settle(self.targets)
+        gone = 0
+        while gone < len(self.targets) and self.targets[gone].is_off_screen():
+            self.score += self.targets[gone].no_collision_reward
+            gone += 1
+        del self.targets[:gone]
 
     def check_collisions(self):
         """Check for collisions"""
-        for bullet in self.bullets[:]:
-            for target in self.targets[:]:
-                if bullet.rect.colliderect(target.rect):
-                    self.score += target.reward_value
-                    self.bullets.remove(bullet)
-                    self.targets.remove(target)
-                    break
-
-        for target in self.targets[:]:
-            if target.rect.colliderect(self.player.rect):
-                self.score += target.collision_reward
-                self.targets.remove(target)
-                break
+        pairs = collision_pairs(self.bullets, self.targets, TARGET_SIZE)
+        for _, target in pairs:
+            self.score += target.reward_value
+        remove_all(self.bullets, [self.bullets[i] for i, _ in pairs])
+        remove_all(self.targets, [target for _, target in pairs])
+
+        target = first_overlap(self.player, self.targets, TARGET_SIZE)
+        if target is not None:
+            self.score += target.collision_reward
+            self.targets.remove(target)
 
     def run(self) -> None:
         while self.running:
@@ -100,21 +109,9 @@ class Game:
             self.check_collisions()
 
             # Rendering
-            self.draw_everything()
-            pg.display.flip()
+            pg.display.update(self.draw_everything())
             self.clock.tick(FPS)
 
-    def draw_everything(self) -> None:
-        """Draw all game objects"""
-        self.screen.fill(BLACK)
-
-        # Draw entities
-        self.player.draw(self.screen)
-        for bullet in self.bullets:
-            bullet.draw(self.screen)
-        for target in self.targets:
-            target.draw(self.screen)
-
-        # Draw UI
-        score_text = self.font.render(f"Score: {self.score}", True, WHITE)
-        self.screen.blit(score_text, (10, 10))
+    def draw_everything(self) -> list:
+        """Draw all game objects, returns the changed areas of the screen"""
+        return self.renderer.draw(self.player, self.bullets, self.targets, self.score)
@@ -1,25 +1,86 @@
 from game.entities import *
+from game.entities.box import pg_round
+from game.utils.broadphase import collision_pairs, first_overlap, remove_all
+from game.utils.profiling import StepProfiler
 from .settings import *
 from .types import *
-import pygame as pg
 import random
+import time
 import numpy as np
 
+ALLY = TargetType.ALLY
+LEFT = Action.LEFT.value
+RIGHT = Action.RIGHT.value
+SHOOT = Action.SHOOT.value
+TARGET_HALF = TARGET_SIZE // 2
+
+# StepProfiler phase -> the method that runs it
+_PHASE_METHODS = {
+    "handle_action": "_handle_action",
+    "spawn_targets": "_spawn_targets",
+    "update_entities": "_update_entities",
+    "check_collisions": "_check_collisions",
+    "observe": "_observe",
+    "reward": "_reward",
+    "render": "_render_tick",
+}
+
+
+def _timed(method, phase, profiler):
+    clock = time.perf_counter
+
+    def timed(*args):
+        start = clock()
+        result = method(*args)
+        profiler.add(phase, clock() - start)
+        return result
+
+    return timed
+
+
+def _positioning_reward(current_x_diff, prev_x_diff):
+    # reward for moving towards allies
+    if current_x_diff < prev_x_diff:
+        return 0.2
+    elif current_x_diff > prev_x_diff:
+        return -0.1
+    # Bonus for being close to the ally
+    elif current_x_diff < 30:
+        return 0.5
+    return 0.0
+
 
 class ShootingGameEnv:
 
     def __init__(
         self, seed=1, max_steps=-1, render_mode=False, true_seed=False, endless=False
     ):
-        pg.init() if render_mode else None
-        self.screen = pg.display.set_mode((WIDTH, HEIGHT)) if render_mode else None
-        self.clock = pg.time.Clock() if render_mode else None
-        self.font = pg.font.SysFont("Ubuntu", 30) if render_mode else None
+        if render_mode:
+            import pygame as pg
+
+            pg.init()
+            self.screen = pg.display.set_mode((WIDTH, HEIGHT))
+            self.clock = pg.time.Clock()
+            self.font = pg.font.SysFont("Ubuntu", 30)
+            from game.graphics.renderer import Renderer
+
+            self.renderer = Renderer(self.screen, self.font)
+        else:
+            self.screen = None
+            self.clock = None
+            self.font = None
+            self.renderer = None
         self.render_mode = render_mode
         self.max_steps = max_steps
         self.true_seed = true_seed
         self.endless = endless
         self.speed = 1
+        # draw only every Nth tick; FPS * speed then limits frames, not ticks
+        self.render_every = 1
+        # if set, never wait: draw a frame only when 1 / display_fps seconds
+        # have passed, so the simulation runs at full speed
+        self.display_fps = None
+        self._next_frame = 0.0
         self.actions = [
             Action.NONE.value,
             Action.LEFT.value,
@@ -28,33 +89,164 @@ class ShootingGameEnv:
         ]
         self._random = random.Random(seed)
         self._seed = seed
+        self.profiler = None
         self.reset()
 
     def reset(self):
         if self.true_seed:
             self._random = random.Random(self._seed)
+        # getstate() is slow, snapshot() reuses it until the RNG is used again
+        self._rng_state = None
 
         self.player = Player(WIDTH // 2 - 25, HEIGHT - 50)
+        # bullets in firing order, targets sorted by y (lowest on screen
+        # first) for the sweep-and-prune collision test
         self.bullets = []
         self.targets = []
+        # allies among self.targets in spawn order
+        self._allies = []
         self.score = 0
         self.target_spawn_timer = 0
         self.target_spawn_delay = SPAWN_RATE
         self.done = False
         self.ticks = 0
         self.last_action = None
+        # spawn counter; restore() rebuilds the list order from it
+        self._next_seq = 0
+
+    def clone(self):
+        """Headless copy of this env with its own entities and RNG state."""
+        env = ShootingGameEnv.__new__(ShootingGameEnv)
+        env.screen = env.clock = env.font = env.renderer = None
+        env.render_mode = False
+        env.render_every = 1
+        env.display_fps = None
+        env.max_steps = self.max_steps
+        env.true_seed = self.true_seed
+        env.endless = self.endless
+        env.speed = self.speed
+        env.actions = self.actions
+        env.profiler = None
+        # skip seeding, restore() overwrites the RNG state anyway
+        env._random = random.Random.__new__(random.Random)
+        env._seed = self._seed
+        env.restore(self.snapshot())
+        return env
+
+    def snapshot(self):
+        """Capture the simulation state: entities, counters and RNG state.
+
+        The returned tuple is immutable; ``restore`` accepts it on this or any
+        other env built with the same settings.
+        """
+        return (
+            self.player.x,
+            self.player.y,
+            self.player.shoot_cooldown,
+            tuple(bullet.snapshot() for bullet in self.bullets),
+            tuple(target.snapshot() for target in self.targets),
+            self.score,
+            self.target_spawn_timer,
+            self.target_spawn_delay,
+            self.done,
+            self.ticks,
+            self.last_action,
+            self._next_seq,
+            self._get_rng_state(),
+        )
 
-    def step(self, action):
-        self.last_action = action
-        prev_player_x = self.player.rect.centerx
+    def restore(self, snapshot):
+        (
+            player_x,
+            player_y,
+            shoot_cooldown,
+            bullets,
+            targets,
+            self.score,
+            self.target_spawn_timer,
+            self.target_spawn_delay,
+            self.done,
+            self.ticks,
+            self.last_action,
+            self._next_seq,
+            rng_state,
+        ) = snapshot
+        self.player = Player(player_x, player_y)
+        self.player.shoot_cooldown = shoot_cooldown
+        self.bullets = [Bullet.from_snapshot(state) for state in bullets]
+        self.bullets.sort(key=lambda b: b.seq)
+        self.targets = [Target.from_snapshot(state) for state in targets]
+        self.targets.sort(key=lambda t: (-t.y, t.seq))
+        self._allies = sorted(
+            (t for t in self.targets if t.target_type is ALLY), key=lambda t: t.seq
+        )
+        self._random.setstate(rng_state)
+        self._rng_state = rng_state
+
+    def _get_rng_state(self):
+        if self._rng_state is None:
+            self._rng_state = self._random.getstate()
+        return self._rng_state
+
+    def enable_profiling(self, profiler=None):
+        """Time every phase of ``step`` into ``profiler`` (a new one if None)."""
+        self.disable_profiling()
+        self.profiler = profiler if profiler is not None else StepProfiler()
+        # timed wrappers shadow the phase methods on this instance only
+        for phase, name in _PHASE_METHODS.items():
+            setattr(self, name, _timed(getattr(self, name), phase, self.profiler))
+        return self.profiler
+
+    def disable_profiling(self):
+        self.profiler = None
+        for name in _PHASE_METHODS.values():
+            self.__dict__.pop(name, None)
+
+    def step(self, action, out=None):
+        """Advance one tick; ``out`` receives the observation if given."""
+        state, reward = self._observe(self._advance(action), out)
+        self._finish()
+        # state, reward, score, done
+        return state, reward, self.score, self.done
+
+    def tick(self, action):
+        """Advance one tick without building the observation.
+
+        Returns the positioning reward; ``score`` and ``done`` are read from
+        the env. Use it when the state is not needed, e.g. to score a fixed
+        action sequence.
+        """
+        reward = self._reward(self._advance(action))
+        self._finish()
+        return reward
+
+    def step_n(self, action, k, out=None):
+        """Hold ``action`` for up to ``k`` ticks, stopping early when done.
+
+        Returns (state, summed reward, score, done) like ``step``, but the
+        observation is only built after the last tick.
+        """
+        tick = self.tick
+        total_reward = 0.0
+        for _ in range(k):
+            total_reward += tick(action)
+            if self.done:
+                break
+        return self.get_state(out), total_reward, self.score, self.done
 
+    def _advance(self, action):
+        # the simulation phases of a tick; returns the player's previous
+        # center x for the positioning reward
+        self.last_action = action
+        prev_player_x = self.player.x + self.player.width // 2
         self._handle_action(action)
         self._spawn_targets()
         self._update_entities()
         self._check_collisions()
+        return prev_player_x
 
-        reward = self._calculate_positioning_reward(prev_player_x)
-
+    def _finish(self):
+        # end of every tick, after the reward (and observation) are built
         if self.max_steps > 0 and self.ticks > self.max_steps:
             self.done = True
 
@@ -63,114 +255,148 @@ class ShootingGameEnv:
                 self.done = True
 
         if self.render_mode:
-            self.render()
+            self._render_tick()
 
         self.ticks += 1
-        # state, reward, score, done
-        return self.get_state(), reward, self.score, self.done
 
-    def _calculate_positioning_reward(self, prev_player_x):
-        allies = [t for t in self.targets if t.target_type == TargetType.ALLY]
-        if not allies:
+    def get_state(self, out=None):
+        """Observation as a float32 array, written into ``out`` if given.
+
+        ``out`` can be any float32 array of 9 values, e.g. a row of a batch.
+        """
+        return self._observe(None, out)[0]
+
+    def _nearest_allies(self, player_cy):
+        # the 3 allies closest to the player vertically, ties go to the older
+        # target; _allies is in spawn order so strict comparisons keep that
+        first = second = third = None
+        d1 = d2 = d3 = 0
+        for t in self._allies:
+            dy = t.y + TARGET_HALF - player_cy
+            if dy < 0:
+                dy = -dy
+            if first is None or dy < d1:
+                third, d3 = second, d2
+                second, d2 = first, d1
+                first, d1 = t, dy
+            elif second is None or dy < d2:
+                third, d3 = second, d2
+                second, d2 = t, dy
+            elif third is None or dy < d3:
+                third, d3 = t, dy
+        return first, second, third
+
+    def _observe(self, prev_player_x=None, out=None):
+        # state and positioning reward from a single pass over the allies
+        player_cx = self.player.x + self.player.width // 2
+        player_cy = self.player.y + self.player.height // 2
+
+        if self.last_action == LEFT:
+            move_dir = -1.0
+        elif self.last_action == RIGHT:
+            move_dir = 1.0
+        else:
+            move_dir = 0.0
+
+        # player_x, move_dir, closest_ally_alignment, then (rel_x, rel_y) of
+        # the 3 closest allies sorted by vertical distance, (0.0, -2.0) if absent
+        state = [player_cx / WIDTH, move_dir, 0.0, 0.0, -2.0, 0.0, -2.0, 0.0, -2.0]
+        reward = 0.0
+
+        closest, second, third = self._nearest_allies(player_cy)
+        if closest is not None:
+            ally_x = closest.x + TARGET_HALF
+            current_x_diff = abs(player_cx - ally_x)
+            state[2] = max(0.0, 1.0 - current_x_diff / WIDTH * 2)
+            state[3] = (ally_x - player_cx) / WIDTH
+            state[4] = (closest.y + TARGET_HALF - player_cy) / HEIGHT
+            if second is not None:
+                state[5] = (second.x + TARGET_HALF - player_cx) / WIDTH
+                state[6] = (second.y + TARGET_HALF - player_cy) / HEIGHT
+                if third is not None:
+                    state[7] = (third.x + TARGET_HALF - player_cx) / WIDTH
+                    state[8] = (third.y + TARGET_HALF - player_cy) / HEIGHT
+
+            if prev_player_x is not None:
+                reward = _positioning_reward(
+                    current_x_diff, abs(prev_player_x - ally_x)
+                )
+
+        if out is None:
+            return np.array(state, dtype=np.float32), reward
+        out[:] = state
+        return out, reward
+
+    def _reward(self, prev_player_x):
+        # positioning reward alone: only the closest ally is needed
+        player_cy = self.player.y + self.player.height // 2
+        closest = None
+        best_dy = 0
+        for t in self._allies:
+            dy = t.y + TARGET_HALF - player_cy
+            if dy < 0:
+                dy = -dy
+            if closest is None or dy < best_dy:
+                closest = t
+                best_dy = dy
+        if closest is None:
             return 0.0
-
-        # closest ally (by vertical distance)
-        closest_ally = min(
-            allies, key=lambda t: abs(t.rect.centery - self.player.rect.centery)
+        ally_x = closest.x + TARGET_HALF
+        return _positioning_reward(
+            abs(self.player.x + self.player.width // 2 - ally_x),
+            abs(prev_player_x - ally_x),
         )
 
-        # current and previous alignment
-        current_x_diff = abs(self.player.rect.centerx - closest_ally.rect.centerx)
-        prev_x_diff = abs(prev_player_x - closest_ally.rect.centerx)
-
-        # reward for moving towards allies
-        if current_x_diff < prev_x_diff:
-            return 0.2
-        elif current_x_diff > prev_x_diff:
-            return -0.1
-
-        # Bonus for being close to the ally
-        if current_x_diff < 30:
-            return 0.5
-
-        return 0.0
-
-    def get_state(self):
-        MAX_ALLIES = 3
-        player_x = self.player.rect.centerx / WIDTH
-
-        if hasattr(self, "last_action"):
-            if self.last_action == Action.LEFT.value:
-                move_dir = -1
-            elif self.last_action == Action.RIGHT.value:
-                move_dir = 1
-            else:
-                move_dir = 0
-        else:
-            move_dir = 0
-
-        allies = [t for t in self.targets if t.target_type == TargetType.ALLY]
-        allies.sort(key=lambda t: abs(t.rect.centery - self.player.rect.centery))
-
-        ally_features = []
-        for i in range(MAX_ALLIES):
-            if i < len(allies):
-                ally = allies[i]
-                rel_x = (ally.rect.centerx - self.player.rect.centerx) / WIDTH
-                rel_y = (ally.rect.centery - self.player.rect.centery) / HEIGHT
-                ally_features.extend([rel_x, rel_y])
-            else:
-                ally_features.extend([0.0, -2.0])  # default
-
-        closest_ally_alignment = 0.0
-        if allies:
-            closest_ally = allies[0]
-            x_diff = abs(closest_ally.rect.centerx - self.player.rect.centerx) / WIDTH
-            closest_ally_alignment = max(0.0, 1.0 - x_diff * 2)
-
-        state = [player_x, move_dir, closest_ally_alignment] + ally_features
-
-        return np.array(state, dtype=np.float32)
-
-    def render(self):
+    def render(self, wait=True):
         if not self.screen:
             return
 
         if not self.clock:
             return
 
+        import pygame as pg
+
         for event in pg.event.get():
             if event.type == pg.QUIT:
                 self.close()
                 exit()
 
-        self.screen.fill(BLACK)
-        self.player.draw(self.screen)
-
-        for bullet in self.bullets:
-            bullet.draw(self.screen)
-
-        for target in self.targets:
-            target.draw(self.screen)
-
-        if self.font:
-            score_text = self.font.render(f"Score: {self.score}", True, WHITE)
-            self.screen.blit(score_text, (10, 10))
+        pg.display.update(
+            self.renderer.draw(self.player, self.bullets, self.targets, self.score)
+        )
+        if wait:
+            self.clock.tick(int(FPS * self.speed))
 
-        pg.display.flip()
-        self.clock.tick(int(FPS * self.speed))
+    def _render_tick(self):
+        # called after every tick in render mode
+        if self.ticks % self.render_every:
+            return
+        if self.display_fps:
+            now = time.perf_counter()
+            if now < self._next_frame:
+                return
+            self._next_frame = now + 1 / self.display_fps
+            self.render(wait=False)
+        else:
+            self.render()
 
     def close(self):
-        pg.quit()
+        if self.render_mode:
+            import pygame as pg
+
+            pg.quit()
 
     def _handle_action(self, action):
-        if action == Action.LEFT.value:
+        if action == LEFT:
             self.player.move_left()
-        elif action == Action.RIGHT.value:
+        elif action == RIGHT:
             self.player.move_right()
-        elif action == Action.SHOOT.value:
+        elif action == SHOOT:
             if self.player.shoot():
-                bullet = Bullet(self.player.rect.centerx - 2, self.player.rect.top)
+                bullet = Bullet(
+                    self.player.centerx - 2, self.player.top, self._next_seq
+                )
+                self._next_seq += 1
                 self.bullets.append(bullet)
         else:
             self.player.update()
@@ -179,43 +405,82 @@ class ShootingGameEnv:
         self.target_spawn_timer += 1
         if self.target_spawn_timer >= self.target_spawn_delay:
             self.target_spawn_timer = 0
-            x = self._random.randint(0, WIDTH - 30)
+            self._rng_state = None
+            x = self._random.randint(0, WIDTH - TARGET_SIZE)
             target_type = (
                 TargetType.OPPONENT
                 if self._random.random() > SPAWN_CHANCE_ALLY
                 else TargetType.ALLY
             )
-            target = Target(
-                x,
-                -30,
-                self._random,
-                target_type,
-            )
+            target = Target(x, -TARGET_SIZE, self._random, target_type, self._next_seq)
+            self._next_seq += 1
+            # nothing is higher up than the spawn row
             self.targets.append(target)
+            if target_type is ALLY:
+                self._allies.append(target)
 
     def _update_entities(self):
-        for bullet in self.bullets[:]:
-            bullet.update()
-            if bullet.is_off_screen():
-                self.bullets.remove(bullet)
+        # all bullets fly at the same speed, the oldest ones leave first
+        bullets = self.bullets
+        if bullets:
+            gone = 0
+            for bullet in bullets:
+                bullet.y -= bullet.speed
+                if bullet.y + bullet.height < 0:
+                    gone += 1
+            if gone:
+                del bullets[:gone]
+
+        # keep targets sorted by y: one that overtook a slower target is moved
+        # in front of it, so the ones that fell off the screen come first
+        targets = self.targets
+        prev_y = HEIGHT << 8
+        for i in range(len(targets)):
+            target = targets[i]
+            y = target.y + target.speed
+            if y.__class__ is not int:
+                y = pg_round(y)
+            target.y = y
+            if y > prev_y:
+                j = i - 1
+                while j > 0 and targets[j - 1].y < y:
+                    j -= 1
+                del targets[i]
+                targets.insert(j, target)
+            else:
+                prev_y = y
 
-        for target in self.targets[:]:
-            target.update()
-            if target.is_off_screen():
-                self.score += target.no_collision_reward
-                self.targets.remove(target)
+        fallen = 0
+        for target in targets:
+            if target.y <= HEIGHT:
+                break
+            fallen += 1
+            self.score += target.kind.no_collision_reward
+            if target.target_type is ALLY:
+                self._allies.remove(target)
+        if fallen:
+            del targets[:fallen]
 
     def _check_collisions(self):
-        for bullet in self.bullets[:]:
-            for target in self.targets[:]:
-                if bullet.rect.colliderect(target.rect):
-                    self.score += target.reward_value
-                    self.bullets.remove(bullet)
-                    self.targets.remove(target)
-                    break
-
-        for target in self.targets[:]:
-            if target.rect.colliderect(self.player.rect):
-                self.score += target.collision_reward
-                self.targets.remove(target)
-                break
+        bullets = self.bullets
+        targets = self.targets
+
+        if bullets and targets:
+            # bullets are resolved in the order they were fired
+            pairs = collision_pairs(bullets, targets, TARGET_SIZE)
+            if pairs:
+                for i, target in pairs:
+                    self.score += target.kind.reward_value
+                remove_all(bullets, [bullets[i] for i, _ in pairs])
+                self._remove_targets([target for _, target in pairs])
+
+        if targets:
+            target = first_overlap(self.player, targets, TARGET_SIZE)
+            if target is not None:
+                self.score += target.kind.collision_reward
+                self._remove_targets((target,))
+
+    def _remove_targets(self, dead):
+        # removals happen after all hits are resolved and keep the y order
+        remove_all(self.targets, dead)
+        remove_all(self._allies, [t for t in dead if t.target_type is ALLY])
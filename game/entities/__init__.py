@@ -1,5 +1,6 @@
+from .box import Box
 from .player import Player
 from .bullet import Bullet
-from .target import Target
+from .target import Target, TargetKind, TARGET_KINDS
 
-__all__ = ["Player", "Bullet", "Target"]
+__all__ = ["Box", "Player", "Bullet", "Target", "TargetKind", "TARGET_KINDS"]
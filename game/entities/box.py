@@ -0,0 +1,52 @@
+def pg_round(value):
+    """Round a float coordinate the way ``pygame.Rect`` does on assignment."""
+    return int(value + 0.5) if value >= 0 else -int(0.5 - value)
+
+
+class Box:
+    """Axis-aligned integer rectangle with the ``pygame.Rect`` geometry we use."""
+
+    __slots__ = ("x", "y", "width", "height")
+
+    def __init__(self, x: int, y: int, width: int, height: int):
+        self.x = x
+        self.y = y
+        self.width = width
+        self.height = height
+
+    @property
+    def left(self):
+        return self.x
+
+    @property
+    def right(self):
+        return self.x + self.width
+
+    @property
+    def top(self):
+        return self.y
+
+    @property
+    def bottom(self):
+        return self.y + self.height
+
+    @property
+    def centerx(self):
+        return self.x + self.width // 2
+
+    @property
+    def centery(self):
+        return self.y + self.height // 2
+
+    def colliderect(self, other):
+        return (
+            self.x < other.x + other.width
+            and self.x + self.width > other.x
+            and self.y < other.y + other.height
+            and self.y + self.height > other.y
+        )
+
+    def draw_rect(self, screen, color):
+        import pygame as pg
+
+        pg.draw.rect(screen, color, (self.x, self.y, self.width, self.height))
@@ -1,19 +1,32 @@
-import pygame as pg
 from game.settings import *
+from .box import Box
 
 
-class Bullet:
-    def __init__(self, x: int, y: int):
-        self.rect = pg.Rect(x, y, 5, 10)
+class Bullet(Box):
+    __slots__ = ("speed", "seq")
+
+    def __init__(self, x: int, y: int, seq: int = 0):
+        super().__init__(x, y, 5, 10)
         self.speed = BULLET_SPEED
-        self.color = ORANGE
+        self.seq = seq
+
+    def snapshot(self):
+        return (self.x, self.y, self.seq)
+
+    @classmethod
+    def from_snapshot(cls, state):
+        return cls(*state)
+
+    @property
+    def color(self):
+        return ORANGE
 
     def update(self):
         movement = self.speed
-        self.rect.y -= movement
+        self.y -= movement
 
     def is_off_screen(self):
-        return self.rect.bottom < 0
+        return self.y + self.height < 0
 
     def draw(self, screen):
-        pg.draw.rect(screen, self.color, self.rect)
+        self.draw_rect(screen, ORANGE)
@@ -1,23 +1,25 @@
-import pygame as pg
 from game.settings import *
+from .box import Box
 
 
-class Player:
+class Player(Box):
+    __slots__ = ("speed", "shoot_cooldown", "color")
+
     def __init__(self, x: int, y: int, width: int = 50, height: int = 30):
-        self.rect = pg.Rect(x, y, width, height)
+        super().__init__(x, y, width, height)
         self.speed = PLAYER_SPEED
         self.shoot_cooldown = 0.0
         self.color = WHITE
 
     def move_left(self):
         movement = self.speed
-        if self.rect.left > 0:
-            self.rect.x = max(0, self.rect.x - movement)
+        if self.x > 0:
+            self.x = max(0, self.x - movement)
 
     def move_right(self):
         movement = self.speed
-        if self.rect.right < WIDTH:
-            self.rect.x = min(WIDTH - self.rect.width, self.rect.x + movement)
+        if self.x + self.width < WIDTH:
+            self.x = min(WIDTH - self.width, self.x + movement)
 
     def can_shoot(self):
         return self.shoot_cooldown <= 0
@@ -33,4 +35,4 @@ class Player:
             self.shoot_cooldown -= 1
 
     def draw(self, screen):
-        pg.draw.rect(screen, self.color, self.rect)
+        self.draw_rect(screen, self.color)
@@ -1,37 +1,82 @@
-import pygame as pg
 from game.settings import *
-from game import *
+from game.types import TargetType
+from .box import Box, pg_round
 
 
-class Target:
-    def __init__(self, x: int, y: int, rng, target_type: TargetType):
-        self.rect = pg.Rect(x, y, 30, 30)
+class TargetKind:
+    """Flyweight with the values shared by every target of one type."""
+
+    __slots__ = ("color", "reward_value", "collision_reward", "no_collision_reward")
+
+    def __init__(self, color, reward_value, collision_reward, no_collision_reward):
+        self.color = color
+        self.reward_value = reward_value
+        self.collision_reward = collision_reward
+        self.no_collision_reward = no_collision_reward
+
+
+TARGET_KINDS = {
+    TargetType.OPPONENT: TargetKind(
+        (255, 0, 0),
+        SHOOT_REWARD_OPPONENT,
+        COLLISION_REWARD_OPPONENT,
+        NO_COLLISION_REWARD_OPPONENT,
+    ),
+    TargetType.ALLY: TargetKind(
+        (0, 0, 255),
+        SHOOT_REWARD_ALLY,
+        COLLISION_REWARD_ALLY,
+        NO_COLLISION_REWARD_ALLY,
+    ),
+}
+
+
+class Target(Box):
+    __slots__ = ("target_type", "kind", "speed", "seq")
+
+    def __init__(self, x: int, y: int, rng, target_type: TargetType, seq: int = 0):
+        super().__init__(x, y, TARGET_SIZE, TARGET_SIZE)
         self.target_type = target_type
-        self.rng = rng
-        self.speed = self.rng.uniform(TARGET_SPEED_MIN, TARGET_SPEED_MAX)
-        self.color = (255, 0, 0) if target_type == TargetType.OPPONENT else (0, 0, 255)
-        self.reward_value = (
-            SHOOT_REWARD_OPPONENT
-            if target_type == TargetType.OPPONENT
-            else SHOOT_REWARD_ALLY
-        )
-        self.collision_reward = (
-            COLLISION_REWARD_ALLY
-            if target_type == TargetType.ALLY
-            else COLLISION_REWARD_OPPONENT
-        )
-        self.no_collision_reward = (
-            NO_COLLISION_REWARD_ALLY
-            if target_type == TargetType.ALLY
-            else NO_COLLISION_REWARD_OPPONENT
-        )
+        self.kind = TARGET_KINDS[target_type]
+        speed = rng.uniform(TARGET_SPEED_MIN, TARGET_SPEED_MAX)
+        # whole speeds keep y an int without rounding on every update
+        self.speed = int(speed) if speed.is_integer() else speed
+        self.seq = seq
+
+    def snapshot(self):
+        return (self.x, self.y, self.speed, self.target_type, self.seq)
+
+    @classmethod
+    def from_snapshot(cls, state):
+        # bypasses __init__, which would draw a new speed from the rng
+        target = cls.__new__(cls)
+        target.x, target.y, target.speed, target.target_type, target.seq = state
+        target.width = target.height = TARGET_SIZE
+        target.kind = TARGET_KINDS[target.target_type]
+        return target
+
+    @property
+    def color(self):
+        return self.kind.color
+
+    @property
+    def reward_value(self):
+        return self.kind.reward_value
+
+    @property
+    def collision_reward(self):
+        return self.kind.collision_reward
+
+    @property
+    def no_collision_reward(self):
+        return self.kind.no_collision_reward
 
     def update(self):
-        movement = self.speed
-        self.rect.y += movement
+        y = self.y + self.speed
+        self.y = y if y.__class__ is int else pg_round(y)
 
     def is_off_screen(self):
-        return self.rect.top > HEIGHT
+        return self.y > HEIGHT
 
     def draw(self, screen):
-        pg.draw.rect(screen, self.color, self.rect)
+        self.draw_rect(screen, self.kind.color)
@@ -0,0 +1,70 @@
+import pygame as pg
+from game.settings import *
+
+
+class Renderer:
+    """Draws the game onto ``screen`` and reports which areas changed.
+
+    Only the rectangles covered by entities in the previous and the current
+    frame (and the score) are restored from a cached background and pushed to
+    the display. Entities are blitted from cached solid surfaces, one per size
+    and color, and the score text is rendered again only when it changes.
+    Call ``invalidate()`` after drawing onto the screen yourself.
+    """
+
+    def __init__(self, screen, font=None):
+        self.screen = screen
+        self.font = font
+        self.background = pg.Surface(screen.get_size()).convert(screen)
+        self.background.fill(BLACK)
+        self._sprites = {}
+        self._score = None
+        self._score_surface = None
+        # rects drawn in the last frame, restored before the next one
+        self._drawn = []
+        self._full = True
+
+    def invalidate(self):
+        self._full = True
+
+    def _sprite(self, box):
+        key = (box.width, box.height, box.color)
+        sprite = self._sprites.get(key)
+        if sprite is None:
+            sprite = pg.Surface((box.width, box.height)).convert(self.screen)
+            sprite.fill(box.color)
+            self._sprites[key] = sprite
+        return sprite
+
+    def draw(self, player, bullets, targets, score):
+        """Draw one frame; returns the rects to pass to ``pg.display.update``."""
+        screen = self.screen
+        background = self.background
+        if self._full:
+            screen.blit(background, (0, 0))
+        else:
+            # includes the score: text edges are blended, never blit it twice
+            for rect in self._drawn:
+                screen.blit(background, rect, rect)
+
+        sprite = self._sprite
+        blit = screen.blit
+        drawn = [blit(sprite(player), (player.x, player.y))]
+        for bullet in bullets:
+            drawn.append(blit(sprite(bullet), (bullet.x, bullet.y)))
+        for target in targets:
+            drawn.append(blit(sprite(target), (target.x, target.y)))
+
+        if self.font:
+            if score != self._score:
+                self._score = score
+                self._score_surface = self.font.render(f"Score: {score}", True, WHITE)
+            drawn.append(blit(self._score_surface, (10, 10)))
+
+        if self._full:
+            self._full = False
+            dirty = [screen.get_rect()]
+        else:
+            dirty = self._drawn + drawn
+        self._drawn = drawn
+        return dirty
@@ -0,0 +1,420 @@
+"""Compact, deterministic recordings of ``ShootingGameEnv`` episodes.
+
+A recording holds the actions of an episode packed four to a byte, the env
+configuration and settings fingerprint, and a snapshot of the env every
+``keyframe_interval`` ticks. Any tick is reached by restoring the keyframe
+before it and replaying at most ``keyframe_interval`` actions headless.
+
+    python -m game.recording verify run.npz [...]
+    python -m game.recording view run.npz
+"""
+
+import argparse
+import json
+
+import numpy as np
+
+from game.core_ai import ShootingGameEnv
+from game.types import TargetType
+from game.utils.fingerprint import settings_fingerprint
+
+VERSION = 2
+KEYFRAME_INTERVAL = 250
+
+
+def pack_actions(actions):
+    """Pack actions (0-3) into 2 bits each, the first one in the low bits."""
+    actions = np.asarray(actions, dtype=np.uint8)
+    if actions.size and actions.max() > 3:
+        raise ValueError("actions must be in range 0-3")
+    padded = np.zeros(-(-len(actions) // 4) * 4, dtype=np.uint8)
+    padded[: len(actions)] = actions
+    return (
+        padded[0::4] | padded[1::4] << 2 | padded[2::4] << 4 | padded[3::4] << 6
+    ).astype(np.uint8)
+
+
+def unpack_actions(packed, count):
+    packed = np.asarray(packed, dtype=np.uint8)
+    actions = np.empty(len(packed) * 4, dtype=np.uint8)
+    for i in range(4):
+        actions[i::4] = (packed >> (2 * i)) & 3
+    return actions[:count]
+
+
+def _number(value):
+    # whole numbers were ints in the snapshot, keep them ints
+    value = float(value)
+    return int(value) if value.is_integer() else value
+
+
+def pack_keyframes(keyframes):
+    """Keyframe snapshots as plain arrays, see ``ShootingGameEnv.snapshot``.
+
+    Counters (player, score, timers, ...) take one row per keyframe with NaN
+    for None, bullets and targets one row per entity with the per-keyframe
+    counts alongside, and the RNG state its Mersenne Twister words.
+    """
+    counters, bullets, targets, bullet_counts, target_counts, rng = (
+        [] for _ in range(6)
+    )
+    for (
+        player_x,
+        player_y,
+        shoot_cooldown,
+        frame_bullets,
+        frame_targets,
+        score,
+        spawn_timer,
+        spawn_delay,
+        done,
+        ticks,
+        last_action,
+        next_seq,
+        (rng_version, rng_words, gauss_next),
+    ) in keyframes:
+        counters.append(
+            (
+                player_x,
+                player_y,
+                shoot_cooldown,
+                score,
+                spawn_timer,
+                spawn_delay,
+                done,
+                ticks,
+                np.nan if last_action is None else last_action,
+                next_seq,
+                np.nan if gauss_next is None else gauss_next,
+            )
+        )
+        bullets.extend(frame_bullets)
+        targets.extend(
+            (x, y, speed, target_type.value, seq)
+            for x, y, speed, target_type, seq in frame_targets
+        )
+        bullet_counts.append(len(frame_bullets))
+        target_counts.append(len(frame_targets))
+        rng.append((rng_version, *rng_words))
+    return {
+        "keyframe_counters": np.array(counters, dtype=np.float64).reshape(-1, 11),
+        "keyframe_bullets": np.array(bullets, dtype=np.float64).reshape(-1, 3),
+        "keyframe_targets": np.array(targets, dtype=np.float64).reshape(-1, 5),
+        "keyframe_bullet_counts": np.array(bullet_counts, dtype=np.int64),
+        "keyframe_target_counts": np.array(target_counts, dtype=np.int64),
+        "keyframe_rng": np.array(rng, dtype=np.uint32),
+    }
+
+
+def unpack_keyframes(arrays):
+    """The snapshots ``pack_keyframes`` stored, equal to the original ones."""
+    bullets = np.split(
+        arrays["keyframe_bullets"], np.cumsum(arrays["keyframe_bullet_counts"])[:-1]
+    )
+    targets = np.split(
+        arrays["keyframe_targets"], np.cumsum(arrays["keyframe_target_counts"])[:-1]
+    )
+    keyframes = []
+    for row, frame_bullets, frame_targets, rng in zip(
+        arrays["keyframe_counters"].tolist(),
+        bullets,
+        targets,
+        arrays["keyframe_rng"].tolist(),
+    ):
+        (
+            player_x,
+            player_y,
+            shoot_cooldown,
+            score,
+            spawn_timer,
+            spawn_delay,
+            done,
+            ticks,
+            last_action,
+            next_seq,
+            gauss_next,
+        ) = row
+        keyframes.append(
+            (
+                _number(player_x),
+                _number(player_y),
+                _number(shoot_cooldown),
+                tuple(
+                    (_number(x), _number(y), int(seq))
+                    for x, y, seq in frame_bullets.tolist()
+                ),
+                tuple(
+                    (
+                        _number(x),
+                        _number(y),
+                        _number(speed),
+                        TargetType(int(target_type)),
+                        int(seq),
+                    )
+                    for x, y, speed, target_type, seq in frame_targets.tolist()
+                ),
+                _number(score),
+                _number(spawn_timer),
+                _number(spawn_delay),
+                bool(done),
+                int(ticks),
+                None if np.isnan(last_action) else int(last_action),
+                int(next_seq),
+                (rng[0], tuple(rng[1:]), None if np.isnan(gauss_next) else gauss_next),
+            )
+        )
+    return keyframes
+
+
+class Recording:
+    """Actions, keyframes and metadata of one recorded episode.
+
+    ``meta`` holds the env configuration (seed, max_steps, endless), the
+    settings fingerprint and the results (score, summed reward, done) the
+    episode ended with. Positions are counted in ticks since the start of the
+    recording.
+    """
+
+    def __init__(self, actions, keyframes, keyframe_interval, meta):
+        self.actions = np.asarray(actions, dtype=np.uint8)
+        self.keyframes = list(keyframes)
+        self.keyframe_interval = keyframe_interval
+        self.meta = meta
+
+    def __len__(self):
+        return len(self.actions)
+
+    def save(self, filename):
+        meta = dict(self.meta, version=VERSION, ticks=len(self.actions))
+        meta["keyframe_interval"] = self.keyframe_interval
+        np.savez_compressed(
+            filename,
+            meta=np.array(json.dumps(meta)),
+            actions=pack_actions(self.actions),
+            **pack_keyframes(self.keyframes),
+        )
+
+    @classmethod
+    def load(cls, filename):
+        with np.load(filename, allow_pickle=False) as data:
+            meta = json.loads(str(data["meta"]))
+            if meta.get("version") != VERSION:
+                raise ValueError(f"unsupported recording version {meta.get('version')}")
+            actions = unpack_actions(data["actions"], meta["ticks"])
+            keyframes = unpack_keyframes(data)
+        return cls(actions, keyframes, meta["keyframe_interval"], meta)
+
+    def make_env(self, render_mode=False):
+        """An env configured like the recorded one, at the first tick."""
+        if self.meta["fingerprint"] != settings_fingerprint():
+            raise ValueError(
+                "the recording was made with different game settings "
+                f"({self.meta['fingerprint']}, now {settings_fingerprint()})"
+            )
+        env = ShootingGameEnv(
+            seed=self.meta["seed"],
+            max_steps=self.meta["max_steps"],
+            render_mode=render_mode,
+            true_seed=self.meta["true_seed"],
+            endless=self.meta["endless"],
+        )
+        env.restore(self.keyframes[0])
+        return env
+
+    def position(self, env):
+        """Ticks of this recording ``env`` has played."""
+        return env.ticks - self.meta["start_tick"]
+
+    def seek(self, tick, env):
+        """Move ``env`` to the state after ``tick`` recorded actions.
+
+        Plays forward from the current state when that is no further than
+        from the nearest keyframe, otherwise restores the keyframe first.
+        """
+        if not 0 <= tick <= len(self.actions):
+            raise IndexError(f"tick {tick} outside 0-{len(self.actions)}")
+        current = self.position(env)
+        # no keyframe is taken after the last action
+        k = min(tick // self.keyframe_interval, len(self.keyframes) - 1)
+        if not k * self.keyframe_interval <= current <= tick:
+            env.restore(self.keyframes[k])
+            current = k * self.keyframe_interval
+        env_tick = env.tick
+        for action in self.actions[current:tick].tolist():
+            env_tick(action)
+        return env
+
+    def verify(self):
+        """Replay the whole episode headless against keyframes and results.
+
+        Returns a list of mismatch descriptions, empty if the replay matches.
+        """
+        env = self.make_env()
+        errors = []
+        reward = 0.0
+        env_tick = env.tick
+        interval = self.keyframe_interval
+        for i, action in enumerate(self.actions.tolist()):
+            if (
+                i
+                and i % interval == 0
+                and env.snapshot() != self.keyframes[i // interval]
+            ):
+                errors.append(f"state differs from keyframe at tick {i}")
+            reward += env_tick(action)
+        for key, value in (
+            ("score", env.score),
+            ("reward", reward),
+            ("done", env.done),
+        ):
+            if self.meta.get(key) is not None and self.meta[key] != value:
+                errors.append(f"{key} {value} != recorded {self.meta[key]}")
+        return errors
+
+
+class Recorder:
+    """Env wrapper that records everything played through ``step``/``tick``.
+
+    Start it right after ``env.reset()``; the current state becomes the first
+    keyframe. ``recording()`` returns what was played so far.
+    """
+
+    def __init__(self, env, keyframe_interval=KEYFRAME_INTERVAL):
+        self.env = env
+        self.keyframe_interval = keyframe_interval
+        self.start()
+
+    def start(self):
+        """Drop what was recorded and start again from the env's state."""
+        self.actions = bytearray()
+        self.keyframes = [self.env.snapshot()]
+        self.start_tick = self.env.ticks
+        self.reward = 0.0
+
+    def _record(self, action):
+        if self.actions and len(self.actions) % self.keyframe_interval == 0:
+            self.keyframes.append(self.env.snapshot())
+        self.actions.append(int(action))
+
+    def step(self, action, out=None):
+        self._record(action)
+        result = self.env.step(action, out)
+        self.reward += result[1]
+        return result
+
+    def tick(self, action):
+        self._record(action)
+        reward = self.env.tick(action)
+        self.reward += reward
+        return reward
+
+    def recording(self):
+        env = self.env
+        meta = {
+            "seed": env._seed,
+            "true_seed": env.true_seed,
+            "max_steps": env.max_steps,
+            "endless": env.endless,
+            "fingerprint": settings_fingerprint(),
+            "start_tick": self.start_tick,
+            "score": env.score,
+            "reward": self.reward,
+            "done": env.done,
+        }
+        return Recording(
+            np.frombuffer(bytes(self.actions), dtype=np.uint8),
+            self.keyframes,
+            self.keyframe_interval,
+            meta,
+        )
+
+    def save(self, filename):
+        self.recording().save(filename)
+
+    def __getattr__(self, name):
+        return getattr(self.env, name)
+
+
+def view(recording):
+    """Scrub through a recording in a window.
+
+    Space plays/pauses, left/right step one tick (with shift one keyframe
+    interval), home/end jump to the ends and clicking the bar seeks.
+    """
+    import pygame as pg
+    from game.settings import FPS, HEIGHT, ORANGE, WHITE, WIDTH
+
+    env = recording.make_env(render_mode=True)
+    # frames are drawn here, not on every replayed tick
+    env.render_mode = False
+    pg.display.set_caption("Recording")
+    font = pg.font.SysFont("Ubuntu", 16)
+    clock = pg.time.Clock()
+    last = len(recording)
+    tick = 0
+    playing = False
+    bar = pg.Rect(10, HEIGHT - 8, WIDTH - 20, 4)
+
+    while True:
+        target = tick
+        for event in pg.event.get():
+            if event.type == pg.QUIT or (
+                event.type == pg.KEYDOWN and event.key == pg.K_ESCAPE
+            ):
+                pg.quit()
+                return
+            if event.type == pg.KEYDOWN:
+                jump = recording.keyframe_interval if event.mod & pg.KMOD_SHIFT else 1
+                if event.key == pg.K_SPACE:
+                    playing = not playing
+                elif event.key == pg.K_RIGHT:
+                    target += jump
+                elif event.key == pg.K_LEFT:
+                    target -= jump
+                elif event.key == pg.K_HOME:
+                    target = 0
+                elif event.key == pg.K_END:
+                    target = last
+            elif event.type == pg.MOUSEBUTTONDOWN and event.pos[1] >= bar.top - 10:
+                target = round((event.pos[0] - bar.left) / bar.width * last)
+        if playing:
+            target += 1
+        tick = min(max(target, 0), last)
+        if tick == last:
+            playing = False
+        recording.seek(tick, env)
+
+        env.renderer.invalidate()
+        env.renderer.draw(env.player, env.bullets, env.targets, env.score)
+        screen = env.screen
+        pg.draw.rect(screen, WHITE, bar, 1)
+        done = bar.copy()
+        done.width = round(bar.width * tick / max(last, 1))
+        pg.draw.rect(screen, ORANGE, done)
+        label = font.render(f"tick {tick}/{last}", True, WHITE)
+        screen.blit(label, (WIDTH - label.get_width() - 10, 10))
+        pg.display.flip()
+        clock.tick(FPS)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Verify or view recordings")
+    parser.add_argument("command", choices=["verify", "view"])
+    parser.add_argument("files", nargs="+")
+    args = parser.parse_args()
+
+    if args.command == "view":
+        view(Recording.load(args.files[0]))
+    else:
+        failed = 0
+        for filename in args.files:
+            recording = Recording.load(filename)
+            errors = recording.verify()
+            failed += bool(errors)
+            print(
+                f"{'FAIL' if errors else 'ok  '} {filename}: {len(recording)} ticks, "
+                f"score {recording.meta['score']}"
+            )
+            for error in errors:
+                print(f"     {error}")
+        raise SystemExit(1 if failed else 0)
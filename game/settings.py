@@ -8,6 +8,7 @@ BULLET_SPEED = 10
 # Cele
 TARGET_SPEED_MIN = 2
 TARGET_SPEED_MAX = 2
+TARGET_SIZE = 30  # width and height of a target
 SPAWN_RATE = 60
 SPAWN_CHANCE_OPPONENT = 0.0
 SPAWN_CHANCE_ALLY = 1 - SPAWN_CHANCE_OPPONENT
@@ -0,0 +1,84 @@
+# below this many boxes a linear start beats the binary search
+SEARCH_MIN = 8
+
+
+def settle(boxes):
+    """Re-sort ``boxes`` by y, lowest on screen (largest y) first.
+
+    An insertion sort: after one tick of falling the list is sorted already
+    unless a faster box overtook a slower one, so this is a single pass.
+    """
+    for i in range(1, len(boxes)):
+        box = boxes[i]
+        y = box.y
+        j = i
+        while j > 0 and boxes[j - 1].y < y:
+            j -= 1
+        if j != i:
+            del boxes[i]
+            boxes.insert(j, box)
+
+
+def _first_above(boxes, bottom):
+    # first index in ``boxes`` (sorted by y, largest first) with y < bottom
+    lo, hi = 0, len(boxes)
+    while lo < hi:
+        mid = (lo + hi) // 2
+        if boxes[mid].y < bottom:
+            hi = mid
+        else:
+            lo = mid + 1
+    return lo
+
+
+def first_overlap(box, boxes, reach, exclude=()):
+    """Lowest-``seq`` box of ``boxes`` colliding with ``box``, or None.
+
+    Sweep and prune along y: ``boxes`` must be sorted by y, largest first,
+    and none may be taller than ``reach``. Only the run of boxes whose y
+    range can meet ``box`` is tested.
+    """
+    x, y = box.x, box.y
+    right, bottom = x + box.width, y + box.height
+    lowest = y - reach
+    best = None
+    start = _first_above(boxes, bottom) if len(boxes) > SEARCH_MIN else 0
+    for i in range(start, len(boxes)):
+        other = boxes[i]
+        oy = other.y
+        if oy <= lowest:
+            break
+        if (
+            oy < bottom
+            and oy + other.height > y
+            and other.x < right
+            and other.x + other.width > x
+            and (best is None or other.seq < best.seq)
+            and other not in exclude
+        ):
+            best = other
+    return best
+
+
+def collision_pairs(bullets, boxes, reach):
+    """Resolve bullet hits against ``boxes`` in one pass.
+
+    Bullets are resolved in the given order and each one takes the
+    lowest-``seq`` box it overlaps that no earlier bullet took, the same
+    result as testing every pair and removing hits as they happen. Returns
+    (bullet index, box) pairs; nothing is removed.
+    """
+    pairs = []
+    taken = set()
+    for i, bullet in enumerate(bullets):
+        target = first_overlap(bullet, boxes, reach, taken)
+        if target is not None:
+            taken.add(target)
+            pairs.append((i, target))
+    return pairs
+
+
+def remove_all(items, dead):
+    """Remove every item of ``dead`` from ``items``, keeping the order."""
+    dead_ids = {id(item) for item in dead}
+    items[:] = [item for item in items if id(item) not in dead_ids]
@@ -0,0 +1,13 @@
+import hashlib
+
+
+def settings_fingerprint():
+    """Short hash of every constant in ``game.settings``.
+
+    Two envs only play the same game for the same actions and seed if their
+    fingerprints match; use it to tag anything derived from a simulation.
+    """
+    from game import settings
+
+    items = sorted((k, v) for k, v in vars(settings).items() if k.isupper())
+    return hashlib.sha1(repr(items).encode()).hexdigest()[:16]
@@ -0,0 +1,62 @@
+PHASES = (
+    "handle_action",
+    "spawn_targets",
+    "update_entities",
+    "check_collisions",
+    # positioning reward and state are computed in one pass
+    "observe",
+    # positioning reward alone, in tick()
+    "reward",
+    "render",
+)
+
+
+class StepProfiler:
+    """Time and call counts per phase of ``ShootingGameEnv.step``.
+
+    Attach it with ``env.enable_profiling()``; several envs may share one
+    profiler. Totals keep growing until ``reset()``.
+    """
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.totals = dict.fromkeys(PHASES, 0.0)
+        self.calls = dict.fromkeys(PHASES, 0)
+
+    @property
+    def steps(self):
+        # every tick handles exactly one action
+        return self.calls["handle_action"]
+
+    def add(self, phase, seconds):
+        self.totals[phase] += seconds
+        self.calls[phase] += 1
+
+    def stats(self):
+        """{phase: {"calls", "total_s", "mean_us", "share"}} plus "steps"."""
+        total = sum(self.totals.values())
+        stats = {"steps": self.steps}
+        for phase in PHASES:
+            calls = self.calls[phase]
+            seconds = self.totals[phase]
+            stats[phase] = {
+                "calls": calls,
+                "total_s": seconds,
+                "mean_us": seconds / calls * 1e6 if calls else 0.0,
+                "share": seconds / total if total else 0.0,
+            }
+        return stats
+
+    def format(self):
+        stats = self.stats()
+        lines = [f"{'phase':18s} {'calls':>9s} {'total ms':>10s} {'us/call':>8s} share"]
+        for phase in PHASES:
+            s = stats[phase]
+            if s["calls"]:
+                lines.append(
+                    f"{phase:18s} {s['calls']:9d} {s['total_s'] * 1e3:10.1f} "
+                    f"{s['mean_us']:8.2f} {s['share']:6.1%}"
+                )
+        return "\n".join(lines)
@@ -0,0 +1,355 @@
+from .settings import *
+from .types import *
+import math
+import random
+import numpy as np
+
+PLAYER_WIDTH = 50
+PLAYER_HEIGHT = 30
+BULLET_WIDTH = 5
+BULLET_HEIGHT = 10
+
+_NO_KEY = np.iinfo(np.int64).max
+
+
+def _pg_round(values):
+    """Round like ``pygame.Rect`` does when a float is assigned to it."""
+    return np.where(values >= 0, np.floor(values + 0.5), -np.floor(0.5 - values))
+
+
+def _overlap(ax, ay, aw, ah, bx, by, bw, bh):
+    """Vectorized ``pygame.Rect.colliderect`` for positive-sized rects."""
+    return (ax < bx + bw) & (ax + aw > bx) & (ay < by + bh) & (ay + ah > by)
+
+
+class VecShootingGameEnv:
+    """``num_envs`` independent ``ShootingGameEnv`` games stepped in lockstep.
+
+    Player, target and bullet state lives in struct-of-arrays NumPy buffers
+    (one row per game, one column per entity slot). Every game owns its own
+    ``random.Random`` seeded like the scalar env, so a row produces the same
+    states, rewards and scores as ``ShootingGameEnv(seed=seeds[i], ...)``
+    fed the same actions. Finished games are reset automatically.
+    """
+
+    def __init__(
+        self,
+        num_envs=1,
+        seed=1,
+        seeds=None,
+        max_steps=-1,
+        true_seed=False,
+        endless=False,
+    ):
+        if seeds is None:
+            seeds = [seed + i for i in range(num_envs)]
+        if len(seeds) != num_envs:
+            raise ValueError("len(seeds) must be equal to num_envs")
+
+        self.num_envs = num_envs
+        self.max_steps = max_steps
+        self.true_seed = true_seed
+        self.endless = endless
+        self._seeds = list(seeds)
+        self._random = [random.Random(s) for s in self._seeds]
+        self._rows = np.arange(num_envs)
+
+        n = num_envs
+        self.player_x = np.zeros(n, dtype=np.int64)
+        self.player_y = HEIGHT - 50
+        self.shoot_cooldown = np.zeros(n, dtype=np.int64)
+        self.last_action = np.zeros(n, dtype=np.int64)
+        self.score = np.zeros(n, dtype=np.int64)
+        self.ticks = np.zeros(n, dtype=np.int64)
+        self.target_spawn_timer = np.zeros(n, dtype=np.int64)
+        self.target_spawn_delay = SPAWN_RATE
+        self.done = np.zeros(n, dtype=bool)
+        self._next_seq = np.zeros(n, dtype=np.int64)
+
+        # targets fall for (HEIGHT + TARGET_SIZE) / speed ticks, one spawns
+        # every SPAWN_RATE ticks; buffers grow if this estimate is too small
+        # (settings may be floats, slot counts must be ints)
+        lifetime = math.ceil((HEIGHT + 2 * TARGET_SIZE) / max(TARGET_SPEED_MIN, 1)) + 1
+        target_slots = int(lifetime // max(SPAWN_RATE, 1)) + 2
+        self.target_x = np.zeros((n, target_slots), dtype=np.int64)
+        self.target_y = np.zeros((n, target_slots), dtype=np.int64)
+        self.target_speed = np.zeros((n, target_slots), dtype=np.float64)
+        self.target_ally = np.zeros((n, target_slots), dtype=bool)
+        self.target_alive = np.zeros((n, target_slots), dtype=bool)
+        self.target_seq = np.zeros((n, target_slots), dtype=np.int64)
+
+        bullet_slots = 4
+        self.bullet_x = np.zeros((n, bullet_slots), dtype=np.int64)
+        self.bullet_y = np.zeros((n, bullet_slots), dtype=np.int64)
+        self.bullet_alive = np.zeros((n, bullet_slots), dtype=bool)
+        self.bullet_seq = np.zeros((n, bullet_slots), dtype=np.int64)
+
+        self.terminal_states = np.zeros((n, 9), dtype=np.float32)
+        self.reset()
+
+    def reset(self, mask=None):
+        """Reset all games (or those selected by ``mask``) and return states."""
+        self._reset_rows(self._rows if mask is None else np.flatnonzero(mask))
+        return self.get_state()
+
+    def _reset_rows(self, idx):
+        if self.true_seed:
+            for i in idx:
+                self._random[i] = random.Random(self._seeds[i])
+
+        self.player_x[idx] = WIDTH // 2 - 25
+        self.shoot_cooldown[idx] = 0
+        self.last_action[idx] = Action.NONE.value
+        self.score[idx] = 0
+        self.ticks[idx] = 0
+        self.target_spawn_timer[idx] = 0
+        self.done[idx] = False
+        self._next_seq[idx] = 0
+        self.target_alive[idx] = False
+        self.bullet_alive[idx] = False
+
+    def step(self, actions):
+        rewards = self._tick(actions)
+        states = self.get_state()
+        scores = self.score.copy()
+        dones = self.done.copy()
+
+        if dones.any():
+            self.terminal_states[dones] = states[dones]
+            self._reset_rows(np.flatnonzero(dones))
+            states[dones] = self.get_state()[dones]
+
+        # states, rewards, scores, dones
+        return states, rewards, scores, dones
+
+    def tick(self, actions):
+        """Like ``step`` without building the observations.
+
+        Returns (rewards, scores, dones); finished games are reset as well.
+        """
+        rewards = self._tick(actions)
+        scores = self.score.copy()
+        dones = self.done.copy()
+        if dones.any():
+            self._reset_rows(np.flatnonzero(dones))
+        return rewards, scores, dones
+
+    def _tick(self, actions):
+        actions = np.asarray(actions, dtype=np.int64)
+        self.last_action[:] = actions
+        prev_player_x = self.player_x + PLAYER_WIDTH // 2
+
+        self._handle_actions(actions)
+        self._spawn_targets()
+        self._update_entities()
+        self._check_collisions()
+
+        rewards = self._calculate_positioning_rewards(prev_player_x)
+
+        if self.max_steps > 0:
+            self.done |= self.ticks > self.max_steps
+
+        if not self.endless:
+            self.done |= (self.score < -500) | (self.score >= 300)
+
+        self.ticks += 1
+        return rewards
+
+    def get_state(self):
+        MAX_ALLIES = 3
+        rows = self._rows[:, None]
+        player_cx = self.player_x + PLAYER_WIDTH // 2
+        player_cy = self.player_y + PLAYER_HEIGHT // 2
+
+        move_dir = np.zeros(self.num_envs, dtype=np.float64)
+        move_dir[self.last_action == Action.LEFT.value] = -1
+        move_dir[self.last_action == Action.RIGHT.value] = 1
+
+        keys = self._ally_keys(player_cy)
+        slots = min(MAX_ALLIES, keys.shape[1])
+        order = np.argsort(keys, axis=1, kind="stable")[:, :slots]
+        valid = keys[rows, order] != _NO_KEY
+        ally_cx = self.target_x[rows, order] + TARGET_SIZE // 2
+        ally_cy = self.target_y[rows, order] + TARGET_SIZE // 2
+
+        state = np.empty((self.num_envs, 3 + 2 * MAX_ALLIES), dtype=np.float64)
+        state[:, 0] = player_cx / WIDTH
+        state[:, 1] = move_dir
+        x_diff = np.abs(ally_cx[:, 0] - player_cx) / WIDTH
+        state[:, 2] = np.where(valid[:, 0], np.maximum(0.0, 1.0 - x_diff * 2), 0.0)
+        state[:, 3::2] = 0.0
+        state[:, 4::2] = -2.0  # default
+        state[:, 3 : 3 + 2 * slots : 2] = np.where(
+            valid, (ally_cx - player_cx[:, None]) / WIDTH, 0.0
+        )
+        state[:, 4 : 4 + 2 * slots : 2] = np.where(
+            valid, (ally_cy - player_cy) / HEIGHT, -2.0
+        )
+
+        return state.astype(np.float32)
+
+    def close(self):
+        pass
+
+    def _ally_keys(self, player_cy):
+        # sort key reproducing the scalar env's stable sort by vertical
+        # distance: ties are broken by spawn order
+        dy = np.abs(self.target_y + TARGET_SIZE // 2 - player_cy)
+        keys = (dy << 32) + self.target_seq
+        return np.where(self.target_alive & self.target_ally, keys, _NO_KEY)
+
+    def _calculate_positioning_rewards(self, prev_player_x):
+        player_cx = self.player_x + PLAYER_WIDTH // 2
+        player_cy = self.player_y + PLAYER_HEIGHT // 2
+
+        keys = self._ally_keys(player_cy)
+        closest = np.argmin(keys, axis=1)
+        has_ally = keys[self._rows, closest] != _NO_KEY
+        ally_cx = self.target_x[self._rows, closest] + TARGET_SIZE // 2
+
+        current_x_diff = np.abs(player_cx - ally_cx)
+        prev_x_diff = np.abs(prev_player_x - ally_cx)
+
+        rewards = np.where(current_x_diff < 30, 0.5, 0.0)
+        rewards = np.where(current_x_diff > prev_x_diff, -0.1, rewards)
+        rewards = np.where(current_x_diff < prev_x_diff, 0.2, rewards)
+        return np.where(has_ally, rewards, 0.0)
+
+    def _handle_actions(self, actions):
+        x = self.player_x
+
+        left = (actions == Action.LEFT.value) & (x > 0)
+        x[left] = np.maximum(0, x[left] - PLAYER_SPEED)
+
+        right = (actions == Action.RIGHT.value) & (x + PLAYER_WIDTH < WIDTH)
+        x[right] = np.minimum(WIDTH - PLAYER_WIDTH, x[right] + PLAYER_SPEED)
+
+        shoot = actions == Action.SHOOT.value
+        fire = shoot & (self.shoot_cooldown <= 0)
+        if fire.any():
+            self.shoot_cooldown[fire] = SHOOT_COOLDOWN_SECONDS
+            idx = np.flatnonzero(fire)
+            slots = self._free_slots(idx, "bullet")
+            self.bullet_x[idx, slots] = x[idx] + PLAYER_WIDTH // 2 - 2
+            self.bullet_y[idx, slots] = self.player_y
+            self.bullet_alive[idx, slots] = True
+            self.bullet_seq[idx, slots] = self._next_seq[idx]
+            self._next_seq[idx] += 1
+
+        idle = (
+            (actions != Action.LEFT.value)
+            & (actions != Action.RIGHT.value)
+            & ~shoot
+            & (self.shoot_cooldown > 0)
+        )
+        self.shoot_cooldown[idle] -= 1
+
+    def _spawn_targets(self):
+        self.target_spawn_timer += 1
+        spawning = self.target_spawn_timer >= self.target_spawn_delay
+        if not spawning.any():
+            return
+
+        self.target_spawn_timer[spawning] = 0
+        idx = np.flatnonzero(spawning)
+        slots = self._free_slots(idx, "target")
+        for i, slot in zip(idx, slots):
+            rng = self._random[i]
+            self.target_x[i, slot] = rng.randint(0, WIDTH - TARGET_SIZE)
+            self.target_ally[i, slot] = not rng.random() > SPAWN_CHANCE_ALLY
+            self.target_speed[i, slot] = rng.uniform(TARGET_SPEED_MIN, TARGET_SPEED_MAX)
+        self.target_y[idx, slots] = -TARGET_SIZE
+        self.target_alive[idx, slots] = True
+        self.target_seq[idx, slots] = self._next_seq[idx]
+        self._next_seq[idx] += 1
+
+    def _update_entities(self):
+        self.bullet_y -= BULLET_SPEED
+        self.bullet_alive &= self.bullet_y + BULLET_HEIGHT >= 0
+
+        y = _pg_round(self.target_y + self.target_speed).astype(np.int64)
+        self.target_y = np.where(self.target_alive, y, self.target_y)
+        off_screen = self.target_alive & (self.target_y > HEIGHT)
+        if off_screen.any():
+            penalty = np.where(
+                self.target_ally, NO_COLLISION_REWARD_ALLY, NO_COLLISION_REWARD_OPPONENT
+            )
+            self.score += np.where(off_screen, penalty, 0).sum(axis=1)
+            self.target_alive &= ~off_screen
+
+    def _check_collisions(self):
+        rows = self._rows
+
+        # bullets hit the first target (in spawn order) they overlap,
+        # bullets themselves are resolved in the order they were fired
+        bullet_count = int(self.bullet_alive.sum(axis=1).max())
+        if bullet_count and self.target_alive.any():
+            bullet_keys = np.where(self.bullet_alive, self.bullet_seq, _NO_KEY)
+            bullet_order = np.argsort(bullet_keys, axis=1, kind="stable")
+            for k in range(bullet_count):
+                b = bullet_order[:, k]
+                hit = (
+                    self.bullet_alive[rows, b][:, None]
+                    & self.target_alive
+                    & _overlap(
+                        self.bullet_x[rows, b][:, None],
+                        self.bullet_y[rows, b][:, None],
+                        BULLET_WIDTH,
+                        BULLET_HEIGHT,
+                        self.target_x,
+                        self.target_y,
+                        TARGET_SIZE,
+                        TARGET_SIZE,
+                    )
+                )
+                self._remove_first_hit(
+                    hit,
+                    np.where(
+                        self.target_ally, SHOOT_REWARD_ALLY, SHOOT_REWARD_OPPONENT
+                    ),
+                    bullets=b,
+                )
+
+        # at most one target collides with the player per tick
+        hit = self.target_alive & _overlap(
+            self.player_x[:, None],
+            self.player_y,
+            PLAYER_WIDTH,
+            PLAYER_HEIGHT,
+            self.target_x,
+            self.target_y,
+            TARGET_SIZE,
+            TARGET_SIZE,
+        )
+        self._remove_first_hit(
+            hit,
+            np.where(
+                self.target_ally, COLLISION_REWARD_ALLY, COLLISION_REWARD_OPPONENT
+            ),
+        )
+
+    def _remove_first_hit(self, hit, rewards, bullets=None):
+        any_hit = hit.any(axis=1)
+        if not any_hit.any():
+            return
+
+        first = np.argmin(np.where(hit, self.target_seq, _NO_KEY), axis=1)
+        idx = np.flatnonzero(any_hit)
+        self.score[idx] += rewards[idx, first[idx]]
+        self.target_alive[idx, first[idx]] = False
+        if bullets is not None:
+            self.bullet_alive[idx, bullets[idx]] = False
+
+    def _free_slots(self, idx, kind):
+        alive = getattr(self, f"{kind}_alive")
+        if alive[idx].all(axis=1).any():
+            self._grow(kind)
+            alive = getattr(self, f"{kind}_alive")
+        return np.argmin(alive[idx], axis=1)
+
+    def _grow(self, kind):
+        for name in ("x", "y", "speed", "ally", "alive", "seq"):
+            attr = f"{kind}_{name}"
+            if hasattr(self, attr):
+                buf = getattr(self, attr)
+                setattr(self, attr, np.concatenate([buf, np.zeros_like(buf)], axis=1))
@@ -0,0 +1,19 @@
+class FrameSkip:
+    """Env wrapper that repeats every action for ``k`` ticks.
+
+    ``step`` returns the observation after the last tick and the reward
+    summed over all of them (see ``ShootingGameEnv.step_n``); everything else
+    is forwarded to the wrapped env.
+    """
+
+    def __init__(self, env, k):
+        if k < 1:
+            raise ValueError("k must be at least 1")
+        self.env = env
+        self.k = k
+
+    def step(self, action, out=None):
+        return self.env.step_n(action, self.k, out)
+
+    def __getattr__(self, name):
+        return getattr(self.env, name)
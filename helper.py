@@ -1,6 +1,3 @@
-import matplotlib.pyplot as plt
-
-
 def loading(curr, all=100, chars=50):
     done = int((curr * 50) / all)
     undone = chars - done
@@ -8,6 +5,8 @@ def loading(curr, all=100, chars=50):
 
 
 def plot(scores, mean_scores):
+    import matplotlib.pyplot as plt
+
     plt.figure(figsize=(10, 5))
     plt.title("Training")
     plt.xlabel("Number of Games")
@@ -0,0 +1,321 @@
+"""Throughput benchmarks for the env, the DQN learner and the GA trainer.
+
+Every benchmark runs with fixed seeds and reports the best of a few repeats.
+Results are written as JSON and compared against a stored baseline; a metric
+that got worse than its threshold allows fails the run.
+
+    python -m tests.benchmark [--quick] [--out results.json]
+    python -m tests.benchmark --save-baseline   # store this machine's numbers
+"""
+
+import argparse
+import json
+import platform
+import random
+import sys
+import time
+from os import path
+
+import numpy as np
+
+from game.core_ai import ShootingGameEnv
+
+BASELINE = path.join(path.dirname(__file__), "benchmark_baseline.json")
+SEED = 7
+# allowed slowdown relative to the baseline, per metric prefix
+THRESHOLD = 0.15
+THRESHOLDS = {"pygad": 0.25, "train_step": 0.25}
+REPEATS = 5
+QUICK_REPEATS = 3
+
+# name -> (spawn delay, actions); the default game spawns every 60 ticks
+DENSITIES = {
+    "sparse": (60, (1, 2)),
+    "dense": (10, (0, 1, 2, 3)),
+    "stress": (2, (0, 1, 2, 3)),
+}
+BATCH_SIZES = (1, 64, 256, 1000)
+
+
+def best_time(func, quick):
+    best = float("inf")
+    for _ in range(QUICK_REPEATS if quick else REPEATS):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def _endless_env(spawn_delay):
+    env = ShootingGameEnv(seed=SEED, true_seed=True, endless=True)
+    env.target_spawn_delay = spawn_delay
+    return env
+
+
+def bench_env_step(quick):
+    steps = 5_000 if quick else 30_000
+    results = {}
+    for name, (spawn_delay, choices) in DENSITIES.items():
+        rng = random.Random(SEED)
+        actions = [rng.choice(choices) for _ in range(steps)]
+
+        def run():
+            step = _endless_env(spawn_delay).step
+            for action in actions:
+                step(action)
+
+        seconds = best_time(run, quick)
+        results[f"env_step.{name}"] = (steps / seconds, "steps/s", "higher")
+    return results
+
+
+def bench_get_state(quick):
+    calls = 5_000 if quick else 50_000
+    results = {}
+    for name, (spawn_delay, choices) in DENSITIES.items():
+        env = _endless_env(spawn_delay)
+        rng = random.Random(SEED)
+        # let targets fill the screen first
+        for _ in range(400):
+            env.step(rng.choice(choices))
+        out = np.zeros(9, dtype=np.float32)
+
+        def run(out=None):
+            get_state = env.get_state
+            for _ in range(calls):
+                get_state(out)
+
+        seconds = best_time(run, quick)
+        results[f"get_state.{name}"] = (seconds / calls * 1e6, "us", "lower")
+        seconds = best_time(lambda: run(out), quick)
+        results[f"get_state.{name}.out"] = (seconds / calls * 1e6, "us", "lower")
+    return results
+
+
+def bench_train_step(quick):
+    import torch
+    from training.rl.model import Linear_QNet, QTrainer
+
+    torch.manual_seed(SEED)
+    rng = np.random.default_rng(SEED)
+    results = {}
+    for batch_size in BATCH_SIZES:
+        trainer = QTrainer(Linear_QNet(9, 512, 2), lr=0.005, gamma=0.95)
+        batch = (
+            rng.random((batch_size, 9), dtype=np.float32),
+            rng.integers(0, 2, batch_size),
+            rng.standard_normal(batch_size).astype(np.float32),
+            rng.random((batch_size, 9), dtype=np.float32),
+            rng.random(batch_size) < 0.05,
+        )
+        calls = max(3, (200 if quick else 1000) // batch_size)
+
+        def run():
+            for _ in range(calls):
+                trainer.train_step(*batch)
+
+        seconds = best_time(run, quick)
+        results[f"train_step.batch_{batch_size}"] = (
+            seconds / calls * 1e3,
+            "ms",
+            "lower",
+        )
+    return results
+
+
+def bench_get_action(quick):
+    import torch
+    from training.rl.agent import Agent
+
+    torch.manual_seed(SEED)
+    random.seed(SEED)
+    agent = Agent()
+    agent.epsilon = agent.epsilon_min = 0.0  # always run the network
+    env = _endless_env(DENSITIES["dense"][0])
+    states = [env.step(random.choice((1, 2)))[0] for _ in range(256)]
+    calls = 2_000 if quick else 10_000
+
+    def run():
+        get_action = agent.get_action
+        for i in range(calls):
+            get_action(states[i & 255])
+
+    seconds = best_time(run, quick)
+    results = {"get_action": (seconds / calls * 1e6, "us", "lower")}
+
+    # the same network through the torch-free engine
+    from training.rl.inference import NumpyQNet
+
+    act = NumpyQNet.from_model(agent.model).act
+
+    def run_numpy():
+        for i in range(calls):
+            act(states[i & 255])
+
+    seconds = best_time(run_numpy, quick)
+    results["get_action.numpy"] = (seconds / calls * 1e6, "us", "lower")
+    return results
+
+
+def bench_pygad(quick):
+    import pygad
+    import training.pygad_train as trainer
+    from training.ga_stats import GenerationStats
+
+    population = 50 if quick else 200
+    generations = 2 if quick else 5
+    trainer.env = ShootingGameEnv(seed=trainer.env_seed, true_seed=True)
+    trainer.cache = None
+    trainer.stats = GenerationStats(generations)
+    stamps = []
+
+    ga = pygad.GA(
+        num_generations=generations,
+        num_parents_mating=population // 2,
+        sol_per_pop=population,
+        mutation_by_replacement=True,
+        mutation_percent_genes=20,
+        parent_selection_type="tournament",
+        num_genes=trainer.sequence_length,
+        keep_elitism=10,
+        K_tournament=min(50, population // 4),
+        gene_space=[1, 2],
+        fitness_func=trainer.fitness_func_detailed,
+        on_generation=lambda ga: stamps.append(time.perf_counter()),
+        random_seed=SEED,
+    )
+    start = time.perf_counter()
+    ga.run()
+    # the first generation also scores the initial population
+    per_generation = np.diff([start] + stamps)
+    return {
+        "pygad.generation": (float(np.min(per_generation[1:])), "s", "lower"),
+        "pygad.first_generation": (float(per_generation[0]), "s", "lower"),
+    }
+
+
+# (name, function, optional dependency it needs)
+BENCHMARKS = [
+    ("env_step", bench_env_step, None),
+    ("get_state", bench_get_state, None),
+    ("train_step", bench_train_step, "torch"),
+    ("get_action", bench_get_action, "torch"),
+    ("pygad", bench_pygad, "pygad"),
+]
+
+
+def run(names=None, quick=False):
+    results = {}
+    for name, bench, dependency in BENCHMARKS:
+        if names and name not in names:
+            continue
+        if dependency is not None:
+            try:
+                __import__(dependency)
+            except ImportError:
+                print(f"skip {name:12s} ({dependency} is not installed)")
+                continue
+        start = time.perf_counter()
+        for metric, (value, unit, better) in bench(quick).items():
+            results[metric] = {"value": value, "unit": unit, "better": better}
+        print(f"done {name:12s} {time.perf_counter() - start:6.1f} s")
+    return results
+
+
+def metadata(quick):
+    versions = {}
+    for module in ("numpy", "torch", "pygad"):
+        try:
+            versions[module] = __import__(module).__version__
+        except ImportError:
+            pass
+    return {
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "processor": platform.processor(),
+        "seed": SEED,
+        "quick": quick,
+        "versions": versions,
+        "time": time.strftime("%Y-%m-%d %H:%M:%S"),
+    }
+
+
+def threshold_for(metric, default):
+    for prefix, value in THRESHOLDS.items():
+        if metric.startswith(prefix):
+            return max(value, default)
+    return default
+
+
+def compare(results, baseline, threshold=THRESHOLD):
+    """Print every metric against the baseline; False if one regressed."""
+    ok = True
+    for metric, result in results.items():
+        value, unit = result["value"], result["unit"]
+        line = f"{metric:28s} {value:12.3f} {unit:8s}"
+        base = baseline.get(metric)
+        if base is None:
+            print(f"new  {line}")
+            continue
+        # > 0 means slower than the baseline
+        if result["better"] == "higher":
+            change = base["value"] / value - 1
+        else:
+            change = value / base["value"] - 1
+        limit = threshold_for(metric, threshold)
+        passed = change <= limit
+        ok = ok and passed
+        print(
+            f"{'ok  ' if passed else 'FAIL'} {line} baseline {base['value']:12.3f} "
+            f"({-change:+.1%}, limit {-limit:+.0%})"
+        )
+    return ok
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--quick", action="store_true", help="fewer iterations")
+    parser.add_argument(
+        "--only",
+        nargs="+",
+        choices=[name for name, _, _ in BENCHMARKS],
+        help="run only these benchmarks",
+    )
+    parser.add_argument("--out", help="write the results to this JSON file")
+    parser.add_argument("--baseline", default=BASELINE)
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=THRESHOLD,
+        help="allowed slowdown as a fraction, e.g. 0.15",
+    )
+    parser.add_argument(
+        "--save-baseline",
+        action="store_true",
+        help="store the results as the new baseline instead of comparing",
+    )
+    args = parser.parse_args()
+
+    report = {"meta": metadata(args.quick), "results": run(args.only, args.quick)}
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(report, f, indent=2)
+
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Baseline saved to {args.baseline}")
+        sys.exit(0)
+
+    if not path.exists(args.baseline):
+        print(f"No baseline at {args.baseline}, run with --save-baseline first")
+        compare(report["results"], {})
+        sys.exit(0)
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    if baseline["meta"].get("quick") != args.quick:
+        print("Note: baseline and this run differ in --quick")
+    sys.exit(
+        0 if compare(report["results"], baseline["results"], args.threshold) else 1
+    )
@@ -0,0 +1,84 @@
+"""Import-time budget for headless code paths.
+
+Every check runs in a fresh interpreter, times its snippet and lists which
+heavy optional dependencies ended up in ``sys.modules``. A check fails if it
+exceeds its time budget or loads a module it must not need.
+
+    python -m tests.import_budget [--scale 2.0]
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+
+HEAVY_MODULES = ("pygame", "torch", "matplotlib", "pygad")
+
+# (name, snippet, budget in seconds, modules that must stay unloaded)
+CHECKS = [
+    (
+        "headless env creation",
+        "from game import ShootingGameEnv; ShootingGameEnv().step(1)",
+        0.5,
+        HEAVY_MODULES,
+    ),
+    (
+        "game settings",
+        "import game.settings",
+        0.1,
+        HEAVY_MODULES + ("numpy",),
+    ),
+    (
+        "rl agent module",
+        "import training.rl.agent",
+        0.5,
+        HEAVY_MODULES,
+    ),
+    (
+        "pygad trainer module",
+        "import training.pygad_train",
+        0.5,
+        HEAVY_MODULES,
+    ),
+]
+
+_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+exec({snippet!r})
+elapsed = time.perf_counter() - start
+loaded = [m for m in {modules!r} if m in sys.modules]
+print(json.dumps({{"elapsed": elapsed, "loaded": loaded}}))
+"""
+
+
+def measure(snippet, modules):
+    code = _PROBE.format(snippet=snippet, modules=tuple(modules))
+    out = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True
+    )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def run(scale=1.0):
+    ok = True
+    for name, snippet, budget, forbidden in CHECKS:
+        result = measure(snippet, forbidden)
+        limit = budget * scale
+        passed = result["elapsed"] <= limit and not result["loaded"]
+        ok = ok and passed
+        loaded = f" loaded: {', '.join(result['loaded'])}" if result["loaded"] else ""
+        print(
+            f"{'ok  ' if passed else 'FAIL'} {name:24s} "
+            f"{result['elapsed'] * 1000:7.1f} ms (budget {limit * 1000:.0f} ms){loaded}"
+        )
+    return ok
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--scale", type=float, default=1.0, help="multiply every budget (slow CI)"
+    )
+    args = parser.parse_args()
+    sys.exit(0 if run(args.scale) else 1)
@@ -0,0 +1,62 @@
+import numpy as np
+import pytest
+import torch
+
+from game.core_ai import ShootingGameEnv
+from training.rl import agent
+from training.rl.checkpoint import latest_checkpoint, list_checkpoints, load_checkpoint
+
+
+def assert_same(actual, expected, where="state"):
+    """Nested checkpoint states hold exactly the same values."""
+    if isinstance(expected, dict):
+        assert actual.keys() == expected.keys(), where
+        for key in expected:
+            assert_same(actual[key], expected[key], f"{where}[{key!r}]")
+    elif isinstance(expected, (list, tuple)):
+        assert len(actual) == len(expected), where
+        for i, (a, e) in enumerate(zip(actual, expected)):
+            assert_same(a, e, f"{where}[{i}]")
+    elif isinstance(expected, torch.Tensor):
+        assert torch.equal(actual, expected), where
+    elif isinstance(expected, np.ndarray):
+        np.testing.assert_array_equal(actual, expected, err_msg=where)
+    else:
+        assert actual == expected, where
+
+
+@pytest.fixture
+def train(monkeypatch, tmp_path):
+    """``agent.train`` on short episodes, checkpoints every 2 episodes."""
+    monkeypatch.setattr(
+        agent,
+        "ShootingGameEnv",
+        lambda **kwargs: ShootingGameEnv(**dict(kwargs, max_steps=300)),
+    )
+    monkeypatch.setattr(agent, "SEED", 3)
+    monkeypatch.setattr(agent, "MAX_MEMORY", 5000)
+    monkeypatch.setattr(agent, "CHECKPOINT_EVERY", 2)
+    monkeypatch.setattr(agent, "CHECKPOINT_KEEP", 10)
+
+    def train(model_dir, episodes, resume=None):
+        monkeypatch.setattr(agent, "MODEL_DIR", str(tmp_path / model_dir))
+        monkeypatch.setattr(agent, "EPISODES", episodes)
+        return agent.train(resume)
+
+    return train
+
+
+def test_resume_continues_exactly(train, tmp_path):
+    straight = train("straight", 4)
+    # stop after the checkpoint at episode 2, then resume from it
+    train("resumed", 2)
+    resumed = train("resumed", 4, resume="latest")
+    assert resumed == straight
+
+    directory = tmp_path / "resumed" / "checkpoints"
+    assert len(list_checkpoints(directory)) == 2
+    expected = load_checkpoint(latest_checkpoint(tmp_path / "straight" / "checkpoints"))
+    actual = load_checkpoint(latest_checkpoint(directory))
+    assert actual["episode"] == 4
+    # weights, optimizer, RNG states, replay memory, env and statistics
+    assert_same(actual, expected)
@@ -0,0 +1,119 @@
+import random
+
+import numpy as np
+import pytest
+
+from game.core_ai import ALLY, ShootingGameEnv
+from game.settings import HEIGHT, WIDTH
+
+# ticks, final score, summed reward, score every 250 ticks and final state of
+# a seeded random game, as played by the pygame-based env
+TRAJECTORIES = {
+    1: (
+        3000,
+        -330,
+        165.8,
+        [0, -20, 0, -30, -60, -120, -100, -160, -190, -170, -180, -250],
+        [0.7125, 0.0, 0.335, -0.3325, -0.126667, -0.235, -0.526667, -0.35, -0.926667],
+    ),
+    7: (
+        2505,
+        -520,
+        77.3,
+        [0, -10, -90, -110, -120, -170, -240, -280, -340, -410, -500],
+        [0.1875, 0.0, 0.73, -0.135, -0.626667, 0.0, -2.0, 0.0, -2.0],
+    ),
+}
+
+
+def play(env, seed, max_ticks=3000):
+    rng = random.Random(seed)
+    scores = []
+    rewards = []
+    while not env.done and len(scores) < max_ticks:
+        state, reward, score, done = env.step(rng.randrange(4))
+        scores.append(score)
+        rewards.append(reward)
+    return scores, rewards, state
+
+
+@pytest.mark.parametrize("seed", sorted(TRAJECTORIES))
+def test_seeded_trajectory(seed):
+    ticks, final_score, total_reward, sampled_scores, final_state = TRAJECTORIES[seed]
+    env = ShootingGameEnv(seed=seed, true_seed=True)
+    env.reset()
+    scores, rewards, state = play(env, seed)
+    assert len(scores) == ticks
+    assert scores[-1] == final_score
+    assert sum(rewards) == pytest.approx(total_reward)
+    assert scores[::250] == sampled_scores
+    np.testing.assert_allclose(state, final_state, atol=1e-6)
+
+
+def test_reset_replays_the_same_game():
+    env = ShootingGameEnv(seed=7, true_seed=True)
+    env.reset()
+    first = play(env, 7, max_ticks=500)
+    env.reset()
+    second = play(env, 7, max_ticks=500)
+    assert first[0] == second[0]
+    assert first[1] == second[1]
+
+
+def reference_observation(env, prev_player_x):
+    # state and reward built the straightforward way: sort all allies
+    player_cx = env.player.x + env.player.width // 2
+    player_cy = env.player.y + env.player.height // 2
+    move_dir = {1: -1.0, 2: 1.0}.get(env.last_action, 0.0)
+    state = [player_cx / WIDTH, move_dir, 0.0, 0.0, -2.0, 0.0, -2.0, 0.0, -2.0]
+    allies = sorted(
+        (abs(t.y + 15 - player_cy), t.seq, t)
+        for t in env.targets
+        if t.target_type is ALLY
+    )
+    reward = 0.0
+    for i, (_, _, ally) in enumerate(allies[:3]):
+        state[3 + 2 * i] = (ally.x + 15 - player_cx) / WIDTH
+        state[4 + 2 * i] = (ally.y + 15 - player_cy) / HEIGHT
+    if allies:
+        ally_x = allies[0][2].x + 15
+        current_x_diff = abs(player_cx - ally_x)
+        prev_x_diff = abs(prev_player_x - ally_x)
+        state[2] = max(0.0, 1.0 - current_x_diff / WIDTH * 2)
+        if current_x_diff < prev_x_diff:
+            reward = 0.2
+        elif current_x_diff > prev_x_diff:
+            reward = -0.1
+        elif current_x_diff < 30:
+            reward = 0.5
+    return np.array(state, dtype=np.float32), reward
+
+
+@pytest.mark.parametrize("seed", [1, 7])
+def test_observation_and_reward(seed):
+    env = ShootingGameEnv(seed=seed, true_seed=True)
+    ticked = ShootingGameEnv(seed=seed, true_seed=True)
+    env.reset()
+    ticked.reset()
+    rng = random.Random(seed)
+    out = np.empty(9, dtype=np.float32)
+    while not env.done:
+        action = rng.randrange(4)
+        prev_player_x = env.player.x + env.player.width // 2
+        state, reward, _, _ = env.step(action, out)
+        assert state is out
+        expected_state, expected_reward = reference_observation(env, prev_player_x)
+        np.testing.assert_array_equal(state, expected_state)
+        np.testing.assert_array_equal(env.get_state(), expected_state)
+        assert reward == expected_reward
+        assert ticked.tick(action) == reward
+
+
+def test_get_state_writes_into_batch_rows():
+    envs = [ShootingGameEnv(seed=seed, true_seed=True) for seed in (1, 2, 3)]
+    states = np.zeros((len(envs), 9), dtype=np.float32)
+    for _ in range(200):
+        for i, env in enumerate(envs):
+            env.step(3, states[i])
+    for i, env in enumerate(envs):
+        np.testing.assert_array_equal(states[i], env.get_state())
@@ -0,0 +1,97 @@
+import json
+
+import numpy as np
+import pytest
+
+from training.dataset import INDEX, TrajectoryDataset, TrajectoryWriter
+
+CHUNK_SIZE = 7
+
+
+def transitions(count, seed=0):
+    """Random transitions; the rewards number the rows."""
+    rng = np.random.default_rng(seed)
+    return (
+        rng.standard_normal((count, 9), dtype=np.float32),
+        rng.integers(0, 4, count),
+        np.arange(count, dtype=np.float32),
+        rng.standard_normal((count, 9), dtype=np.float32),
+        rng.random(count) < 0.2,
+    )
+
+
+def write(directory, data, start, end):
+    with TrajectoryWriter(directory, chunk_size=CHUNK_SIZE) as writer:
+        for row in zip(*(column[start:end] for column in data)):
+            writer.append(*row)
+
+
+def test_append_and_reopen(tmp_path):
+    data = transitions(30)
+    write(tmp_path, data, 0, 12)
+    # reopening keeps filling the half-written last chunk
+    write(tmp_path, data, 12, 30)
+
+    dataset = TrajectoryDataset(tmp_path, action_index=False)
+    assert len(dataset) == 30
+    assert len(dataset.chunks) == 5
+    assert dataset.episodes == np.count_nonzero(data[4])
+    for column, expected in zip(dataset.get(np.arange(30)), data):
+        np.testing.assert_array_equal(column, expected)
+    episodes = dataset.rows(np.arange(30))["episode"]
+    np.testing.assert_array_equal(episodes, np.cumsum(data[4]) - data[4])
+
+
+def test_extend_matches_append(tmp_path):
+    data = transitions(30)
+    write(tmp_path / "appended", data, 0, 30)
+    with TrajectoryWriter(tmp_path / "extended", chunk_size=CHUNK_SIZE) as writer:
+        writer.extend(*(column[:5] for column in data))
+        writer.extend(*(column[5:] for column in data))
+    appended = TrajectoryDataset(tmp_path / "appended")
+    extended = TrajectoryDataset(tmp_path / "extended")
+    np.testing.assert_array_equal(
+        extended.rows(np.arange(30)), appended.rows(np.arange(30))
+    )
+    assert extended.episodes == appended.episodes
+
+
+def test_reopen_with_other_settings(tmp_path):
+    write(tmp_path, transitions(3), 0, 3)
+    with pytest.raises(ValueError, match="state size"):
+        TrajectoryWriter(tmp_path, state_size=5)
+
+    with open(tmp_path / INDEX) as f:
+        index = json.load(f)
+    index["fingerprint"] = "0" * len(index["fingerprint"])
+    with open(tmp_path / INDEX, "w") as f:
+        json.dump(index, f)
+    with pytest.raises(ValueError, match="different game settings"):
+        TrajectoryWriter(tmp_path)
+
+
+def test_empty_dataset(tmp_path):
+    TrajectoryWriter(tmp_path).close()
+    dataset = TrajectoryDataset(tmp_path)
+    assert len(dataset) == 0
+    assert dataset.episodes == 0
+    assert list(dataset.batches(4)) == []
+    assert dataset.summary()["mean_reward"] == 0.0
+
+
+@pytest.mark.parametrize("shuffle", [False, True])
+@pytest.mark.parametrize("window", [1, 2, 10])
+def test_batches_yield_every_row_once(tmp_path, shuffle, window):
+    data = transitions(40)
+    write(tmp_path, data, 0, 40)
+    dataset = TrajectoryDataset(tmp_path)
+
+    batches = list(dataset.batches(6, shuffle=shuffle, window=window, seed=0))
+    assert [len(batch[0]) for batch in batches[:-1]] == [6] * (len(batches) - 1)
+    rewards = np.concatenate([batch[2] for batch in batches])
+    if shuffle:
+        rewards.sort()
+    np.testing.assert_array_equal(rewards, data[2])
+
+    full = list(dataset.batches(6, shuffle=shuffle, window=window, drop_last=True))
+    assert [len(batch[0]) for batch in full] == [6] * (40 // 6)
@@ -0,0 +1,49 @@
+import numpy as np
+import pytest
+import torch
+from torch.nn.utils import parameters_to_vector
+
+from training.rl.inference import NumpyQNet, export
+from training.rl.model import Linear_QNet
+
+
+def model_and_states(seed, count=2000):
+    torch.manual_seed(seed)
+    model = Linear_QNet(9, 512, 2)
+    states = np.random.default_rng(seed).standard_normal((count, 9), dtype=np.float32)
+    with torch.no_grad():
+        q = model(torch.from_numpy(states)).numpy()
+    return model, states, q
+
+
+def assert_same_actions(actions, q):
+    # where the two Q-values are within float32 rounding either one may win
+    clear = np.abs(q[:, 0] - q[:, 1]) > 1e-5
+    assert clear.mean() > 0.9
+    np.testing.assert_array_equal(np.asarray(actions)[clear], q.argmax(axis=1)[clear])
+
+
+@pytest.mark.parametrize("seed", [0, 1])
+def test_act_matches_torch(seed):
+    model, states, q = model_and_states(seed)
+    engine = NumpyQNet.from_model(model)
+    np.testing.assert_allclose(engine.forward(states), q, rtol=1e-5, atol=1e-5)
+    assert_same_actions([engine.act(state) for state in states], q)
+    assert_same_actions([model.act(state) for state in states], q)
+    assert_same_actions(engine.act_batch(states), q)
+    # float64 states take the allocating path
+    assert_same_actions([engine.act(state.astype(np.float64)) for state in states], q)
+
+
+def test_load_flat_and_export_match_from_model(tmp_path):
+    model, states, q = model_and_states(2, count=200)
+    expected = NumpyQNet.from_model(model).forward(states)
+
+    flat = NumpyQNet.zeros(9, 512, 2)
+    flat.load_flat(parameters_to_vector(model.parameters()).detach().numpy())
+    np.testing.assert_array_equal(flat.forward(states), expected)
+
+    torch.save(model.state_dict(), tmp_path / "model.pth")
+    export(tmp_path / "model.pth", tmp_path / "model.npz")
+    loaded = NumpyQNet.load(tmp_path / "model.npz")
+    np.testing.assert_array_equal(loaded.forward(states), expected)
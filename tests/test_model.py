@@ -0,0 +1,69 @@
+import copy
+
+import numpy as np
+import pytest
+import torch
+
+from training.rl.model import Linear_QNet, QTrainer
+
+GAMMA = 0.9
+
+
+def loop_train_step(trainer, state, action, reward, next_state, done):
+    # the per-sample Bellman targets train_step computed before it was vectorized
+    state = torch.from_numpy(state)
+    next_state = torch.from_numpy(next_state)
+    pred = trainer.model(state)
+    target = pred.clone()
+    for idx in range(len(done)):
+        Q_new = torch.tensor(reward[idx])
+        if not done[idx]:
+            Q_new = reward[idx] + trainer.gamma * torch.max(
+                trainer.model(next_state[idx])
+            )
+        target[idx][action[idx]] = Q_new
+    trainer.optimizer.zero_grad()
+    loss = trainer.criterion(target, pred)
+    loss.backward()
+    trainer.optimizer.step()
+    return loss.item()
+
+
+def batch(size, seed):
+    rng = np.random.default_rng(seed)
+    return (
+        rng.standard_normal((size, 9), dtype=np.float32),
+        rng.integers(0, 2, size),
+        rng.standard_normal(size, dtype=np.float32),
+        rng.standard_normal((size, 9), dtype=np.float32),
+        rng.random(size) < 0.3,
+    )
+
+
+@pytest.mark.parametrize("size", [1, 64])
+def test_vectorized_loss_matches_loop(size):
+    torch.manual_seed(0)
+    model = Linear_QNet(9, 32, 2)
+    vectorized = QTrainer(model, lr=0.001, gamma=GAMMA)
+    loop = QTrainer(copy.deepcopy(model), lr=0.001, gamma=GAMMA)
+
+    for step in range(5):
+        transitions = batch(size, step)
+        loss = vectorized.train_step(*transitions)
+        assert loss == pytest.approx(loop_train_step(loop, *transitions), rel=1e-5)
+    for param, loop_param in zip(model.parameters(), loop.model.parameters()):
+        torch.testing.assert_close(param, loop_param)
+
+
+def test_single_transition_matches_batch_of_one():
+    torch.manual_seed(0)
+    model = Linear_QNet(9, 32, 2)
+    single = QTrainer(model, lr=0.001, gamma=GAMMA)
+    batched = QTrainer(copy.deepcopy(model), lr=0.001, gamma=GAMMA)
+
+    state, action, reward, next_state, done = batch(1, 0)
+    # like Agent.train_short_memory: 1-d states, 1-element action and reward
+    loss = single.train_step(state[0], action, reward, next_state[0], bool(done[0]))
+    assert loss == pytest.approx(
+        batched.train_step(state, action, reward, next_state, done)
+    )
@@ -0,0 +1,146 @@
+from concurrent.futures import ProcessPoolExecutor
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from game.core_ai import ShootingGameEnv
+from game.vec_env import VecShootingGameEnv
+from training import pygad_train
+from training.fitness_cache import FitnessCache
+from training.ga import GeneticAlgorithm
+from training.prefix_cache import PrefixCache
+
+SEED = 7
+
+
+def population(size=12, genes=400, seed=0):
+    return np.random.default_rng(seed).choice([1, 2], (size, genes))
+
+
+@pytest.fixture
+def trainer(monkeypatch):
+    """``pygad_train`` with the globals of a single-process trial."""
+    monkeypatch.setattr(pygad_train, "env", ShootingGameEnv(seed=SEED, true_seed=True))
+    for name in ("pool", "cache", "fitness_cache", "stats"):
+        monkeypatch.setattr(pygad_train, name, None)
+    monkeypatch.setattr(pygad_train, "env_seed", SEED)
+    monkeypatch.setattr(pygad_train, "gene_repeat", 1)
+    return pygad_train
+
+
+@pytest.mark.parametrize("workers", [1, 3])
+def test_pool_matches_serial(trainer, monkeypatch, workers):
+    solutions = population()
+    ga = SimpleNamespace(generations_completed=0)
+    serial = [
+        trainer.fitness_func_detailed(ga, solution, i)
+        for i, solution in enumerate(solutions)
+    ]
+
+    monkeypatch.setattr(trainer, "num_workers", workers)
+    with ProcessPoolExecutor(
+        workers, initializer=trainer._init_worker, initargs=(SEED, 0, 1)
+    ) as pool:
+        monkeypatch.setattr(trainer, "pool", pool)
+        pooled = trainer.fitness_func_batch(ga, solutions, range(len(solutions)))
+    np.testing.assert_array_equal(pooled, serial)
+
+
+def offspring(size=30, genes=600, seed=0):
+    """Mutants of a few parents, so many solutions share long prefixes."""
+    rng = np.random.default_rng(seed)
+    parents = rng.choice([1, 2], (3, genes))
+    children = parents[rng.integers(0, 3, size)]
+    for child in children:
+        mutated = rng.integers(0, genes, 3)
+        child[mutated] = rng.choice([1, 2], 3)
+    return children
+
+
+@pytest.mark.parametrize("repeat", [1, 3])
+@pytest.mark.parametrize("max_snapshots", [4096, 8])
+def test_prefix_cache_matches_no_cache(repeat, max_snapshots):
+    env = ShootingGameEnv(seed=SEED, true_seed=True)
+    cache = PrefixCache(chunk_size=50, max_snapshots=max_snapshots)
+    for solution in offspring():
+        expected = pygad_train.play_solution(env, solution, repeat)
+        ticks = env.ticks
+        assert cache.play(env, solution, repeat) == expected
+        assert cache.last_ticks == ticks
+    assert cache.simulated_ticks < cache.total_ticks
+
+
+@pytest.mark.parametrize("repeat", [1, 3])
+def test_play_population_matches_play_solution(repeat):
+    solutions = offspring(size=16, genes=1000)
+    vec_env = VecShootingGameEnv(len(solutions), seeds=[SEED] * 16, true_seed=True)
+    results = pygad_train.play_population(vec_env, solutions, repeat)
+    env = ShootingGameEnv(seed=SEED, true_seed=True)
+    for solution, result in zip(solutions, results):
+        np.testing.assert_allclose(
+            result, pygad_train.play_solution(env, solution, repeat), rtol=1e-12
+        )
+
+
+@pytest.mark.parametrize("repeat", [1, 3])
+def test_fitness_cache_matches_no_cache(trainer, monkeypatch, repeat):
+    monkeypatch.setattr(trainer, "gene_repeat", repeat)
+    monkeypatch.setattr(trainer, "fitness_cache", FitnessCache(SEED, repeat))
+    env = ShootingGameEnv(seed=SEED, true_seed=True)
+    ended = 0
+    for solution in population(size=6, genes=9000 // repeat):
+        expected = pygad_train.play_solution(env, solution, repeat)
+        played = -(-env.ticks // repeat)
+        ended += played < len(solution)
+        # genes after the game ended never count, so these are all hits
+        tail = solution.copy()
+        tail[played:] = 3 - tail[played:]
+        for same in (solution, solution.copy(), tail):
+            assert trainer.evaluate(same) == expected
+        # a change in the played prefix is a miss
+        head = solution.copy()
+        head[played - 1] = 3 - head[played - 1]
+        assert trainer.evaluate(head) == pygad_train.play_solution(env, head, repeat)
+    assert ended
+    assert trainer.fitness_cache.stats()["hits"] == 6 * 2
+
+
+def test_fitness_cache_evicts_least_recently_used():
+    cache = FitnessCache(SEED, max_entries=4)
+    solutions = population(size=10, genes=50)
+    for i, solution in enumerate(solutions[:4]):
+        cache.put(solution, (i, i, i, i), ticks=10 + i)
+    assert cache.get(solutions[0]) == (0, 0, 0, 0)
+    cache.put(solutions[4], (4, 4, 4, 4), ticks=14)
+    assert len(cache) == 4
+    assert cache.get(solutions[1]) is None
+    assert cache.get(solutions[0]) == (0, 0, 0, 0)
+
+    for i, solution in enumerate(solutions[5:], 5):
+        cache.put(solution, (i, i, i, i), ticks=10 + i)
+        assert len(cache) == 4
+    for i, solution in enumerate(solutions):
+        expected = (i, i, i, i) if i >= 6 else None
+        assert cache.get(solution) == expected
+    # prefix lengths of evicted entries are no longer looked up
+    assert cache.stats()["prefix_lengths"] == 4
+
+
+def test_native_ga_scores_every_individual():
+    def fitness_func(ga, population):
+        return population.sum(axis=1)
+
+    ga = GeneticAlgorithm(
+        num_generations=5,
+        num_parents_mating=6,
+        sol_per_pop=10,
+        num_genes=20,
+        fitness_func=fitness_func,
+        keep_elitism=2,
+        random_seed=0,
+    )
+    ga.run()
+    np.testing.assert_array_equal(ga.last_generation_fitness, ga.population.sum(axis=1))
+    assert ga.generations_completed == 5
+    assert ga.best_solutions_fitness == sorted(ga.best_solutions_fitness)
@@ -0,0 +1,60 @@
+import random
+
+import numpy as np
+import pytest
+
+from game.core_ai import ShootingGameEnv
+from game.recording import Recorder, Recording
+
+SEED = 7
+INTERVAL = 100
+
+
+@pytest.fixture(scope="module")
+def recorded(tmp_path_factory):
+    """A saved random episode with the score and state after every tick."""
+    env = ShootingGameEnv(seed=SEED, true_seed=True)
+    env.reset()
+    recorder = Recorder(env, keyframe_interval=INTERVAL)
+    rng = random.Random(SEED)
+    scores = [env.score]
+    states = [env.get_state()]
+    snapshots = [env.snapshot()]
+    while not env.done:
+        state, _, score, _ = recorder.step(rng.randrange(4))
+        scores.append(score)
+        states.append(state.copy())
+        snapshots.append(env.snapshot())
+    filename = tmp_path_factory.mktemp("recording") / "run.npz"
+    recorder.save(filename)
+    return Recording.load(filename), scores, states, snapshots
+
+
+def test_verify_replays_the_episode(recorded):
+    recording, scores, _, _ = recorded
+    assert len(recording) == len(scores) - 1
+    assert recording.meta["score"] == scores[-1]
+    assert recording.verify() == []
+
+
+def test_seek_reproduces_every_tick(recorded):
+    recording, scores, states, snapshots = recorded
+    env = recording.make_env()
+    rng = random.Random(0)
+    last = len(recording)
+    # forwards, backwards, onto and around keyframes, in one env
+    ticks = [0, 1, INTERVAL - 1, INTERVAL, INTERVAL + 1, last, 3, last - 1]
+    ticks += [rng.randint(0, last) for _ in range(20)]
+    for tick in ticks:
+        recording.seek(tick, env)
+        assert recording.position(env) == tick
+        assert env.score == scores[tick]
+        np.testing.assert_array_equal(env.get_state(), states[tick])
+        assert env.snapshot() == snapshots[tick]
+
+
+def test_seek_outside_the_recording(recorded):
+    recording = recorded[0]
+    env = recording.make_env()
+    with pytest.raises(IndexError):
+        recording.seek(len(recording) + 1, env)
@@ -0,0 +1,87 @@
+from collections import deque
+
+import numpy as np
+import pytest
+
+from training.rl.replay import ReplayBuffer
+
+STATE_SIZE = 3
+
+
+def episodes(lengths):
+    """Transitions of consecutive episodes; ``state[0]`` numbers every row."""
+    row = 0
+    for length in lengths:
+        for step in range(length):
+            state = np.full(STATE_SIZE, row, dtype=np.float32)
+            next_state = np.full(STATE_SIZE, row + 1, dtype=np.float32)
+            yield state, row % 4, float(row), next_state, step == length - 1
+            row += 1
+        # the next episode starts from a fresh observation
+        row += 1
+
+
+def contents(memory, indices=None):
+    """The held transitions keyed by their ``state[0]``."""
+    if indices is None:
+        indices = np.flatnonzero(memory.valid[: memory._filled])
+    states, actions, rewards, next_states, dones = memory.get(indices)
+    return {
+        int(state[0]): (action, reward, tuple(next_state), done)
+        for state, action, reward, next_state, done in zip(
+            states, actions, rewards, next_states, dones
+        )
+    }
+
+
+def as_dict(transitions):
+    return {
+        int(state[0]): (action, reward, tuple(next_state), done)
+        for state, action, reward, next_state, done in transitions
+    }
+
+
+@pytest.mark.parametrize("capacity", [7, 16])
+def test_ring_buffer_matches_deque(capacity):
+    memory = ReplayBuffer(capacity, STATE_SIZE)
+    reference = deque(maxlen=capacity)
+    for transition in episodes([5, 9, 3, 12, 6]):
+        memory.push(*transition)
+        reference.append(transition)
+        assert len(memory) == len(reference)
+        assert contents(memory) == as_dict(reference)
+
+
+@pytest.mark.parametrize("capacity", [7, 16])
+def test_shared_obs_holds_the_newest_transitions(capacity):
+    memory = ReplayBuffer(capacity, STATE_SIZE, shared_obs=True)
+    reference = deque(maxlen=capacity)
+    for transition in episodes([5, 9, 3, 12, 6]):
+        memory.push(*transition)
+        reference.append(transition)
+        held = list(reference)[len(reference) - len(memory) :]
+        # the other slots hold terminal observations: one per held episode,
+        # the pending next_state and at most one of an evicted episode
+        terminals = sum(done for *_, done in held)
+        assert len(memory) >= min(len(reference), capacity - terminals - 2)
+        assert contents(memory) == as_dict(held)
+
+
+def test_shared_obs_next_state_across_the_wrap():
+    capacity = 5
+    memory = ReplayBuffer(capacity, STATE_SIZE, shared_obs=True, seed=0)
+    transitions = list(episodes([12]))
+    for transition in transitions:
+        memory.push(*transition)
+    expected = as_dict(transitions)
+
+    last_slot = contents(memory, np.array([capacity - 1]))
+    assert last_slot.items() <= expected.items()
+    # its next_state lives in slot 0
+    (key,) = last_slot
+    np.testing.assert_array_equal(memory.states[0], expected[key][2])
+
+    states, actions, rewards, next_states, dones = memory.sample(capacity)
+    assert len(states) == len(memory) == capacity - 1
+    for row in zip(states, actions, rewards, next_states, dones):
+        assert as_dict([row]).items() <= expected.items()
@@ -0,0 +1,58 @@
+from collections import deque
+
+import numpy as np
+import pytest
+
+from training.telemetry import RollingMean, RollingRate, TelemetryLog, read_log
+
+
+@pytest.mark.parametrize("window", [1, 3, 100])
+def test_rolling_mean_matches_window(window):
+    rolling = RollingMean(window)
+    reference = deque(maxlen=window)
+    assert rolling.mean == 0.0
+    for value in np.random.default_rng(window).normal(50, 100, 1000).tolist():
+        rolling.add(value)
+        reference.append(value)
+        assert len(rolling) == len(reference)
+        assert rolling.mean == pytest.approx(sum(reference) / len(reference))
+
+
+def test_rolling_rate():
+    rate = RollingRate(2)
+    assert rate.rate == 0.0
+    for count, seconds in [(100, 10.0), (30, 1.0), (50, 1.0)]:
+        rate.add(count, seconds)
+    assert rate.rate == pytest.approx(80 / 2.0)
+
+
+@pytest.mark.parametrize("name", ["log.jsonl", "log.csv"])
+def test_log_writes_every_record(tmp_path, name):
+    filename = str(tmp_path / "logs" / name)
+    records = [dict(episode=i, score=i * 10 - 50, win_rate=i / 23) for i in range(23)]
+    log = TelemetryLog(filename, flush_every=10, flush_seconds=3600)
+    for record in records[:15]:
+        log.log(**record)
+    # a flushed batch reaches the file before later ones
+    log.flush()
+    for record in records[15:]:
+        log.log(record)
+    log.close()
+
+    # reopening appends, a CSV log keeps its header
+    with TelemetryLog(filename) as log:
+        log.log(records[0], time=1.5)
+
+    written = read_log(filename)
+    assert len(written) == len(records) + 1
+    for record, expected in zip(written, records + [dict(records[0], time=1.5)]):
+        assert record == dict(expected, time=record["time"])
+    assert written[-1]["time"] == 1.5
+
+
+def test_csv_log_with_other_fields_fails(tmp_path):
+    log = TelemetryLog(str(tmp_path / "log.csv"))
+    log.log(episode=1)
+    log.log(episode=2, score=3)
+    with pytest.raises(RuntimeError, match="failed"):
+        log.close()
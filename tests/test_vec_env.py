@@ -0,0 +1,57 @@
+import random
+
+import numpy as np
+import pytest
+
+from game.core_ai import ShootingGameEnv
+from game.vec_env import VecShootingGameEnv
+
+SEEDS = [1, 2, 7, 42]
+
+
+@pytest.mark.parametrize("max_steps", [-1, 400])
+def test_rows_match_scalar_envs(max_steps):
+    vec_env = VecShootingGameEnv(
+        len(SEEDS), seeds=SEEDS, max_steps=max_steps, true_seed=True
+    )
+    envs = [
+        ShootingGameEnv(seed=seed, max_steps=max_steps, true_seed=True)
+        for seed in SEEDS
+    ]
+    for env in envs:
+        env.reset()
+    states = vec_env.reset()
+    for i, env in enumerate(envs):
+        np.testing.assert_allclose(states[i], env.get_state())
+
+    rng = random.Random(0)
+    resets = 0
+    for _ in range(3000):
+        actions = [rng.randrange(4) for _ in envs]
+        states, rewards, scores, dones = vec_env.step(actions)
+        for i, env in enumerate(envs):
+            state, reward, score, done = env.step(actions[i])
+            assert rewards[i] == pytest.approx(reward)
+            assert (scores[i], dones[i]) == (score, done)
+            if done:
+                np.testing.assert_allclose(vec_env.terminal_states[i], state)
+                env.reset()
+                state = env.get_state()
+                resets += 1
+            np.testing.assert_allclose(states[i], state)
+    assert resets
+
+
+def test_tick_matches_step():
+    stepped = VecShootingGameEnv(len(SEEDS), seeds=SEEDS, true_seed=True)
+    ticked = VecShootingGameEnv(len(SEEDS), seeds=SEEDS, true_seed=True)
+    stepped.reset()
+    ticked.reset()
+    rng = np.random.default_rng(0)
+    for _ in range(1000):
+        actions = rng.integers(0, 4, len(SEEDS))
+        _, rewards, scores, dones = stepped.step(actions)
+        tick_rewards, tick_scores, tick_dones = ticked.tick(actions)
+        np.testing.assert_allclose(tick_rewards, rewards)
+        np.testing.assert_array_equal(tick_scores, scores)
+        np.testing.assert_array_equal(tick_dones, dones)
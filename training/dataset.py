@@ -0,0 +1,317 @@
+"""Transitions on disk, for offline training and analysis.
+
+A dataset is a directory of memory-mapped ``.npy`` chunks of fixed size and
+an ``index.json`` listing how many rows of each chunk are written. Rows hold
+(state, action, reward, next_state, done, episode); actions are stored as
+env actions (0-3).
+
+    python -m training.dataset info DIR
+    python -m training.dataset train DIR [--epochs 1] [--batch-size 256]
+"""
+
+import argparse
+import json
+import os
+from os import path
+
+import numpy as np
+
+from game.utils.fingerprint import settings_fingerprint
+
+VERSION = 1
+CHUNK_SIZE = 65_536
+INDEX = "index.json"
+
+
+def row_dtype(state_size):
+    return np.dtype(
+        [
+            ("state", np.float32, (state_size,)),
+            ("action", np.int8),
+            ("reward", np.float32),
+            ("next_state", np.float32, (state_size,)),
+            ("done", np.bool_),
+            ("episode", np.int64),
+        ]
+    )
+
+
+def action_index(actions):
+    """Env actions to Q-network outputs, like ``Agent.remember`` (LEFT -> 0)."""
+    return np.where(actions == 1, 0, 1)
+
+
+def _read_index(directory):
+    with open(path.join(directory, INDEX)) as f:
+        index = json.load(f)
+    if index["version"] != VERSION:
+        raise ValueError(f"unsupported dataset version {index['version']}")
+    return index
+
+
+class TrajectoryWriter:
+    """Appends transitions to a dataset directory, creating it if needed.
+
+    Rows go straight into a memory-mapped chunk; a new chunk is started when
+    one is full. The index is rewritten on every ``flush`` (and when a chunk
+    fills up), so a dataset is readable up to the last flush even if the
+    writer never gets closed. Episode ids count up by one after every
+    ``done`` row or ``end_episode()`` call and continue across reopenings.
+    """
+
+    def __init__(self, directory, state_size=9, chunk_size=CHUNK_SIZE):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        if path.exists(path.join(directory, INDEX)):
+            self.index = _read_index(directory)
+            if self.index["state_size"] != state_size:
+                raise ValueError(
+                    f"dataset has state size {self.index['state_size']}, "
+                    f"not {state_size}"
+                )
+            if self.index["fingerprint"] != settings_fingerprint():
+                raise ValueError(
+                    "the dataset was made with different game settings "
+                    f"({self.index['fingerprint']}, now {settings_fingerprint()})"
+                )
+        else:
+            self.index = {
+                "version": VERSION,
+                "state_size": state_size,
+                "chunk_size": chunk_size,
+                "fingerprint": settings_fingerprint(),
+                "episodes": 0,
+                "chunks": [],
+            }
+        self.dtype = row_dtype(state_size)
+        self.episode = self.index["episodes"]
+        self._chunk = None
+        self._rows = 0
+        chunks = self.index["chunks"]
+        if chunks and chunks[-1]["rows"] < self.index["chunk_size"]:
+            # keep filling the last chunk
+            self._chunk = np.load(
+                path.join(directory, chunks[-1]["file"]), mmap_mode="r+"
+            )
+            self._rows = chunks[-1]["rows"]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _next_chunk(self):
+        if self._chunk is not None:
+            self.flush()
+        name = f"chunk_{len(self.index['chunks']):05d}.npy"
+        self._chunk = np.lib.format.open_memmap(
+            path.join(self.directory, name),
+            mode="w+",
+            dtype=self.dtype,
+            shape=(self.index["chunk_size"],),
+        )
+        self._rows = 0
+        self.index["chunks"].append({"file": name, "rows": 0})
+
+    def append(self, state, action, reward, next_state, done):
+        if self._chunk is None or self._rows == len(self._chunk):
+            self._next_chunk()
+        row = self._chunk[self._rows]
+        row["state"] = state
+        row["action"] = action
+        row["reward"] = reward
+        row["next_state"] = next_state
+        row["done"] = done
+        row["episode"] = self.episode
+        self._rows += 1
+        if done:
+            self.episode += 1
+
+    def extend(self, states, actions, rewards, next_states, dones):
+        """Append a batch of transitions in episode order."""
+        dones = np.asarray(dones, dtype=bool)
+        # a row belongs to the episode after every done before it
+        episodes = self.episode + np.cumsum(dones) - dones
+        start = 0
+        while start < len(dones):
+            if self._chunk is None or self._rows == len(self._chunk):
+                self._next_chunk()
+            n = min(len(dones) - start, len(self._chunk) - self._rows)
+            rows = self._chunk[self._rows : self._rows + n]
+            end = start + n
+            rows["state"] = states[start:end]
+            rows["action"] = actions[start:end]
+            rows["reward"] = rewards[start:end]
+            rows["next_state"] = next_states[start:end]
+            rows["done"] = dones[start:end]
+            rows["episode"] = episodes[start:end]
+            self._rows += n
+            start = end
+        self.episode += int(np.count_nonzero(dones))
+
+    def end_episode(self):
+        """Start a new episode id without a ``done`` row, e.g. on a time limit."""
+        self.episode += 1
+
+    def flush(self):
+        if self._chunk is not None:
+            self._chunk.flush()
+            self.index["chunks"][-1]["rows"] = self._rows
+        self.index["episodes"] = self.episode
+        tmp = path.join(self.directory, INDEX + ".tmp")
+        with open(tmp, "w") as f:
+            json.dump(self.index, f, indent=1)
+        os.replace(tmp, path.join(self.directory, INDEX))
+
+    def close(self):
+        self.flush()
+        self._chunk = None
+
+
+class TrajectoryDataset:
+    """Read-only view of a dataset directory; nothing is loaded up front.
+
+    ``batches`` streams one shuffled epoch holding at most ``window`` chunks
+    in memory, ``sample`` draws uniform random rows from all of them. Both
+    return (states, actions, rewards, next_states, dones) like
+    ``ReplayBuffer.sample``; with ``action_index=True`` (the default) actions
+    are mapped to Q-network outputs for ``QTrainer.train_step``.
+    """
+
+    def __init__(self, directory, action_index=True):
+        self.directory = directory
+        self.index = _read_index(directory)
+        self.action_index = action_index
+        self.dtype = row_dtype(self.index["state_size"])
+        self.chunks = [
+            np.load(path.join(directory, chunk["file"]), mmap_mode="r")[: chunk["rows"]]
+            for chunk in self.index["chunks"]
+            if chunk["rows"]
+        ]
+        self.offsets = np.cumsum([0] + [len(chunk) for chunk in self.chunks])
+
+    def __len__(self):
+        return int(self.offsets[-1])
+
+    @property
+    def episodes(self):
+        return self.index["episodes"]
+
+    def _unpack(self, rows):
+        actions = rows["action"].astype(np.int64)
+        if self.action_index:
+            actions = action_index(actions)
+        # fields of a structured array are strided views, torch wants copies
+        return (
+            np.ascontiguousarray(rows["state"]),
+            actions,
+            np.ascontiguousarray(rows["reward"]),
+            np.ascontiguousarray(rows["next_state"]),
+            np.ascontiguousarray(rows["done"]),
+        )
+
+    def rows(self, indices):
+        """Structured rows at the given global indices (in that order)."""
+        indices = np.asarray(indices)
+        chunk_ids = np.searchsorted(self.offsets, indices, side="right") - 1
+        out = np.empty(len(indices), dtype=self.dtype)
+        for c in np.unique(chunk_ids):
+            mask = chunk_ids == c
+            out[mask] = self.chunks[c][indices[mask] - self.offsets[c]]
+        return out
+
+    def get(self, indices):
+        return self._unpack(self.rows(indices))
+
+    def sample(self, batch_size, rng=None):
+        rng = rng if rng is not None else np.random.default_rng()
+        indices = rng.integers(0, len(self), batch_size)
+        # reading in file order keeps the page cache happy
+        indices.sort()
+        return self.get(indices)
+
+    def batches(self, batch_size, shuffle=True, window=4, seed=None, drop_last=False):
+        """Yield one epoch of minibatches.
+
+        With ``shuffle`` the chunks are visited in random order and the rows
+        of ``window`` chunks at a time are shuffled together; rows left over
+        from one window are mixed into the next.
+        """
+        if not self.chunks:
+            return
+        rng = np.random.default_rng(seed)
+        order = (
+            rng.permutation(len(self.chunks)) if shuffle else range(len(self.chunks))
+        )
+        order = list(order)
+        pending = self.chunks[0][:0]
+        for start in range(0, len(order), window):
+            loaded = [pending] + [
+                np.array(self.chunks[c]) for c in order[start : start + window]
+            ]
+            rows = np.concatenate(loaded)
+            if shuffle:
+                rows = rows[rng.permutation(len(rows))]
+            last = start + window >= len(order)
+            full = len(rows) // batch_size * batch_size
+            for i in range(0, full, batch_size):
+                yield self._unpack(rows[i : i + batch_size])
+            pending = rows[full:]
+            if last and len(pending) and not drop_last:
+                yield self._unpack(pending)
+
+    def summary(self):
+        rewards = 0.0
+        dones = 0
+        actions = np.zeros(4, dtype=np.int64)
+        for chunk in self.chunks:
+            rewards += float(chunk["reward"].sum(dtype=np.float64))
+            dones += int(np.count_nonzero(chunk["done"]))
+            actions += np.bincount(chunk["action"], minlength=4)[:4]
+        return {
+            "transitions": len(self),
+            "chunks": len(self.chunks),
+            "episodes": self.episodes,
+            "terminal": dones,
+            "mean_reward": rewards / len(self) if len(self) else 0.0,
+            "actions": actions.tolist(),
+            "fingerprint": self.index["fingerprint"],
+        }
+
+
+def train_offline(directory, epochs=1, batch_size=256, lr=0.005, gamma=0.95, seed=0):
+    import torch
+    from training.rl.model import DEVICE, Linear_QNet, QTrainer
+
+    torch.manual_seed(seed)
+    dataset = TrajectoryDataset(directory)
+    model = Linear_QNet(dataset.index["state_size"], 512, 2).to(DEVICE)
+    trainer = QTrainer(model, lr=lr, gamma=gamma)
+    for epoch in range(epochs):
+        losses = [
+            trainer.train_step(*batch)
+            for batch in dataset.batches(batch_size, seed=seed + epoch)
+        ]
+        print(
+            f"Epoch {epoch + 1}/{epochs}: {len(losses)} batches, loss {np.mean(losses):.4f}"
+        )
+    return model
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Inspect or train on a dataset")
+    parser.add_argument("command", choices=["info", "train"])
+    parser.add_argument("directory")
+    parser.add_argument("--epochs", type=int, default=1)
+    parser.add_argument("--batch-size", type=int, default=256)
+    parser.add_argument("--out", default="model_offline.pth")
+    args = parser.parse_args()
+
+    if args.command == "info":
+        for key, value in TrajectoryDataset(args.directory).summary().items():
+            print(f"{key:12s} {value}")
+    else:
+        model = train_offline(args.directory, args.epochs, args.batch_size)
+        model.save(args.out)
+        print(f"Model saved to models/{args.out}")
@@ -0,0 +1,291 @@
+"""Run GA or DQN trials for a list or grid of settings on a process pool.
+
+    python -m training.experiments sweep.json [--out DIR] [--cores N] [--cores-per-trial K]
+
+A sweep file names the trainer and the settings of its trials. Settings are
+the ``PARAMETERS`` of ``training.pygad_train`` ("ga") or
+``training.rl.agent`` ("dqn"), except the output paths and core counts the
+runner sets itself:
+
+    {
+        "kind": "ga",
+        "base": {"generations": 40, "engine": "native"},
+        "grid": {"ga_seed": [1, 2, 3], "mutation_percent_genes": [10, 20]}
+    }
+
+"grid" runs every combination, "trials" lists settings one by one; "base"
+applies to all of them. Every trial runs in a fresh process with K cores
+(GA workers or torch threads) and writes to its own directory, named by a
+hash of its settings. A directory with a ``result.json`` counts as done, so
+running a sweep again only runs the trials that are missing. Finished
+trials are collated into ``training_summary.json``,
+``training_analysis.png`` and ``trials.json`` in the output directory.
+"""
+
+import argparse
+import hashlib
+import importlib
+import itertools
+import json
+import multiprocessing
+import os
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from contextlib import redirect_stdout
+from os import path
+
+import numpy as np
+
+MODULES = {"ga": "training.pygad_train", "dqn": "training.rl.agent"}
+# parameters run_trial sets for every trial
+MANAGED = {
+    "ga": ("output_dir", "telemetry_log", "num_workers", "num_trials"),
+    "dqn": ("MODEL_DIR", "TELEMETRY_LOG"),
+}
+RESULT = "result.json"
+LOG = "log.jsonl"
+
+
+def expand(sweep):
+    """Settings of every trial of a sweep, in order."""
+    base = sweep.get("base", {})
+    trials = [dict(base, **settings) for settings in sweep.get("trials", [])]
+    grid = sweep.get("grid", {})
+    if grid or not trials:
+        keys = list(grid)
+        for values in itertools.product(*(grid[key] for key in keys)):
+            trials.append(dict(base, **dict(zip(keys, values))))
+    return trials
+
+
+def trial_name(kind, settings):
+    key = json.dumps([kind, settings], sort_keys=True)
+    return "trial_" + hashlib.sha1(key.encode()).hexdigest()[:10]
+
+
+def check_settings(kind, settings):
+    if kind not in MODULES:
+        raise ValueError(f"kind must be one of {sorted(MODULES)}, not {kind!r}")
+    module = importlib.import_module(MODULES[kind])
+    for name in settings:
+        if name in MANAGED[kind]:
+            raise ValueError(f"{name!r} is set by the experiment runner")
+        if name not in module.PARAMETERS:
+            raise ValueError(f"{MODULES[kind]} has no parameter {name!r}")
+
+
+def run_trial(kind, settings, directory, cores=1):
+    """Run one trial in this process and write its ``result.json``."""
+    os.makedirs(directory, exist_ok=True)
+    with open(path.join(directory, "settings.json"), "w") as f:
+        json.dump(settings, f, indent=2)
+    if path.exists(path.join(directory, LOG)):
+        # left over from an interrupted run
+        os.remove(path.join(directory, LOG))
+
+    start = time.perf_counter()
+    with open(path.join(directory, "output.log"), "w") as f, redirect_stdout(f):
+        try:
+            if kind == "ga":
+                result = _run_ga(settings, directory, cores)
+            else:
+                result = _run_dqn(settings, directory, cores)
+        except BaseException:
+            # the pool only sends the exception back, keep the traceback here
+            traceback.print_exc(file=f)
+            raise
+    result["seconds"] = round(time.perf_counter() - start, 2)
+
+    tmp = path.join(directory, RESULT + ".tmp")
+    with open(tmp, "w") as f:
+        json.dump(result, f, indent=2)
+    os.replace(tmp, path.join(directory, RESULT))
+    return result
+
+
+def _run_ga(settings, directory, cores):
+    from training import pygad_train
+
+    pygad_train.output_dir = directory
+    pygad_train.telemetry_log = path.join(directory, LOG)
+    pygad_train.num_workers = cores
+    for name, value in settings.items():
+        setattr(pygad_train, name, value)
+    pygad_train.num_trials = 1
+
+    trial_stats, gens = pygad_train.run_trial(0)
+    return {
+        "best_fitness": float(trial_stats["best_fitness"]),
+        "generations_needed": gens,
+        "successful": gens <= pygad_train.generations,
+    }
+
+
+def _run_dqn(settings, directory, cores):
+    import matplotlib
+    import torch
+    from training.rl import agent
+
+    matplotlib.use("Agg")
+    torch.set_num_threads(cores)
+    agent.MODEL_DIR = path.join(directory, "models")
+    agent.TELEMETRY_LOG = path.join(directory, LOG)
+    for name, value in settings.items():
+        setattr(agent, name, value)
+
+    scores, mean_scores, positioning, win_rate = agent.train()
+    agent.plot_training(
+        scores,
+        mean_scores,
+        positioning,
+        win_rate,
+        out=path.join(directory, "training.png"),
+    )
+    return {
+        "episodes": len(scores),
+        "wins": sum(1 for score in scores if score >= 300),
+        "mean_score": float(mean_scores[-1]),
+        "avg_score_last_100": float(np.mean(scores[-100:])),
+        "win_rate_last_100": float(win_rate[-1]),
+    }
+
+
+def run_sweep(sweep, out, cores=None, cores_per_trial=1):
+    kind = sweep["kind"]
+    trials = expand(sweep)
+    for settings in trials:
+        check_settings(kind, settings)
+    names = [trial_name(kind, settings) for settings in trials]
+    if len(set(names)) < len(names):
+        raise ValueError("the sweep lists the same settings more than once")
+    os.makedirs(out, exist_ok=True)
+    with open(path.join(out, "sweep.json"), "w") as f:
+        json.dump(sweep, f, indent=2)
+
+    pending = [
+        (name, settings)
+        for name, settings in zip(names, trials)
+        if not path.exists(path.join(out, name, RESULT))
+    ]
+    processes = max(1, min((cores or os.cpu_count()) // cores_per_trial, len(pending)))
+    print(
+        f"{len(trials) - len(pending)}/{len(trials)} trials done, "
+        f"running {len(pending)} on {processes} processes"
+    )
+
+    failed = 0
+    if pending:
+        # one fresh process per trial: trials change module-level settings
+        with ProcessPoolExecutor(
+            processes,
+            mp_context=multiprocessing.get_context("spawn"),
+            max_tasks_per_child=1,
+        ) as pool:
+            futures = {
+                pool.submit(
+                    run_trial, kind, settings, path.join(out, name), cores_per_trial
+                ): name
+                for name, settings in pending
+            }
+            for future in as_completed(futures):
+                name = futures[future]
+                try:
+                    print(f"{name}: {future.result()}")
+                except Exception as error:
+                    failed += 1
+                    print(f"{name} failed: {error!r} (see {name}/output.log)")
+
+    collate(kind, out, names, trials)
+    if failed:
+        print(f"{failed} trials failed, run the sweep again to retry them")
+
+
+def collate(kind, out, names, trials):
+    """Write the summary, plot and ``trials.json`` of the finished trials."""
+    done = []
+    for name, settings in zip(names, trials):
+        result_file = path.join(out, name, RESULT)
+        if path.exists(result_file):
+            with open(result_file) as f:
+                done.append({"name": name, "settings": settings, **json.load(f)})
+    with open(path.join(out, "trials.json"), "w") as f:
+        json.dump(done, f, indent=2)
+    if not done:
+        return
+    if kind == "ga":
+        _collate_ga(out, done)
+    else:
+        _collate_dqn(out, done)
+
+
+def _collate_ga(out, done):
+    from training import pygad_train
+
+    all_trial_stats = []
+    for trial in done:
+        with open(path.join(out, trial["name"], "trial_0_stats.json")) as f:
+            all_trial_stats.append(json.load(f))
+    pygad_train.output_dir = out
+    pygad_train.summarize(
+        all_trial_stats,
+        [trial["generations_needed"] for trial in done],
+        [trial["successful"] for trial in done],
+        show=False,
+    )
+
+
+def _collate_dqn(out, done):
+    import matplotlib.pyplot as plt
+    from training.telemetry import read_log
+
+    best = int(np.argmax([trial["win_rate_last_100"] for trial in done]))
+    summary = {
+        "total_trials": len(done),
+        "best_trial": best,
+        "best_settings": done[best]["settings"],
+        "best_win_rate_last_100": done[best]["win_rate_last_100"],
+        "mean_win_rate_last_100": float(
+            np.mean([trial["win_rate_last_100"] for trial in done])
+        ),
+    }
+    with open(path.join(out, "training_summary.json"), "w") as f:
+        json.dump(summary, f, indent=2)
+
+    fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(15, 5))
+    for i, trial in enumerate(done):
+        records = read_log(path.join(out, trial["name"], LOG))
+        episodes = [r["episode"] for r in records]
+        ax1.plot(episodes, [r["avg_score"] for r in records], label=f"Trial {i}")
+        ax2.plot(episodes, [r["win_rate"] for r in records], label=f"Trial {i}")
+    ax1.set_title("Avg Score (last 100)")
+    ax1.set_xlabel("Episode")
+    ax1.legend()
+    ax2.set_title("Win Rate (last 100 games)")
+    ax2.set_xlabel("Episode")
+    plt.tight_layout()
+    plt.savefig(path.join(out, "training_analysis.png"))
+    plt.close(fig)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run a sweep of GA or DQN trials")
+    parser.add_argument("sweep", help="sweep JSON file")
+    parser.add_argument(
+        "--out", help="output directory (default: experiments/<sweep file name>)"
+    )
+    parser.add_argument("--cores", type=int, default=os.cpu_count())
+    parser.add_argument(
+        "--cores-per-trial",
+        type=int,
+        default=1,
+        help="GA workers or torch threads of every trial",
+    )
+    args = parser.parse_args()
+
+    with open(args.sweep) as f:
+        sweep = json.load(f)
+    out = args.out or path.join(
+        "experiments", path.splitext(path.basename(args.sweep))[0]
+    )
+    run_sweep(sweep, out, args.cores, args.cores_per_trial)
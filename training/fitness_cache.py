@@ -0,0 +1,80 @@
+import hashlib
+from collections import OrderedDict
+
+import numpy as np
+
+from game.utils.fingerprint import settings_fingerprint
+
+
+class FitnessCache:
+    """``play_solution`` results keyed by the part of a chromosome that was played.
+
+    Genes after the one in which the game ended never reach the env, so a
+    result is stored under a hash of the played prefix only; every chromosome
+    that starts with that prefix gets the same result without being played.
+    Chromosomes that ran to the end are keyed by all their genes. Keys are
+    salted with the env seed, the gene repeat and the settings fingerprint,
+    so a cache never hands out results of a different game. At most
+    ``max_entries`` results are kept, least recently used ones are evicted
+    first.
+
+    Only valid for envs whose ``reset`` is deterministic (``true_seed=True``).
+    """
+
+    def __init__(self, seed, repeat=1, max_entries=100_000):
+        self.repeat = repeat
+        self.max_entries = max_entries
+        salt = f"{seed}:{repeat}:{settings_fingerprint()}"
+        self._salt = salt.encode()
+        # key -> (result, played genes)
+        self._entries = OrderedDict()
+        # played genes -> number of entries with that prefix length
+        self._lengths = {}
+        self.lookups = 0
+        self.hits = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def stats(self):
+        return {
+            "entries": len(self._entries),
+            "prefix_lengths": len(self._lengths),
+            "hits": self.hits,
+            "lookups": self.lookups,
+            "hit_rate": self.hits / self.lookups if self.lookups else 0.0,
+        }
+
+    def _key(self, actions, genes):
+        return hashlib.blake2b(actions[:genes], digest_size=16, key=self._salt).digest()
+
+    def get(self, solution):
+        """The cached result for ``solution``, or None."""
+        self.lookups += 1
+        actions = np.asarray(solution).astype(np.int8).tobytes()
+        for genes in self._lengths:
+            if genes > len(actions):
+                continue
+            key = self._key(actions, genes)
+            entry = self._entries.get(key)
+            if entry is not None:
+                self.hits += 1
+                self._entries.move_to_end(key)
+                return entry[0]
+        return None
+
+    def put(self, solution, result, ticks):
+        """Store the result of a rollout that covered ``ticks`` env ticks."""
+        actions = np.asarray(solution).astype(np.int8).tobytes()
+        genes = min(-(-ticks // self.repeat), len(actions))
+        key = self._key(actions, genes)
+        if key in self._entries:
+            self._entries.move_to_end(key)
+            return
+        self._entries[key] = (tuple(result), genes)
+        self._lengths[genes] = self._lengths.get(genes, 0) + 1
+        while len(self._entries) > self.max_entries:
+            _, (_, evicted) = self._entries.popitem(last=False)
+            self._lengths[evicted] -= 1
+            if not self._lengths[evicted]:
+                del self._lengths[evicted]
@@ -0,0 +1,130 @@
+"""A small genetic algorithm working on the whole population array at once.
+
+``GeneticAlgorithm`` takes the PyGAD parameters ``pygad_train`` uses
+(tournament selection, single-point crossover, mutation by replacement from
+``gene_space``, elitism and ``reach_``/``saturate_`` stop criteria) and keeps
+the attributes its callbacks read (``generations_completed``,
+``last_generation_fitness``, ``previous_generation_fitness``,
+``best_solution``), so ``on_generation`` callbacks work with either engine.
+Unlike PyGAD, ``fitness_func(ga, population)`` scores a whole population in
+one call; only the offspring are passed, elites keep their fitness.
+"""
+
+import numpy as np
+
+
+class GeneticAlgorithm:
+    def __init__(
+        self,
+        num_generations,
+        num_parents_mating,
+        sol_per_pop,
+        num_genes,
+        fitness_func,
+        gene_space=(1, 2),
+        mutation_percent_genes=20,
+        K_tournament=3,
+        keep_elitism=1,
+        stop_criteria=None,
+        on_generation=None,
+        random_seed=None,
+    ):
+        if not 0 <= keep_elitism < sol_per_pop:
+            raise ValueError("keep_elitism must be in [0, sol_per_pop)")
+        self.num_generations = num_generations
+        self.num_parents_mating = num_parents_mating
+        self.sol_per_pop = sol_per_pop
+        self.num_genes = num_genes
+        self.fitness_func = fitness_func
+        self.gene_space = np.asarray(gene_space, dtype=np.int64)
+        # same count as PyGAD: a fixed number of genes per offspring, at least 1
+        self.mutation_num_genes = max(1, int(mutation_percent_genes * num_genes / 100))
+        self.K_tournament = K_tournament
+        self.keep_elitism = keep_elitism
+        self.stop_criteria = [c.split("_") for c in stop_criteria or ()]
+        self.on_generation = on_generation
+        self.rng = np.random.default_rng(random_seed)
+
+        self.population = self.rng.choice(self.gene_space, (sol_per_pop, num_genes))
+        self.generations_completed = 0
+        self.last_generation_fitness = None
+        self.previous_generation_fitness = None
+        self.best_solutions_fitness = []
+
+    def best_solution(self, pop_fitness=None):
+        """(solution, fitness, index) of the fittest individual."""
+        if pop_fitness is None:
+            pop_fitness = self.last_generation_fitness
+        idx = int(np.argmax(pop_fitness))
+        return self.population[idx], pop_fitness[idx], idx
+
+    def select_parents(self, fitness):
+        # each parent is the fittest of K individuals drawn with replacement
+        candidates = self.rng.integers(
+            0, len(fitness), (self.num_parents_mating, self.K_tournament)
+        )
+        winners = candidates[
+            np.arange(self.num_parents_mating), fitness[candidates].argmax(axis=1)
+        ]
+        return self.population[winners]
+
+    def crossover(self, parents, num_offspring):
+        # offspring k mixes parents k and k + 1 (cyclic) at one random point
+        k = np.arange(num_offspring)
+        first = parents[k % len(parents)]
+        second = parents[(k + 1) % len(parents)]
+        points = self.rng.integers(0, self.num_genes, num_offspring)
+        return np.where(np.arange(self.num_genes) < points[:, None], first, second)
+
+    def mutate(self, offspring):
+        # distinct random genes per row, replaced by random gene_space values
+        genes = self.rng.random(offspring.shape).argpartition(
+            self.mutation_num_genes - 1, axis=1
+        )[:, : self.mutation_num_genes]
+        rows = np.arange(len(offspring))[:, None]
+        offspring[rows, genes] = self.rng.choice(self.gene_space, genes.shape)
+        return offspring
+
+    def _stop(self, unchanged_generations):
+        for criterion, value in self.stop_criteria:
+            if criterion == "reach" and self.last_generation_fitness.max() >= float(
+                value
+            ):
+                return True
+            if criterion == "saturate" and unchanged_generations >= int(value):
+                return True
+        return False
+
+    def run(self):
+        fitness = np.asarray(self.fitness_func(self, self.population), dtype=float)
+        self.last_generation_fitness = fitness
+        self.best_solutions_fitness.append(fitness.max())
+        unchanged_generations = 0
+
+        for generation in range(self.num_generations):
+            elite = np.argsort(-fitness, kind="stable")[: self.keep_elitism]
+            parents = self.select_parents(fitness)
+            offspring = self.mutate(
+                self.crossover(parents, self.sol_per_pop - self.keep_elitism)
+            )
+
+            self.population = np.concatenate([self.population[elite], offspring])
+            self.generations_completed = generation + 1
+            self.previous_generation_fitness = fitness
+            fitness = np.concatenate(
+                [fitness[elite], self.fitness_func(self, offspring)]
+            ).astype(float)
+            self.last_generation_fitness = fitness
+
+            best = fitness.max()
+            if best == self.best_solutions_fitness[-1]:
+                unchanged_generations += 1
+            else:
+                unchanged_generations = 0
+            self.best_solutions_fitness.append(best)
+
+            if self.on_generation is not None:
+                if self.on_generation(self) == "stop":
+                    break
+            if self._stop(unchanged_generations):
+                break
@@ -0,0 +1,78 @@
+"""Per-generation GA statistics in fixed-size arrays.
+
+Rollout results (total_fitness, final_score, allies_catches, positioning)
+are summed into the row of their generation as they come in, and the
+population fitness the GA already computed gives the best and average
+fitness. Memory depends on the number of generations only; the result of
+every single rollout is kept only with ``keep_individuals=True``.
+"""
+
+import numpy as np
+
+FIELDS = ("total_fitness", "final_score", "allies_catches", "positioning_fitness")
+
+
+class GenerationStats:
+    def __init__(self, max_generations, keep_individuals=False):
+        size = max_generations + 1  # generation 0 is the initial population
+        self.best_fitness = np.full(size, np.nan)
+        self.avg_fitness = np.full(size, np.nan)
+        self.evaluations = np.zeros(size, dtype=np.int64)
+        self.sums = np.zeros((size, len(FIELDS)))
+        self.max_catches = np.zeros(size, dtype=np.int64)
+        self.generations = 0  # rows with a population fitness
+        self.individuals = [[] for _ in range(size)] if keep_individuals else None
+
+    def add(self, generation, result):
+        """One rollout result, in ``FIELDS`` order."""
+        self.evaluations[generation] += 1
+        self.sums[generation] += result
+        catches = int(result[2])
+        if catches > self.max_catches[generation]:
+            self.max_catches[generation] = catches
+        if self.individuals is not None:
+            self.individuals[generation].append(tuple(result))
+
+    def add_batch(self, generation, results):
+        """Rollout results as an array with one row per rollout."""
+        if not len(results):
+            return
+        self.evaluations[generation] += len(results)
+        self.sums[generation] += results.sum(axis=0)
+        self.max_catches[generation] = max(
+            self.max_catches[generation], int(results[:, 2].max())
+        )
+        if self.individuals is not None:
+            self.individuals[generation].extend(map(tuple, results.tolist()))
+
+    def end_generation(self, generation, population_fitness):
+        """Best and mean of the fitness values of a whole population."""
+        self.best_fitness[generation] = np.max(population_fitness)
+        self.avg_fitness[generation] = np.mean(population_fitness)
+        self.generations = max(self.generations, generation + 1)
+
+    def mean(self, generation, field):
+        """Mean of ``field`` over the rollouts of a generation."""
+        count = self.evaluations[generation]
+        return self.sums[generation, FIELDS.index(field)] / count if count else np.nan
+
+    def to_dict(self):
+        """JSON-ready lists, one entry per completed generation."""
+        n = self.generations
+        counts = np.maximum(self.evaluations[:n], 1)
+        means = self.sums[:n] / counts[:, None]
+        stats = {
+            "generation": list(range(n)),
+            "best_fitness": self.best_fitness[:n].tolist(),
+            "avg_fitness": self.avg_fitness[:n].tolist(),
+            "evaluations": self.evaluations[:n].tolist(),
+            "avg_score": means[:, 1].tolist(),
+            "avg_positioning": means[:, 3].tolist(),
+            "max_catches": self.max_catches[:n].tolist(),
+        }
+        if self.individuals is not None:
+            stats["individuals"] = [
+                [dict(zip(FIELDS, row)) for row in rows]
+                for rows in self.individuals[:n]
+            ]
+        return stats
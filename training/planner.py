@@ -0,0 +1,171 @@
+import random
+import threading
+import time
+import numpy as np
+from heapq import nlargest
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from game.core_ai import ShootingGameEnv
+from game.types import Action
+
+PLAN_ACTIONS = (Action.LEFT.value, Action.RIGHT.value)
+
+# one scratch env per pool thread / process, restored from snapshots
+_local = threading.local()
+
+
+def rollout(env, actions, score_weight):
+    """Play ``actions`` on ``env``; value is reward sum + weighted score gain."""
+    start_score = env.score
+    total_reward = 0.0
+    # the value never looks at the state, so don't build it
+    tick = env.tick
+    for action in actions:
+        total_reward += tick(action)
+        if env.done:
+            break
+    return total_reward + score_weight * (env.score - start_score), env.done
+
+
+def _simulate(config, snapshot, actions, score_weight):
+    env = getattr(_local, "env", None)
+    if env is None or (env.max_steps, env.endless) != config:
+        env = _local.env = ShootingGameEnv(max_steps=config[0], endless=config[1])
+    env.restore(snapshot)
+    value, done = rollout(env, actions, score_weight)
+    return value, done, env.snapshot()
+
+
+class LookaheadPlanner:
+    """Beam search over LEFT/RIGHT using clones of a deterministic env.
+
+    Every search level holds each action for ``repeat`` ticks, so the plan
+    looks ``depth * repeat`` ticks ahead; only ``beam_width`` best sequences
+    are expanded further. Each surviving sequence is then scored with
+    ``rollouts`` random continuations of ``rollout_ticks`` ticks. A node's
+    value is the positioning reward plus ``score_weight`` times the score
+    gained, like the GA fitness.
+
+    With ``workers > 1`` expansions and rollouts are fanned out to a thread
+    or process pool (``executor="thread"`` or ``"process"``); results do not
+    depend on the pool. The planner is called with the current state like
+    a model policy and returns a game action, replanning every ``repeat``
+    ticks.
+    """
+
+    def __init__(
+        self,
+        env,
+        depth=4,
+        repeat=8,
+        beam_width=4,
+        rollouts=2,
+        rollout_ticks=60,
+        score_weight=3.0,
+        workers=1,
+        executor="process",
+        seed=0,
+    ):
+        self.env = env
+        self.depth = depth
+        self.repeat = repeat
+        self.beam_width = beam_width
+        self.rollouts = rollouts
+        self.rollout_ticks = rollout_ticks
+        self.score_weight = score_weight
+        self._random = random.Random(seed)
+        self._queue = []
+        self.decision_times = []
+
+        self._pool = None
+        if workers > 1:
+            pool_cls = (
+                ProcessPoolExecutor if executor == "process" else ThreadPoolExecutor
+            )
+            self._pool = pool_cls(workers)
+
+    def __call__(self, state):
+        if not self._queue:
+            start = time.perf_counter()
+            action = self.plan()
+            self.decision_times.append(time.perf_counter() - start)
+            self._queue = [action] * self.repeat
+        return self._queue.pop()
+
+    def plan(self):
+        """Best first action for the env's current state."""
+        # beam nodes: (value, first action, done, env clone or snapshot)
+        if self._pool is None:
+            root = self.env.clone()
+        else:
+            root = self.env.snapshot()
+        beam = [(0.0, None, False, root)]
+
+        for level in range(self.depth):
+            expand = [node for node in beam if not node[2]]
+            if not expand:
+                break
+            tasks = [(node, action) for node in expand for action in PLAN_ACTIONS]
+            results = self._run(
+                [(node[3], [action] * self.repeat) for node, action in tasks]
+            )
+            children = [node for node in beam if node[2]]
+            for (node, action), (value, done, state) in zip(tasks, results):
+                first = action if node[1] is None else node[1]
+                children.append((node[0] + value, first, done, state))
+            # ties keep the earlier (LEFT-first) sequence
+            beam = nlargest(self.beam_width, children, key=lambda n: n[0])
+
+        if self.rollouts > 0:
+            tasks = [
+                (node, self._random_actions())
+                for node in beam
+                if not node[2]
+                for _ in range(self.rollouts)
+            ]
+            results = self._run([(node[3], actions) for node, actions in tasks])
+            totals = {}
+            for (node, _), (value, _, _) in zip(tasks, results):
+                totals[id(node)] = totals.get(id(node), 0.0) + value
+            beam = [
+                (node[0] + totals.get(id(node), 0.0) / self.rollouts,) + node[1:]
+                for node in beam
+            ]
+
+        return max(beam, key=lambda n: n[0])[1] or PLAN_ACTIONS[0]
+
+    def stats(self):
+        times = np.array(self.decision_times)
+        if not len(times):
+            return {"decisions": 0}
+        return {
+            "decisions": len(times),
+            "decisions_per_sec": float(len(times) / times.sum()),
+            "latency_ms_mean": float(times.mean() * 1000),
+            "latency_ms_p50": float(np.percentile(times, 50) * 1000),
+            "latency_ms_p95": float(np.percentile(times, 95) * 1000),
+        }
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+    def _random_actions(self):
+        return [self._random.choice(PLAN_ACTIONS) for _ in range(self.rollout_ticks)]
+
+    def _run(self, jobs):
+        # jobs: (env clone or snapshot, actions) -> (value, done, new state)
+        if self._pool is None:
+            results = []
+            for env, actions in jobs:
+                env = env.clone()
+                value, done = rollout(env, actions, self.score_weight)
+                results.append((value, done, env))
+            return results
+
+        config = (self.env.max_steps, self.env.endless)
+        futures = [
+            self._pool.submit(_simulate, config, snapshot, actions, self.score_weight)
+            for snapshot, actions in jobs
+        ]
+        return [future.result() for future in futures]
@@ -0,0 +1,202 @@
+import numpy as np
+from collections import OrderedDict
+
+
+class _Node:
+    __slots__ = ("parent", "key", "children", "checkpoint", "result")
+
+    def __init__(self, parent=None, key=None):
+        self.parent = parent
+        self.key = key
+        self.children = {}
+        # (env snapshot, positioning reward, catches, score) after this chunk
+        self.checkpoint = None
+        # final play_solution result when the game ended inside this chunk
+        self.result = None
+
+
+class PrefixCache:
+    """Env snapshots along evaluated action prefixes of a deterministic env.
+
+    Prefixes are stored in a trie keyed by chunks of ``chunk_size`` actions.
+    After every full chunk the env state and the running fitness sums are
+    checkpointed, so a new chromosome resumes from the longest cached prefix
+    it shares with earlier ones instead of simulating from tick 0. At most
+    ``max_snapshots`` checkpoints (and finished-game results) are kept, least
+    recently used ones are evicted first.
+
+    Only valid for envs whose ``reset`` is deterministic (``true_seed=True``)
+    and for a single env configuration per cache.
+    """
+
+    def __init__(self, chunk_size=50, max_snapshots=4096):
+        self.chunk_size = chunk_size
+        self.max_snapshots = max_snapshots
+        self._root = _Node()
+        self._lru = OrderedDict()
+        # snapshots taken at the same tick usually share one RNG state
+        self._rng_states = {}
+        self._last_rng_state = (None, None)
+        self.lookups = 0
+        self.hits = 0
+        self.total_ticks = 0
+        self.simulated_ticks = 0
+        # ticks the last play() covered, like env.ticks after play_solution
+        self.last_ticks = 0
+
+    def __len__(self):
+        return len(self._lru)
+
+    def clear(self):
+        self._root = _Node()
+        self._lru.clear()
+        self._rng_states.clear()
+        self._last_rng_state = (None, None)
+
+    def stats(self):
+        return {
+            "snapshots": len(self._lru),
+            "hit_rate": self.hits / self.lookups if self.lookups else 0.0,
+            "simulated_ticks": self.simulated_ticks,
+            "total_ticks": self.total_ticks,
+            "saved_ticks_ratio": (
+                1 - self.simulated_ticks / self.total_ticks if self.total_ticks else 0.0
+            ),
+        }
+
+    def play(self, env, solution, repeat=1):
+        """Same result as ``play_solution(env, solution, repeat)``, reusing prefixes.
+
+        A cache must always be used with the same ``repeat``.
+
+        Returns (total_fitness, final_score, allies_catches, positioning_fitness).
+        """
+        if not env.true_seed:
+            raise ValueError("PrefixCache needs an env created with true_seed=True")
+
+        actions = np.asarray(solution).astype(np.int8)
+        size = self.chunk_size
+        num_chunks = len(actions) // size
+        self.lookups += 1
+
+        # walk down the trie to the deepest usable checkpoint
+        node = self._root
+        resume = None
+        depth = 0
+        for k in range(num_chunks):
+            node = node.children.get(actions[k * size : (k + 1) * size].tobytes())
+            if node is None:
+                break
+            if node.result is not None:
+                self.hits += 1
+                self._lru.move_to_end(node)
+                self.total_ticks += node.result[4]
+                self.last_ticks = node.result[4]
+                return node.result[:4]
+            if node.checkpoint is not None:
+                resume = node
+                depth = k + 1
+
+        if resume is not None:
+            self.hits += 1
+            self._lru.move_to_end(resume)
+            snapshot, total_positioning_reward, allies_catches, final_score = (
+                resume.checkpoint
+            )
+            env.restore(snapshot)
+            node = resume
+        else:
+            env.reset()
+            total_positioning_reward = 0
+            allies_catches = 0
+            final_score = 0
+            node = self._root
+
+        resumed = steps = depth * size * repeat
+        self.total_ticks += steps
+        done = False
+        tick = env.tick
+        for k in range(depth, -(-len(actions) // size)):
+            chunk = actions[k * size : (k + 1) * size]
+            for action in chunk.tolist():
+                for _ in range(repeat):
+                    reward = tick(action)
+                    steps += 1
+
+                    total_positioning_reward += reward
+                    if reward > 0.4:
+                        allies_catches += 1
+
+                    done = env.done
+                    if done:
+                        break
+                if done:
+                    break
+            final_score = env.score
+
+            full_chunk = len(chunk) == size
+            if full_chunk:
+                node = self._child(node, chunk.tobytes())
+            if done:
+                break
+            if full_chunk:
+                self._store(
+                    node,
+                    checkpoint=(
+                        self._snapshot(env),
+                        total_positioning_reward,
+                        allies_catches,
+                        final_score,
+                    ),
+                )
+
+        self.simulated_ticks += steps - resumed
+        self.total_ticks += steps - resumed
+        self.last_ticks = steps
+
+        total_fitness = total_positioning_reward + final_score * 3 + allies_catches
+        result = (total_fitness, final_score, allies_catches, total_positioning_reward)
+        if done and full_chunk:
+            # every chromosome sharing this prefix ends the same way
+            self._store(node, result=result + (steps,))
+        return result
+
+    def _child(self, node, key):
+        child = node.children.get(key)
+        if child is None:
+            child = node.children[key] = _Node(node, key)
+        return child
+
+    def _snapshot(self, env):
+        snapshot = env.snapshot()
+        rng_state = snapshot[-1]
+        last, interned = self._last_rng_state
+        if rng_state is not last:
+            interned = self._rng_states.setdefault(rng_state, rng_state)
+            self._last_rng_state = (rng_state, interned)
+        return snapshot[:-1] + (interned,)
+
+    def _store(self, node, checkpoint=None, result=None):
+        node.checkpoint = checkpoint
+        node.result = result
+        self._lru[node] = None
+        self._lru.move_to_end(node)
+        while len(self._lru) > self.max_snapshots:
+            evicted, _ = self._lru.popitem(last=False)
+            evicted.checkpoint = None
+            evicted.result = None
+            self._prune(evicted)
+        if len(self._rng_states) > self.max_snapshots:
+            self._rng_states.clear()
+            self._last_rng_state = (None, None)
+
+    def _prune(self, node):
+        # drop branches that no longer hold a checkpoint or a result
+        while (
+            node.parent is not None
+            and not node.children
+            and node.checkpoint is None
+            and node.result is None
+        ):
+            del node.parent.children[node.key]
+            node = node.parent
@@ -2,10 +2,16 @@ import numpy as np
 from game.core_ai import ShootingGameEnv
 import os
 
+# draw every Nth tick; with DISPLAY_FPS set the game runs at full speed instead
+RENDER_EVERY = 1
+DISPLAY_FPS = None
+
 
 def evaluate_solution(solution):
     total_reward = 0
     env = ShootingGameEnv(seed=7, true_seed=True, render_mode=True)
+    env.render_every = RENDER_EVERY
+    env.display_fps = DISPLAY_FPS
     for action in solution:
         _, reward, score, done = env.step(action)
         total_reward += reward
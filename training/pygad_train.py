@@ -1,72 +1,293 @@
 import numpy as np
 from game.core_ai import ShootingGameEnv
-import pygad
-import matplotlib.pyplot as plt
+from game.vec_env import VecShootingGameEnv
+from training.prefix_cache import PrefixCache
+from training.fitness_cache import FitnessCache
+from training.ga_stats import GenerationStats
+from concurrent.futures import ProcessPoolExecutor
 from os import path
+import os
+import argparse
 import json
+import time
 
+# Main training parameters
+sequence_length = 1000
+generations = 70
+success_threshold = 820.0  # Adjusted for new fitness function
+num_trials = 5
+population_size = 200
+mutation_percent_genes = 20
+env_seed = 7
+# seed of the GA's own random choices (None = different every run)
+ga_seed = None
+# where solutions, trial stats, the summary and the plot are written
+output_dir = path.join("training", "pygad_sols")
+# "pygad", or "native" for training.ga with the population played as one batch
+engine = "pygad"
+# >1 scores each generation on a process pool, one seeded env per worker
+# (this and the two caches below only apply to the pygad engine)
+num_workers = 1
+# >0 resumes chromosomes from cached env snapshots of shared action prefixes
+prefix_cache_size = 0
+# >0 memoizes up to N results by the played part of a chromosome
+fitness_cache_size = 0
+# >0 prints env step phase timings every N generations (serial scoring only)
+profile_every = 0
+# ticks every gene is held for; the chromosome has sequence_length / k genes
+gene_repeat = 1
+# directory of a trajectory dataset that gets the best rollout of every generation
+export_dir = None
+# JSONL file that gets one record per generation (see training.telemetry)
+telemetry_log = None
+# also keep the result of every single rollout in the trial stats (large)
+keep_individuals = False
+# the settings above, the ones an experiment sweep may change
+PARAMETERS = (
+    "sequence_length",
+    "generations",
+    "success_threshold",
+    "num_trials",
+    "population_size",
+    "mutation_percent_genes",
+    "env_seed",
+    "ga_seed",
+    "output_dir",
+    "engine",
+    "num_workers",
+    "prefix_cache_size",
+    "fitness_cache_size",
+    "profile_every",
+    "gene_repeat",
+    "export_dir",
+    "telemetry_log",
+    "keep_individuals",
+)
 
-def fitness_func_detailed(instance, solution, solution_idx):
+# environment used by fitness_func_detailed, created per trial
+env = None
+# worker pool used by fitness_func_batch, created per trial
+pool = None
+# VecShootingGameEnv used by fitness_func_population, one row per solution
+vec_env = None
+# PrefixCache of the env above (per process), None when disabled
+cache = None
+# FitnessCache of the main process, None when disabled
+fitness_cache = None
+# TrajectoryWriter for export_dir, created per trial
+writer = None
+# TelemetryLog for telemetry_log, created per trial
+telemetry = None
+# GenerationStats of the running trial (rollouts are not recorded when None)
+stats = None
+
+
+def play_solution(env, solution, repeat=1):
+    """Play an action sequence from a fresh reset, each action ``repeat`` ticks.
+
+    Returns (total_fitness, final_score, allies_catches, positioning_fitness).
+    """
     env.reset()
     total_positioning_reward = 0
-    final_score = 0
     allies_catches = 0
+    tick = env.tick
 
-    for i in range(len(solution)):
-        action = int(solution[i])
-        state, reward, score, done = env.step(action)
+    for action in solution.tolist():
+        for _ in range(repeat):
+            # the fitness never looks at the state, so don't build it
+            reward = tick(action)
 
-        total_positioning_reward += reward
-        if reward > 0.4:
-            allies_catches += 1
+            total_positioning_reward += reward
+            if reward > 0.4:
+                allies_catches += 1
 
-        final_score = score
-        if done:
+            if env.done:
+                break
+        if env.done:
             break
 
+    final_score = env.score
+
     pos_fitness = total_positioning_reward
     eff_fitness = allies_catches
 
     total_fitness = pos_fitness + final_score * 3 + eff_fitness
 
-    if not hasattr(instance, "detailed_stats"):
-        instance.detailed_stats = []
-
-    instance.detailed_stats.append(
-        {
-            "generation": getattr(instance, "generations_completed", 0),
-            "total_fitness": total_fitness,
-            "final_score": final_score,
-            "allies_catches": allies_catches,
-            "positioning_fitness": pos_fitness,
-        }
+    return total_fitness, final_score, allies_catches, pos_fitness
+
+
+def play_population(env, population, repeat=1):
+    """``play_solution`` for every row of ``population``, all in lockstep.
+
+    ``env`` is a ``VecShootingGameEnv`` with one row per solution, every row
+    seeded like the scalar env. Games that end are reset by the env and
+    stop counting. Returns one row per solution of
+    (total_fitness, final_score, allies_catches, positioning_fitness).
+    """
+    env.reset()
+    n = len(population)
+    total_positioning_reward = np.zeros(n)
+    allies_catches = np.zeros(n, dtype=np.int64)
+    final_score = np.zeros(n, dtype=np.int64)
+    playing = np.ones(n, dtype=bool)
+
+    for actions in np.ascontiguousarray(population.T):
+        for _ in range(repeat):
+            rewards, scores, dones = env.tick(actions)
+
+            total_positioning_reward += np.where(playing, rewards, 0.0)
+            allies_catches += playing & (rewards > 0.4)
+            final_score = np.where(playing, scores, final_score)
+            playing &= ~dones
+        if not playing.any():
+            break
+
+    total_fitness = total_positioning_reward + final_score * 3 + allies_catches
+    return np.column_stack(
+        [total_fitness, final_score, allies_catches, total_positioning_reward]
+    )
+
+
+def fitness_func_population(ga, population):
+    global vec_env
+    if vec_env is None or vec_env.num_envs != len(population):
+        vec_env = VecShootingGameEnv(
+            len(population), seeds=[env_seed] * len(population), true_seed=True
+        )
+    results = play_population(vec_env, population, gene_repeat)
+    if stats is not None:
+        stats.add_batch(ga.generations_completed, results)
+    return results[:, 0]
+
+
+def play(solution):
+    """Play a solution, returns its result and the number of ticks played."""
+    if cache is not None:
+        result = cache.play(env, solution, gene_repeat)
+        return result, cache.last_ticks
+    result = play_solution(env, solution, gene_repeat)
+    return result, env.ticks
+
+
+def evaluate(solution):
+    if fitness_cache is None:
+        return play(solution)[0]
+    result = fitness_cache.get(solution)
+    if result is None:
+        result, ticks = play(solution)
+        fitness_cache.put(solution, result, ticks)
+    return result
+
+
+def fitness_func_detailed(instance, solution, solution_idx):
+    result = evaluate(solution)
+    if stats is not None:
+        stats.add(instance.generations_completed, result)
+    return result[0]
+
+
+def _init_worker(seed, cache_size, repeat):
+    global env, cache, gene_repeat
+    gene_repeat = repeat
+    env = ShootingGameEnv(seed=seed, true_seed=True)
+    cache = PrefixCache(max_snapshots=cache_size) if cache_size > 0 else None
+
+
+def _evaluate_chunk(solutions):
+    # one float64 row (result, ticks) per solution keeps it cheap to send back
+    return np.array(
+        [(*result, ticks) for result, ticks in map(play, solutions)],
+        dtype=np.float64,
     )
 
-    return total_fitness
+
+def fitness_func_batch(instance, solutions, solution_indices):
+    """Score a batch of solutions split into one chunk per pool worker.
+
+    Solutions found in the fitness cache are not sent to the workers.
+    """
+    results = np.empty((len(solutions), 4))
+    todo = np.arange(len(solutions))
+    if fitness_cache is not None:
+        missing = []
+        for i, solution in enumerate(solutions):
+            result = fitness_cache.get(solution)
+            if result is None:
+                missing.append(i)
+            else:
+                results[i] = result
+        todo = np.array(missing, dtype=np.int64)
+
+    if len(todo):
+        chunks = np.array_split(solutions[todo], min(num_workers, len(todo)))
+        played = np.concatenate(list(pool.map(_evaluate_chunk, chunks)))
+        results[todo] = played[:, :4]
+        if fitness_cache is not None:
+            for i, row in zip(todo, played):
+                fitness_cache.put(solutions[i], row[:4], int(row[4]))
+
+    if stats is not None:
+        stats.add_batch(instance.generations_completed, results)
+    return results[:, 0]
+
+
+def export_rollout(writer, solution, repeat=1):
+    """Play ``solution`` on a fresh env and append its transitions to ``writer``."""
+    env = ShootingGameEnv(seed=env_seed, true_seed=True)
+    state = env.get_state()
+    for action in np.repeat(solution, repeat).tolist():
+        next_state, reward, _, done = env.step(action)
+        writer.append(state, action, reward, next_state, done)
+        state = next_state
+        if done:
+            break
+    if not env.done:
+        writer.end_episode()
 
 
 def on_generation_detailed(ga):
-    _, best_fitness, __ = ga.best_solution()
+    # the GA has scored this population already, so don't let it score again
+    fitness = ga.last_generation_fitness
+    best_solution, best_fitness, _ = ga.best_solution(pop_fitness=fitness)
     current_gen = ga.generations_completed
 
-    if hasattr(ga, "detailed_stats"):
-        current_gen_stats = [
-            s for s in ga.detailed_stats if s["generation"] == current_gen
-        ]
+    if current_gen == 1:
+        stats.end_generation(0, ga.previous_generation_fitness)
+    stats.end_generation(current_gen, fitness)
+    avg_fitness = stats.avg_fitness[current_gen]
+    avg_positioning = stats.mean(current_gen, "positioning_fitness")
+    avg_score = stats.mean(current_gen, "final_score")
+    max_allies = stats.max_catches[current_gen]
 
-        if current_gen_stats:
-            avg_fitness = np.mean([s["total_fitness"] for s in current_gen_stats])
-            avg_positioning = np.mean(
-                [s["positioning_fitness"] for s in current_gen_stats]
-            )
-            avg_score = np.mean([s["final_score"] for s in current_gen_stats])
-            max_allies = max([s["allies_catches"] for s in current_gen_stats])
+    print(
+        f"Gen {current_gen:3d} | Best: {best_fitness:8.2f} | Avg: {avg_fitness:6.2f} | "
+        f"Pos: {avg_positioning:6.2f} | AvgScore: {avg_score:6.1f} | "
+        f"Catches: {max_allies}"
+    )
 
-            print(
-                f"Gen {current_gen:3d} | Best: {best_fitness:8.2f} | Avg: {avg_fitness:6.2f} | "
-                f"Pos: {avg_positioning:6.2f} | AvgScore: {avg_score:6.1f} | "
-                f"Catches: {max_allies}"
-            )
+    if telemetry is not None:
+        now = time.perf_counter()
+        seconds = now - ga.generation_started
+        ga.generation_started = now
+        telemetry.log(
+            trial=ga.trial,
+            generation=current_gen,
+            best_fitness=float(best_fitness),
+            avg_fitness=float(avg_fitness),
+            avg_positioning=float(avg_positioning),
+            avg_score=float(avg_score),
+            max_catches=int(max_allies),
+            seconds=round(seconds, 4),
+            evals_per_sec=round(int(stats.evaluations[current_gen]) / seconds, 1),
+        )
+
+    if writer is not None:
+        export_rollout(writer, best_solution, gene_repeat)
+
+    if env.profiler is not None and current_gen % profile_every == 0:
+        print(f"Env step phases (last {profile_every} generations):")
+        print(env.profiler.format())
+        env.profiler.reset()
 
 
 def evaluate_solution(solution, env, num_evaluations=10):
@@ -77,21 +298,21 @@ def evaluate_solution(solution, env, num_evaluations=10):
         env.reset()
         total_positioning_reward = 0
         allies_catches = 0
-        f_score = 0
+        tick = env.tick
 
-        for action in solution:
-            state, reward, score, done = env.step(int(action))
+        for action in solution.tolist():
+            # like play_solution, the state is never looked at
+            reward = tick(action)
             total_positioning_reward += reward
             if reward > 0.4:
                 allies_catches += 1
 
-            f_score = score
-            if done:
+            if env.done:
                 break
 
         results.append(
             {
-                "final_score": f_score,
+                "final_score": env.score,
                 "positioning_reward": total_positioning_reward,
                 "allies_catches": allies_catches,
             }
@@ -100,55 +321,103 @@ def evaluate_solution(solution, env, num_evaluations=10):
     return results
 
 
-# Main training parameters
-sequence_length = 1000
-generations = 70
-success_threshold = 820.0  # Adjusted for new fitness function
-num_trials = 5
-
-all_trial_stats = []
-generations_needed = []
+def run_trial(trial):
+    global env, vec_env, pool, cache, fitness_cache, writer, telemetry, stats
 
-for trial in range(num_trials):
+    if telemetry_log and telemetry_log.endswith(".csv"):
+        # CSV columns are fixed, trial_end records have other fields
+        raise ValueError("the GA log holds several kinds of records, use .jsonl")
     print(f"\n=== TRIAL {trial + 1}/{num_trials} ===")
-    env = ShootingGameEnv(seed=7, true_seed=True)
+    env = ShootingGameEnv(seed=env_seed, true_seed=True)
+    stats = GenerationStats(generations, keep_individuals)
+    if engine == "pygad" and fitness_cache_size > 0:
+        fitness_cache = FitnessCache(env_seed, gene_repeat, fitness_cache_size)
+    if profile_every > 0 and num_workers == 1:
+        env.enable_profiling()
+    if engine == "pygad" and num_workers > 1:
+        pool = ProcessPoolExecutor(
+            num_workers,
+            initializer=_init_worker,
+            initargs=(env_seed, prefix_cache_size, gene_repeat),
+        )
+        fitness_kwargs = dict(
+            fitness_func=fitness_func_batch, fitness_batch_size=population_size
+        )
+    else:
+        fitness_kwargs = dict(fitness_func=fitness_func_detailed)
+        if engine == "pygad" and prefix_cache_size > 0:
+            cache = PrefixCache(max_snapshots=prefix_cache_size)
+    if export_dir:
+        from training.dataset import TrajectoryWriter
+
+        writer = TrajectoryWriter(export_dir)
+    if telemetry_log:
+        from training.telemetry import TelemetryLog
 
-    ga_instance = pygad.GA(
+        telemetry = TelemetryLog(telemetry_log)
+
+    # 100 parents, 10 elites and tournaments of 50 for the default 200
+    ga_params = dict(
         num_generations=generations,
-        num_parents_mating=100,
-        fitness_func=fitness_func_detailed,
-        sol_per_pop=200,
-        mutation_by_replacement=True,
-        mutation_percent_genes=20,  # type: ignore
-        parent_selection_type="tournament",
-        num_genes=sequence_length,
-        keep_elitism=10,
-        K_tournament=50,
+        num_parents_mating=max(2, population_size // 2),
+        sol_per_pop=population_size,
+        mutation_percent_genes=mutation_percent_genes,
+        num_genes=-(-sequence_length // gene_repeat),
+        keep_elitism=min(10, population_size // 4),
+        K_tournament=max(1, min(50, population_size // 4)),
         gene_space=[1, 2],
         stop_criteria=[f"reach_{success_threshold}"],
         on_generation=on_generation_detailed,
+        random_seed=ga_seed,
     )
+    if engine == "native":
+        from training.ga import GeneticAlgorithm
 
-    ga_instance.run()
-    solution, fitness, _ = ga_instance.best_solution()
+        ga_instance = GeneticAlgorithm(
+            fitness_func=fitness_func_population, **ga_params
+        )
+    else:
+        import pygad
+
+        ga_instance = pygad.GA(
+            mutation_by_replacement=True,
+            parent_selection_type="tournament",
+            **ga_params,
+            **fitness_kwargs,
+        )
+    ga_instance.trial = trial
+    ga_instance.generation_started = time.perf_counter()
 
+    try:
+        ga_instance.run()
+        solution, fitness, _ = ga_instance.best_solution(
+            pop_fitness=ga_instance.last_generation_fitness
+        )
+    finally:
+        if pool is not None:
+            pool.shutdown()
+            pool = None
+        if writer is not None:
+            writer.close()
+            writer = None
+        vec_env = None
+
+    # saved and evaluated one action per tick, like uncompressed solutions
+    solution = np.repeat(solution, gene_repeat)
     evaluation_results = evaluate_solution(solution, env)
 
-    np.save(path.join("training", "pygad_sols", f"sol_{trial}.npy"), solution)
+    os.makedirs(output_dir, exist_ok=True)
+    np.save(path.join(output_dir, f"sol_{trial}.npy"), solution)
 
     trial_stats = {
         "trial": trial,
         "best_fitness": fitness,
         "generations_completed": ga_instance.generations_completed,
         "evaluation_results": evaluation_results,
-        "detailed_stats": getattr(ga_instance, "detailed_stats", []),
+        "generation_stats": stats.to_dict(),
     }
 
-    all_trial_stats.append(trial_stats)
-
-    with open(
-        path.join("training", "pygad_sols", f"trial_{trial}_stats.json"), "w"
-    ) as f:
+    with open(path.join(output_dir, f"trial_{trial}_stats.json"), "w") as f:
         json.dump(trial_stats, f, indent=2)
 
     print(f"\nTrial {trial + 1} Results:")
@@ -160,101 +429,226 @@ for trial in range(num_trials):
         f"Avg Pos Reward: {np.mean([r['positioning_reward'] for r in evaluation_results]):.2f}"
     )
 
+    if cache is not None:
+        print(f"Prefix cache: {cache.stats()}")
+        cache = None
+    if fitness_cache is not None:
+        print(f"Fitness cache: {fitness_cache.stats()}")
+        fitness_cache = None
+
     env.close()
 
     gens = ga_instance.generations_completed
-    generations_needed.append(gens if fitness >= success_threshold else generations + 1)
+    gens_needed = gens if fitness >= success_threshold else generations + 1
+    if telemetry is not None:
+        telemetry.log(
+            event="trial_end",
+            trial=trial,
+            best_fitness=float(fitness),
+            generations=gens_needed,
+            successful=gens_needed <= generations,
+            eval_score=float(np.mean([r["final_score"] for r in evaluation_results])),
+            eval_positioning=float(
+                np.mean([r["positioning_reward"] for r in evaluation_results])
+            ),
+        )
+        telemetry.close()
+        telemetry = None
+    return trial_stats, gens_needed
 
-# Final Analysis and Plotting
-generations_needed = np.array(generations_needed)
-successful = generations_needed <= generations
 
-print(f"\n=== FINAL STATISTICS ===")
-print(f"Successful trials: {np.sum(successful)}/{num_trials}")
-if np.any(successful):
-    print(
-        f"Average generations (successful): {np.mean(generations_needed[successful]):.2f}"
+def plot_results(all_trial_stats, generations_needed, successful, out=None):
+    import matplotlib.pyplot as plt
+
+    fig, ((ax1, ax2), (ax3, ax4)) = plt.subplots(2, 2, figsize=(15, 10))
+
+    # Plot 1: Generations needed
+    ax1.bar(
+        range(1, len(all_trial_stats) + 1),
+        generations_needed,
+        color=["green" if s else "red" for s in successful],
     )
+    ax1.axhline(
+        np.mean(generations_needed[successful]) if np.any(successful) else 0,
+        color="blue",
+        linestyle="--",
+        label="Average (successful)",
+    )
+    ax1.set_title("Generations to Success")
+    ax1.set_xlabel("Trial")
+    ax1.set_ylabel("Generations")
+    ax1.legend()
+
+    # Plot 2: Best fitness evolution
+    for trial, stats in enumerate(all_trial_stats):
+        gen_stats = stats["generation_stats"]
+        if gen_stats["generation"]:
+            ax2.plot(
+                gen_stats["generation"],
+                gen_stats["best_fitness"],
+                label=f"Trial {trial+1}",
+                alpha=0.7,
+            )
 
-fig, ((ax1, ax2), (ax3, ax4)) = plt.subplots(2, 2, figsize=(15, 10))
+    ax2.set_title("Best Fitness Evolution")
+    ax2.set_xlabel("Generation")
+    ax2.set_ylabel("Best Fitness")
+    ax2.legend()
+
+    # Plot 3: Final evaluation scores
+    final_scores = []
+    for stats in all_trial_stats:
+        avg_score = np.mean([r["final_score"] for r in stats["evaluation_results"]])
+        final_scores.append(avg_score)
+
+    ax3.bar(range(1, len(all_trial_stats) + 1), final_scores)
+    ax3.set_title("Average Final Game Scores")
+    ax3.set_xlabel("Trial")
+    ax3.set_ylabel("Average Score")
+
+    # Plot 4: Positioning rewards
+    positioning_rewards = []
+    for stats in all_trial_stats:
+        avg_positioning = np.mean(
+            [r["positioning_reward"] for r in stats["evaluation_results"]]
+        )
+        positioning_rewards.append(avg_positioning)
+
+    ax4.bar(range(1, len(all_trial_stats) + 1), positioning_rewards)
+    ax4.set_title("Average Positioning Rewards")
+    ax4.set_xlabel("Trial")
+    ax4.set_ylabel("Average Positioning Reward")
+
+    plt.tight_layout()
+    if out:
+        plt.savefig(out, dpi=300)
+        return
+    plt.savefig(path.join(output_dir, "training_analysis.png"), dpi=300)
+    plt.show()
+
+
+def main():
+    all_trial_stats = []
+    generations_needed = []
+
+    for trial in range(num_trials):
+        trial_stats, gens = run_trial(trial)
+        all_trial_stats.append(trial_stats)
+        generations_needed.append(gens)
+
+    generations_needed = np.array(generations_needed)
+    summarize(all_trial_stats, generations_needed, generations_needed <= generations)
+    print(f"\nTraining complete")
+
+
+def summarize(all_trial_stats, generations_needed, successful, show=True):
+    """Print, plot and save the statistics of finished trials to output_dir."""
+    generations_needed = np.asarray(generations_needed)
+    successful = np.asarray(successful, dtype=bool)
+    total = len(all_trial_stats)
+
+    print(f"\n=== FINAL STATISTICS ===")
+    print(f"Successful trials: {np.sum(successful)}/{total}")
+    if np.any(successful):
+        print(
+            f"Average generations (successful): {np.mean(generations_needed[successful]):.2f}"
+        )
 
-# Plot 1: Generations needed
-ax1.bar(
-    range(1, num_trials + 1),
-    generations_needed,
-    color=["green" if g <= generations else "red" for g in generations_needed],
-)
-ax1.axhline(
-    np.mean(generations_needed[successful]) if np.any(successful) else 0,
-    color="blue",
-    linestyle="--",
-    label="Average (successful)",
-)
-ax1.set_title("Generations to Success")
-ax1.set_xlabel("Trial")
-ax1.set_ylabel("Generations")
-ax1.legend()
-
-# Plot 2: Best fitness evolution
-for trial, stats in enumerate(all_trial_stats):
-    if stats["detailed_stats"]:
-        gen_data = {}
-        for stat in stats["detailed_stats"]:
-            gen = stat["generation"]
-            if gen not in gen_data:
-                gen_data[gen] = []
-            gen_data[gen].append(stat["total_fitness"])
-
-        generations = sorted(gen_data.keys())
-        best_fitness_per_gen = [max(gen_data[gen]) for gen in generations]
-        ax2.plot(generations, best_fitness_per_gen, label=f"Trial {trial+1}", alpha=0.7)
-
-ax2.set_title("Best Fitness Evolution")
-ax2.set_xlabel("Generation")
-ax2.set_ylabel("Best Fitness")
-ax2.legend()
-
-# Plot 3: Final evaluation scores
-final_scores = []
-for stats in all_trial_stats:
-    avg_score = np.mean([r["final_score"] for r in stats["evaluation_results"]])
-    final_scores.append(avg_score)
-
-ax3.bar(range(1, num_trials + 1), final_scores)
-ax3.set_title("Average Final Game Scores")
-ax3.set_xlabel("Trial")
-ax3.set_ylabel("Average Score")
-
-# Plot 4: Positioning rewards
-positioning_rewards = []
-for stats in all_trial_stats:
-    avg_positioning = np.mean(
-        [r["positioning_reward"] for r in stats["evaluation_results"]]
+    plot_results(
+        all_trial_stats,
+        generations_needed,
+        successful,
+        out=None if show else path.join(output_dir, "training_analysis.png"),
+    )
+
+    # Save comprehensive results
+    summary = {
+        "total_trials": total,
+        "successful_trials": int(np.sum(successful)),
+        "success_rate": float(np.sum(successful) / total),
+        "avg_generations_successful": (
+            float(np.mean(generations_needed[successful]))
+            if np.any(successful)
+            else None
+        ),
+        "best_trial": int(np.argmax([s["best_fitness"] for s in all_trial_stats])),
+        "best_fitness": float(max([s["best_fitness"] for s in all_trial_stats])),
+    }
+
+    with open(path.join(output_dir, "training_summary.json"), "w") as f:
+        json.dump(summary, f, indent=2)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Train GA solutions with PyGAD")
+    parser.add_argument(
+        "--engine",
+        choices=["pygad", "native"],
+        default=engine,
+        help="GA implementation; native plays each population as one batch",
+    )
+    parser.add_argument(
+        "--out",
+        metavar="DIR",
+        default=output_dir,
+        help="directory for solutions, stats, the summary and the plot",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=num_workers,
+        help="processes scoring each generation (1 = serial)",
+    )
+    parser.add_argument(
+        "--prefix-cache",
+        type=int,
+        default=prefix_cache_size,
+        help="max env snapshots kept for shared action prefixes (0 = off)",
+    )
+    parser.add_argument(
+        "--fitness-cache",
+        type=int,
+        default=fitness_cache_size,
+        help="max results memoized by the played part of a chromosome (0 = off)",
+    )
+    parser.add_argument(
+        "--profile",
+        type=int,
+        default=profile_every,
+        help="print env step phase timings every N generations (0 = off)",
+    )
+    parser.add_argument(
+        "--gene-repeat",
+        type=int,
+        default=gene_repeat,
+        help="hold every gene for K ticks (chromosome compression)",
+    )
+    parser.add_argument(
+        "--export",
+        metavar="DIR",
+        default=export_dir,
+        help="append the best rollout of every generation to a dataset in DIR",
+    )
+    parser.add_argument(
+        "--log",
+        metavar="FILE",
+        default=telemetry_log,
+        help="append per-generation stats to FILE (.jsonl)",
+    )
+    parser.add_argument(
+        "--individuals",
+        action="store_true",
+        help="also save the result of every rollout in the trial stats",
     )
-    positioning_rewards.append(avg_positioning)
-
-ax4.bar(range(1, num_trials + 1), positioning_rewards)
-ax4.set_title("Average Positioning Rewards")
-ax4.set_xlabel("Trial")
-ax4.set_ylabel("Average Positioning Reward")
-
-plt.tight_layout()
-plt.savefig(path.join("training", "pygad_sols", "training_analysis.png"), dpi=300)
-plt.show()
-
-# Save comprehensive results
-summary = {
-    "total_trials": num_trials,
-    "successful_trials": int(np.sum(successful)),
-    "success_rate": float(np.sum(successful) / num_trials),
-    "avg_generations_successful": (
-        float(np.mean(generations_needed[successful])) if np.any(successful) else None
-    ),
-    "best_trial": int(np.argmax([s["best_fitness"] for s in all_trial_stats])),
-    "best_fitness": float(max([s["best_fitness"] for s in all_trial_stats])),
-}
-
-with open(path.join("training", "pygad_sols", "training_summary.json"), "w") as f:
-    json.dump(summary, f, indent=2)
-
-print(f"\nTraining complete")
+    args = parser.parse_args()
+    engine = args.engine
+    output_dir = args.out
+    num_workers = args.workers
+    prefix_cache_size = args.prefix_cache
+    fitness_cache_size = args.fitness_cache
+    profile_every = args.profile
+    gene_repeat = args.gene_repeat
+    export_dir = args.export
+    telemetry_log = args.log
+    keep_individuals = args.individuals
+    main()
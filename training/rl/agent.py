@@ -1,15 +1,44 @@
-import torch
+import argparse
+import os
 import random
+import time
 import numpy as np
-from collections import deque
 from game.core_ai import ShootingGameEnv
-from training.rl.model import Linear_QNet, QTrainer, DEVICE
-import matplotlib.pyplot as plt
+from game.wrappers import FrameSkip
+from training.rl.replay import ReplayBuffer
+from training.telemetry import RollingMean, RollingRate, TelemetryLog
 
 MAX_MEMORY = 100_000
 BATCH_SIZE = 1000
 LR = 0.005
 EPISODES = 500  # (recommended or even higher)
+SHARED_OBS = True  # store each observation once in the replay memory
+TARGET_UPDATE = 0  # sync a frozen target network every N updates (0 = off)
+PROFILE_EVERY = 0  # print env step phase timings every N episodes (0 = off)
+FRAME_SKIP = 1  # repeat every chosen action for N ticks
+EXPORT_DIR = None  # append every transition to a trajectory dataset there
+CHECKPOINT_EVERY = 50  # full, resumable checkpoint every N episodes (0 = off)
+CHECKPOINT_KEEP = 3  # newest checkpoints kept in MODEL_DIR/checkpoints
+TELEMETRY_LOG = None  # append one record per episode, e.g. "logs/dqn.jsonl"
+MODEL_DIR = "models"  # saved models, checkpoints go to MODEL_DIR/checkpoints
+SEED = None  # seeds the env, exploration and the network (None = env seed 1)
+# the constants above, the ones an experiment sweep may change
+PARAMETERS = (
+    "MAX_MEMORY",
+    "BATCH_SIZE",
+    "LR",
+    "EPISODES",
+    "SHARED_OBS",
+    "TARGET_UPDATE",
+    "PROFILE_EVERY",
+    "FRAME_SKIP",
+    "EXPORT_DIR",
+    "CHECKPOINT_EVERY",
+    "CHECKPOINT_KEEP",
+    "TELEMETRY_LOG",
+    "MODEL_DIR",
+    "SEED",
+)
 
 
 class Agent:
@@ -20,12 +49,19 @@ class Agent:
         self.epsilon_min = 0.01
         self.epsilon_decay = 0.995
         self.gamma = 0.95
-        self.memory = deque(maxlen=MAX_MEMORY)
+        self.memory = ReplayBuffer(MAX_MEMORY, 9, shared_obs=SHARED_OBS, seed=SEED)
+
+        # torch is only loaded once an agent (and so a model) is created
+        from training.rl.model import Linear_QNet, QTrainer, DEVICE
+
         self.model = Linear_QNet(9, 512, 2).to(DEVICE)
-        self.trainer = QTrainer(self.model, lr=LR, gamma=self.gamma)
+        self.trainer = QTrainer(
+            self.model, lr=LR, gamma=self.gamma, target_update=TARGET_UPDATE
+        )
 
     def remember(self, state, action, reward, next_state, done):
-        self.memory.append((state, action, reward, next_state, done))
+        action_idx = 0 if action == 1 else 1  # 1=LEFT->0, 2=RIGHT->1
+        self.memory.push(state, action_idx, reward, next_state, done)
 
     def train_short_memory(self, state, action, reward, next_state, done):
         action_idx = 0 if action == 1 else 1  # 1=LEFT->0, 2=RIGHT->1
@@ -36,37 +72,47 @@ class Agent:
         self.trainer.train_step(state, action_np, reward_np, next_state, done)
 
     def train_long_memory(self):
-        if len(self.memory) > BATCH_SIZE:
-            mini_sample = random.sample(self.memory, BATCH_SIZE)
-        else:
-            mini_sample = self.memory
-
-        states, actions, rewards, next_states, dones = zip(*mini_sample)
-        action_indices = [0 if action == 1 else 1 for action in actions]
-
-        states_np = np.array(states, dtype=np.float32)
-        next_states_np = np.array(next_states, dtype=np.float32)
-        actions_np = np.array(action_indices, dtype=np.int64)
-        rewards_np = np.array(rewards, dtype=np.float32)
-
-        self.trainer.train_step(
-            states_np, actions_np, rewards_np, next_states_np, dones
-        )
+        states, actions, rewards, next_states, dones = self.memory.sample(BATCH_SIZE)
+        self.trainer.train_step(states, actions, rewards, next_states, dones)
 
     def get_action(self, state):
         if random.random() < self.epsilon:
             move_idx = random.randint(0, 1)
         else:
-            state_tensor = torch.from_numpy(state).to(DEVICE)
-            with torch.no_grad():
-                prediction = self.model(state_tensor)
-                move_idx = torch.argmax(prediction).item()
+            move_idx = self.model.act(state)
 
         if self.epsilon > self.epsilon_min:
             self.epsilon *= self.epsilon_decay
 
         return 1 if move_idx == 0 else 2
 
+    def state_dict(self):
+        """Everything needed to continue training, copied.
+
+        Includes the global ``random`` and torch RNG states, which exploration
+        and sampling draw from.
+        """
+        import torch
+
+        return {
+            "n_games": self.n_games,
+            "epsilon": self.epsilon,
+            "trainer": self.trainer.state_dict(),
+            "memory": self.memory.state_dict(),
+            "random": random.getstate(),
+            "torch_random": torch.get_rng_state(),
+        }
+
+    def load_state_dict(self, state):
+        import torch
+
+        self.n_games = state["n_games"]
+        self.epsilon = state["epsilon"]
+        self.trainer.load_state_dict(state["trainer"])
+        self.memory.load_state_dict(state["memory"])
+        random.setstate(state["random"])
+        torch.set_rng_state(state["torch_random"])
+
 
 def calculate_win_reward(final_score, positioning_reward, steps_taken, max_steps):
 
@@ -86,7 +132,11 @@ def calculate_win_reward(final_score, positioning_reward, steps_taken, max_steps
     return reward
 
 
-def train():
+def train(resume=None):
+    """Train a new agent, or continue from the checkpoint file ``resume``.
+
+    ``resume="latest"`` continues from the newest checkpoint in MODEL_DIR.
+    """
     plot_scores = []
     plot_mean_scores = []
     plot_positioning_rewards = []
@@ -96,80 +146,189 @@ def train():
     max_steps = 1500
     total_positioning = 0
     wins = 0
-    recent_scores = deque(maxlen=100)
+    recent_scores = RollingMean(100)
+    recent_wins = RollingMean(100)
+    recent_positioning = RollingMean(100)
+    steps_per_sec = RollingRate(10)
+
+    if SEED is not None:
+        import torch
 
+        random.seed(SEED)
+        torch.manual_seed(SEED)
     agent = Agent()
-    env = ShootingGameEnv(render_mode=False, max_steps=max_steps)
+    env = ShootingGameEnv(
+        seed=1 if SEED is None else SEED, render_mode=False, max_steps=max_steps
+    )
+    if FRAME_SKIP > 1:
+        env = FrameSkip(env, FRAME_SKIP)
+    if PROFILE_EVERY:
+        env.enable_profiling()
+    writer = None
+    if EXPORT_DIR:
+        from training.dataset import TrajectoryWriter
+
+        writer = TrajectoryWriter(EXPORT_DIR)
+    checkpoint_dir = os.path.join(MODEL_DIR, "checkpoints")
+    checkpoints = None
+    if CHECKPOINT_EVERY:
+        from training.rl.checkpoint import CheckpointWriter
+
+        checkpoints = CheckpointWriter(checkpoint_dir, keep=CHECKPOINT_KEEP)
+    telemetry = None
+    if TELEMETRY_LOG:
+        telemetry = TelemetryLog(TELEMETRY_LOG)
 
     episode = 0
-    while episode < EPISODES:
-        env.reset()
-        state_old = env.get_state()
-        episode_positioning_reward = 0
-        steps_taken = 0
-
-        while not env.done:
-            final_move = agent.get_action(state_old)
-            state_new, positioning_reward, game_score, done = env.step(final_move)
-
-            episode_positioning_reward += positioning_reward
-            steps_taken += 1
-
-            if done:
-                total_reward = calculate_win_reward(
-                    game_score, positioning_reward, steps_taken, max_steps
+    if resume:
+        from training.rl.checkpoint import latest_checkpoint, load_checkpoint
+
+        if resume == "latest":
+            resume = latest_checkpoint(checkpoint_dir)
+            if resume is None:
+                raise FileNotFoundError(f"no checkpoint in {checkpoint_dir}")
+        state = load_checkpoint(resume)
+        agent.load_state_dict(state["agent"])
+        # the env only carries its RNG over to the next reset()
+        env.restore(state["env"])
+        episode = state["episode"]
+        total_score = state["total_score"]
+        total_positioning = state["total_positioning"]
+        wins = state["wins"]
+        for score in state["recent_scores"]:
+            recent_scores.add(score)
+            recent_wins.add(score >= 300)
+        plot_scores, plot_mean_scores, plot_positioning_rewards, plot_win_rate = state[
+            "plots"
+        ]
+        for positioning in plot_positioning_rewards[-100:]:
+            recent_positioning.add(positioning)
+        print(f"Resumed from {resume} at episode {episode}")
+
+    # a crash or Ctrl-C still writes what the writers have buffered
+    try:
+        while episode < EPISODES:
+            env.reset()
+            state_old = env.get_state()
+            episode_positioning_reward = 0
+            steps_taken = 0
+            episode_start = time.perf_counter()
+
+            while not env.done:
+                final_move = agent.get_action(state_old)
+                state_new, positioning_reward, game_score, done = env.step(final_move)
+
+                episode_positioning_reward += positioning_reward
+                # env ticks, a FrameSkip step plays several
+                steps_taken = env.ticks
+
+                if done:
+                    total_reward = calculate_win_reward(
+                        game_score, positioning_reward, steps_taken, max_steps
+                    )
+                else:
+                    total_reward = positioning_reward
+
+                agent.train_short_memory(
+                    state_old, final_move, total_reward, state_new, done
+                )
+                agent.remember(state_old, final_move, total_reward, state_new, done)
+                if writer is not None:
+                    writer.append(state_old, final_move, total_reward, state_new, done)
+
+                state_old = state_new
+
+                if done:
+                    break
+
+            # finishing episode
+            agent.n_games += 1
+            agent.train_long_memory()
+            final_score = env.score
+            recent_scores.add(final_score)
+            recent_wins.add(final_score >= 300)
+            recent_positioning.add(episode_positioning_reward)
+            steps_per_sec.add(steps_taken, time.perf_counter() - episode_start)
+
+            if final_score >= 300:
+                wins += 1
+
+            win_rate = recent_wins.mean
+
+            if episode % max(1, EPISODES // 20) == 0:
+                avg_recent_score = recent_scores.mean
+                print(f"Episode {episode + 1}/{EPISODES}")
+                print(f"  Score: {final_score}")
+                print(f"  Positioning Reward: {episode_positioning_reward:.2f}")
+                print(f"  Win Rate (last 100): {win_rate:.2%}")
+                print(f"  Avg Score (last 100): {avg_recent_score:.1f}")
+                print(f"  Epsilon: {agent.epsilon:.3f}")
+                print(f"  Total Wins: {wins}")
+
+            plot_scores.append(final_score)
+            plot_positioning_rewards.append(episode_positioning_reward)
+            plot_win_rate.append(win_rate)
+
+            total_score += final_score
+            total_positioning += episode_positioning_reward
+
+            mean_score = total_score / agent.n_games
+            plot_mean_scores.append(mean_score)
+
+            episode += 1
+
+            if telemetry is not None:
+                telemetry.log(
+                    episode=episode,
+                    score=final_score,
+                    mean_score=mean_score,
+                    avg_score=recent_scores.mean,
+                    win_rate=win_rate,
+                    positioning=episode_positioning_reward,
+                    avg_positioning=recent_positioning.mean,
+                    epsilon=agent.epsilon,
+                    steps=steps_taken,
+                    steps_per_sec=round(steps_per_sec.rate, 1),
+                    wins=wins,
                 )
-            else:
-                total_reward = positioning_reward
-
-            agent.train_short_memory(
-                state_old, final_move, total_reward, state_new, done
-            )
-            agent.remember(state_old, final_move, total_reward, state_new, done)
-
-            state_old = state_new
-
-            if done:
-                break
-
-        # finishing episode
-        agent.n_games += 1
-        agent.train_long_memory()
-        final_score = env.score
-        recent_scores.append(final_score)
-
-        if final_score >= 300:
-            wins += 1
-
-        recent_wins = sum(1 for score in recent_scores if score >= 300)
-        win_rate = recent_wins / len(recent_scores) if recent_scores else 0
-
-        if episode % (EPISODES // 20) == 0:
-            avg_recent_score = np.mean(recent_scores) if recent_scores else 0
-            print(f"Episode {episode + 1}/{EPISODES}")
-            print(f"  Score: {final_score}")
-            print(f"  Positioning Reward: {episode_positioning_reward:.2f}")
-            print(f"  Win Rate (last 100): {win_rate:.2%}")
-            print(f"  Avg Score (last 100): {avg_recent_score:.1f}")
-            print(f"  Epsilon: {agent.epsilon:.3f}")
-            print(f"  Total Wins: {wins}")
-
-        plot_scores.append(final_score)
-        plot_positioning_rewards.append(episode_positioning_reward)
-        plot_win_rate.append(win_rate)
-
-        total_score += final_score
-        total_positioning += episode_positioning_reward
-
-        mean_score = total_score / agent.n_games
-        plot_mean_scores.append(mean_score)
-
-        episode += 1
-
-        if episode % (EPISODES // 10) == 0:
-            agent.model.save(file_name=f"model_checkpoint_{episode}.pth")
 
-    agent.model.save(file_name="model_final.pth")
+            if PROFILE_EVERY and episode % PROFILE_EVERY == 0:
+                print(f"Env step phases (last {PROFILE_EVERY} episodes):")
+                print(env.profiler.format())
+                env.profiler.reset()
+
+            if episode % max(1, EPISODES // 10) == 0:
+                agent.model.save(f"model_checkpoint_{episode}.pth", MODEL_DIR)
+                if writer is not None:
+                    writer.flush()
+
+            if checkpoints is not None and episode % CHECKPOINT_EVERY == 0:
+                # copied now, written to disk on the checkpoint thread
+                state = {
+                    "agent": agent.state_dict(),
+                    "env": env.snapshot(),
+                    "episode": episode,
+                    "total_score": total_score,
+                    "total_positioning": total_positioning,
+                    "wins": wins,
+                    "recent_scores": list(recent_scores.values),
+                    "plots": (
+                        list(plot_scores),
+                        list(plot_mean_scores),
+                        list(plot_positioning_rewards),
+                        list(plot_win_rate),
+                    ),
+                }
+                checkpoints.save(episode, state)
+
+        agent.model.save("model_final.pth", MODEL_DIR)
+    finally:
+        if writer is not None:
+            writer.close()
+        if checkpoints is not None:
+            checkpoints.close()
+        if telemetry is not None:
+            telemetry.close()
 
     print(f"\nTraining Complete!")
     print(f"Total Wins: {wins}/{EPISODES} ({wins/EPISODES:.2%})")
@@ -177,9 +336,10 @@ def train():
     return plot_scores, plot_mean_scores, plot_positioning_rewards, plot_win_rate
 
 
-if __name__ == "__main__":
-    plot_scores, plot_mean_scores, plot_positioning_rewards, plot_win_rate = train()
-    print("Training finished.")
+def plot_training(
+    plot_scores, plot_mean_scores, plot_positioning_rewards, plot_win_rate, out=None
+):
+    import matplotlib.pyplot as plt
 
     fig, ((ax1, ax2), (ax3, ax4)) = plt.subplots(2, 2, figsize=(15, 10))
 
@@ -207,4 +367,41 @@ if __name__ == "__main__":
     ax4.legend()
 
     plt.tight_layout()
+    if out:
+        plt.savefig(out)
+        return
     plt.show()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Train the DQN agent")
+    parser.add_argument(
+        "--resume",
+        nargs="?",
+        const="latest",
+        metavar="CHECKPOINT",
+        help="continue from a checkpoint file (default: the newest one)",
+    )
+    parser.add_argument(
+        "--log",
+        metavar="FILE",
+        default=TELEMETRY_LOG,
+        help="append per-episode stats to FILE (.jsonl or .csv)",
+    )
+    args = parser.parse_args()
+    TELEMETRY_LOG = args.log
+    resume = args.resume
+    if resume == "latest":
+        from training.rl.checkpoint import latest_checkpoint
+
+        if latest_checkpoint(os.path.join(MODEL_DIR, "checkpoints")) is None:
+            parser.error("no checkpoint found to resume from")
+
+    plot_scores, plot_mean_scores, plot_positioning_rewards, plot_win_rate = train(
+        resume
+    )
+    print("Training finished.")
+
+    plot_training(
+        plot_scores, plot_mean_scores, plot_positioning_rewards, plot_win_rate
+    )
@@ -0,0 +1,282 @@
+import argparse
+import multiprocessing as mp
+import queue
+import random
+import time
+import numpy as np
+from collections import deque
+from game.core_ai import ShootingGameEnv
+from training.rl.agent import LR, MAX_MEMORY, calculate_win_reward
+from training.rl.inference import NumpyQNet
+from training.rl.replay import ReplayBuffer
+
+NUM_ACTORS = 4
+TOTAL_STEPS = 500_000  # env steps summed over all actors
+MINIBATCH = 256
+PUBLISH_EVERY = 20  # learner updates between weight broadcasts
+SYNC_EVERY = 400  # actor steps between checks for new weights
+SEND_EVERY = 200  # transitions an actor collects before sending them
+MIN_MEMORY = 2000
+EPSILON = 0.4  # Ape-X: actor i explores with EPSILON ** (1 + ALPHA * i / (M - 1))
+ALPHA = 7
+GAMMA = 0.95
+MAX_STEPS = 1500
+STATE_SIZE = 9
+
+
+def actor_epsilon(index, num_actors, epsilon=EPSILON, alpha=ALPHA):
+    if num_actors == 1:
+        return epsilon
+    return epsilon ** (1 + alpha * index / (num_actors - 1))
+
+
+class SharedWeights:
+    """Flat float32 copy of a model's parameters in shared memory.
+
+    The version counter is odd while the learner is writing, so readers
+    retry instead of loading a half-written vector.
+    """
+
+    def __init__(self, model, ctx=mp):
+        import torch
+
+        flat = torch.nn.utils.parameters_to_vector(model.parameters())
+        self.array = ctx.RawArray("f", flat.numel())
+        self.version = ctx.RawValue("l", 0)
+        self.write(model)
+
+    def write(self, model):
+        import torch
+
+        flat = torch.nn.utils.parameters_to_vector(model.parameters()).detach()
+        self.version.value += 1
+        np.frombuffer(self.array, dtype=np.float32)[:] = flat.numpy()
+        self.version.value += 1
+
+    def read(self, known_version):
+        """(version, flat weights) if newer than ``known_version``, else None."""
+        version = self.version.value
+        if version == known_version or version % 2:
+            return None
+        flat = np.frombuffer(self.array, dtype=np.float32).copy()
+        if self.version.value != version:
+            return None
+        return version, flat
+
+    def read_into(self, model, known_version):
+        """Load newer weights into ``model``; returns the loaded version.
+
+        ``model`` is a ``Linear_QNet`` or a ``NumpyQNet``.
+        """
+        update = self.read(known_version)
+        if update is None:
+            return known_version
+        version, flat = update
+        if isinstance(model, NumpyQNet):
+            model.load_flat(flat)
+        else:
+            import torch
+
+            torch.nn.utils.vector_to_parameters(
+                torch.from_numpy(flat), model.parameters()
+            )
+        return version
+
+
+def run_actor(index, num_actors, weights, transitions, stop, seed):
+    # actors only run the forward pass, in NumPy, so they never import torch
+    rng = random.Random(seed + index)
+    epsilon = actor_epsilon(index, num_actors)
+    model = NumpyQNet.zeros(STATE_SIZE, 512, 2)
+    version = weights.read_into(model, None)
+    env = ShootingGameEnv(seed=seed + index, max_steps=MAX_STEPS)
+
+    states = np.zeros((SEND_EVERY, STATE_SIZE), dtype=np.float32)
+    next_states = np.zeros((SEND_EVERY, STATE_SIZE), dtype=np.float32)
+    actions = np.zeros(SEND_EVERY, dtype=np.int64)
+    rewards = np.zeros(SEND_EVERY, dtype=np.float32)
+    dones = np.zeros(SEND_EVERY, dtype=bool)
+    n = 0
+    steps = 0
+
+    while not stop.is_set():
+        env.reset()
+        state_old = env.get_state()
+        episode_positioning_reward = 0
+        steps_taken = 0
+
+        while not env.done and not stop.is_set():
+            if rng.random() < epsilon:
+                move_idx = rng.randint(0, 1)
+            else:
+                move_idx = model.act(state_old)
+            state_new, positioning_reward, game_score, done = env.step(
+                1 if move_idx == 0 else 2
+            )
+            episode_positioning_reward += positioning_reward
+            steps_taken += 1
+            if done:
+                reward = calculate_win_reward(
+                    game_score, positioning_reward, steps_taken, MAX_STEPS
+                )
+            else:
+                reward = positioning_reward
+
+            states[n] = state_old
+            actions[n] = move_idx
+            rewards[n] = reward
+            next_states[n] = state_new
+            dones[n] = done
+            n += 1
+            if n == SEND_EVERY:
+                transitions.put(
+                    ("batch", states.copy(), actions.copy(), rewards.copy())
+                    + (next_states.copy(), dones.copy())
+                )
+                n = 0
+
+            steps += 1
+            if steps % SYNC_EVERY == 0:
+                version = weights.read_into(model, version)
+            state_old = state_new
+
+        if env.done:
+            transitions.put(
+                ("episode", index, env.score, episode_positioning_reward, steps_taken)
+            )
+
+    transitions.cancel_join_thread()
+
+
+class EpisodeStats:
+    """Episode results aggregated over all actors."""
+
+    def __init__(self, num_actors):
+        self.episodes = 0
+        self.wins = 0
+        self.recent_scores = deque(maxlen=100)
+        self.per_actor = np.zeros((num_actors, 2), dtype=np.int64)  # games, wins
+        self.scores = []
+
+    def add(self, actor, score):
+        won = score >= 300
+        self.episodes += 1
+        self.wins += won
+        self.recent_scores.append(score)
+        self.per_actor[actor] += (1, won)
+        self.scores.append(score)
+
+    def win_rate(self):
+        if not self.recent_scores:
+            return 0.0
+        return sum(1 for s in self.recent_scores if s >= 300) / len(self.recent_scores)
+
+
+def train_apex(
+    num_actors=NUM_ACTORS,
+    total_steps=TOTAL_STEPS,
+    batch_size=MINIBATCH,
+    publish_every=PUBLISH_EVERY,
+    seed=0,
+    report_every=10.0,
+):
+    from training.rl.model import Linear_QNet, QTrainer, DEVICE
+
+    ctx = mp.get_context("spawn")
+    model = Linear_QNet(STATE_SIZE, 512, 2).to(DEVICE)
+    trainer = QTrainer(model, lr=LR, gamma=GAMMA)
+    memory = ReplayBuffer(MAX_MEMORY, STATE_SIZE)
+    weights = SharedWeights(model, ctx)
+    transitions = ctx.Queue(maxsize=64 * num_actors)
+    stop = ctx.Event()
+    stats = EpisodeStats(num_actors)
+
+    actors = [
+        ctx.Process(
+            target=run_actor,
+            args=(i, num_actors, weights, transitions, stop, seed),
+            daemon=True,
+        )
+        for i in range(num_actors)
+    ]
+    for actor in actors:
+        actor.start()
+
+    env_steps = 0
+    updates = 0
+    start = last_report = time.perf_counter()
+    try:
+        while env_steps < total_steps:
+            # drain everything the actors sent, block only while memory warms up
+            block = len(memory) < max(MIN_MEMORY, batch_size)
+            while True:
+                try:
+                    message = transitions.get(block=block, timeout=1.0)
+                except queue.Empty:
+                    break
+                block = False
+                if message[0] == "batch":
+                    memory.extend(*message[1:])
+                    env_steps += len(message[2])
+                else:
+                    stats.add(message[1], message[2])
+
+            if len(memory) >= max(MIN_MEMORY, batch_size):
+                trainer.train_step(*memory.sample(batch_size))
+                updates += 1
+                if updates % publish_every == 0:
+                    weights.write(model)
+
+            now = time.perf_counter()
+            if now - last_report >= report_every:
+                last_report = now
+                elapsed = now - start
+                print(
+                    f"steps {env_steps} ({env_steps / elapsed:.0f}/s) "
+                    f"updates {updates} ({updates / elapsed:.1f}/s) "
+                    f"episodes {stats.episodes} "
+                    f"win rate (last 100) {stats.win_rate():.2%}"
+                )
+    finally:
+        stop.set()
+        for actor in actors:
+            actor.join(timeout=5)
+            if actor.is_alive():
+                actor.terminate()
+
+    elapsed = time.perf_counter() - start
+    model.save(file_name="model_apex.pth")
+
+    print(f"\nTraining Complete!")
+    print(
+        f"Env steps: {env_steps} ({env_steps / elapsed:.0f}/s), "
+        f"updates: {updates} ({updates / elapsed:.1f}/s)"
+    )
+    print(f"Total Wins: {stats.wins}/{stats.episodes}")
+    for i, (games, wins) in enumerate(stats.per_actor):
+        print(
+            f"  actor {i} (epsilon {actor_epsilon(i, num_actors):.3f}): "
+            f"{wins}/{games} wins"
+        )
+
+    return stats
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Ape-X style DQN training with parallel actor processes"
+    )
+    parser.add_argument("--actors", type=int, default=NUM_ACTORS)
+    parser.add_argument("--steps", type=int, default=TOTAL_STEPS)
+    parser.add_argument("--batch-size", type=int, default=MINIBATCH)
+    parser.add_argument("--publish-every", type=int, default=PUBLISH_EVERY)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    train_apex(
+        num_actors=args.actors,
+        total_steps=args.steps,
+        batch_size=args.batch_size,
+        publish_every=args.publish_every,
+        seed=args.seed,
+    )
@@ -0,0 +1,250 @@
+import argparse
+import copy
+import threading
+import time
+import numpy as np
+from collections import deque
+from game.core_ai import ShootingGameEnv
+from training.rl.agent import Agent, calculate_win_reward, plot_training
+
+EPISODES = 500
+MINIBATCH = 64
+UPDATE_EVERY = 4  # env steps between learner wake-ups
+UPDATES_PER_STEP = 0.25  # learner updates allowed per env step
+PUBLISH_EVERY = 50  # learner updates between weight copies to the actor
+MIN_MEMORY = 1000  # transitions collected before learning starts
+
+
+class Learner(threading.Thread):
+    """Trains on the replay memory in the background.
+
+    The actor grants update budget with ``notify(env_steps)``; the learner
+    runs at most ``updates_per_step`` updates per env step and publishes a
+    copy of its weights every ``publish_every`` updates. Updates hold
+    ``model_lock``; an exception ends the thread and is kept in ``error``.
+    """
+
+    def __init__(
+        self,
+        trainer,
+        memory,
+        memory_lock,
+        batch_size=MINIBATCH,
+        updates_per_step=UPDATES_PER_STEP,
+        publish_every=PUBLISH_EVERY,
+        min_memory=MIN_MEMORY,
+    ):
+        super().__init__(daemon=True)
+        self.trainer = trainer
+        self.memory = memory
+        self.memory_lock = memory_lock
+        self.batch_size = batch_size
+        self.updates_per_step = updates_per_step
+        self.publish_every = publish_every
+        self.min_memory = min_memory
+        self.updates = 0
+        self.busy_time = 0.0
+        self.published = None
+        self.error = None
+        self.model_lock = threading.Lock()
+        self._env_steps = 0
+        self._wake = threading.Condition()
+        self._stopping = False
+
+    def notify(self, env_steps):
+        with self._wake:
+            self._env_steps = env_steps
+            self._wake.notify()
+
+    def stop(self):
+        with self._wake:
+            self._stopping = True
+            self._wake.notify()
+        self.join()
+
+    def check(self):
+        """Raise the exception that ended the thread, if any."""
+        if self.error is not None:
+            raise RuntimeError("the learner thread failed") from self.error
+
+    def run(self):
+        try:
+            self._learn()
+        except BaseException as error:
+            self.error = error
+
+    def _learn(self):
+        while True:
+            with self._wake:
+                while not self._stopping and not self._can_update():
+                    self._wake.wait()
+                if self._stopping:
+                    return
+
+            start = time.perf_counter()
+            with self.memory_lock:
+                batch = self.memory.sample(self.batch_size)
+            with self.model_lock:
+                self.trainer.train_step(*batch)
+                self.updates += 1
+                if self.updates % self.publish_every == 0:
+                    self.publish()
+            self.busy_time += time.perf_counter() - start
+
+    def publish(self):
+        # (version, weights); the actor swaps them in between two of its steps
+        weights = {
+            k: v.detach().clone() for k, v in self.trainer.model.state_dict().items()
+        }
+        self.published = (self.updates, weights)
+
+    def _can_update(self):
+        return (
+            len(self.memory) >= self.min_memory
+            and self.updates < self._env_steps * self.updates_per_step
+        )
+
+
+def train_async(
+    episodes=EPISODES,
+    batch_size=MINIBATCH,
+    update_every=UPDATE_EVERY,
+    updates_per_step=UPDATES_PER_STEP,
+    publish_every=PUBLISH_EVERY,
+    min_memory=MIN_MEMORY,
+    max_steps=1500,
+):
+    plot_scores = []
+    plot_mean_scores = []
+    plot_positioning_rewards = []
+    plot_win_rate = []
+
+    total_score = 0
+    wins = 0
+    recent_scores = deque(maxlen=100)
+
+    agent = Agent()
+    learner_model = agent.model
+    # the actor plays with its own copy, refreshed when the learner publishes
+    agent.model = copy.deepcopy(learner_model)
+    memory_lock = threading.Lock()
+    learner = Learner(
+        agent.trainer,
+        agent.memory,
+        memory_lock,
+        batch_size=batch_size,
+        updates_per_step=updates_per_step,
+        publish_every=publish_every,
+        min_memory=min_memory,
+    )
+    env = ShootingGameEnv(render_mode=False, max_steps=max_steps)
+
+    env_steps = 0
+    weights_version = None
+    start = time.perf_counter()
+    learner.start()
+    try:
+        for episode in range(episodes):
+            env.reset()
+            state_old = env.get_state()
+            episode_positioning_reward = 0
+            steps_taken = 0
+
+            while not env.done:
+                learner.check()
+                published = learner.published
+                if published is not None and published[0] != weights_version:
+                    weights_version = published[0]
+                    agent.model.load_state_dict(published[1])
+
+                final_move = agent.get_action(state_old)
+                state_new, positioning_reward, game_score, done = env.step(final_move)
+
+                episode_positioning_reward += positioning_reward
+                steps_taken += 1
+
+                if done:
+                    total_reward = calculate_win_reward(
+                        game_score, positioning_reward, steps_taken, max_steps
+                    )
+                else:
+                    total_reward = positioning_reward
+
+                with memory_lock:
+                    agent.remember(state_old, final_move, total_reward, state_new, done)
+                env_steps += 1
+                if env_steps % update_every == 0:
+                    learner.notify(env_steps)
+
+                state_old = state_new
+
+            agent.n_games += 1
+            final_score = env.score
+            recent_scores.append(final_score)
+            if final_score >= 300:
+                wins += 1
+
+            recent_wins = sum(1 for score in recent_scores if score >= 300)
+            win_rate = recent_wins / len(recent_scores)
+
+            if episode % max(1, episodes // 20) == 0:
+                elapsed = time.perf_counter() - start
+                print(f"Episode {episode + 1}/{episodes}")
+                print(f"  Score: {final_score}")
+                print(f"  Win Rate (last 100): {win_rate:.2%}")
+                print(f"  Avg Score (last 100): {np.mean(recent_scores):.1f}")
+                print(f"  Epsilon: {agent.epsilon:.3f}")
+                print(f"  Env steps/s: {env_steps / elapsed:.0f}")
+                print(f"  Updates/s: {learner.updates / elapsed:.1f}")
+
+            plot_scores.append(final_score)
+            plot_positioning_rewards.append(episode_positioning_reward)
+            plot_win_rate.append(win_rate)
+            total_score += final_score
+            plot_mean_scores.append(total_score / agent.n_games)
+
+            if (episode + 1) % max(1, episodes // 10) == 0:
+                # not in the middle of an optimizer step
+                with learner.model_lock:
+                    learner_model.save(file_name=f"model_checkpoint_{episode + 1}.pth")
+    finally:
+        learner.stop()
+    learner.check()
+
+    elapsed = time.perf_counter() - start
+    learner_model.save(file_name="model_final.pth")
+
+    print(f"\nTraining Complete!")
+    print(f"Total Wins: {wins}/{episodes} ({wins / episodes:.2%})")
+    print(
+        f"Env steps: {env_steps} ({env_steps / elapsed:.0f}/s), "
+        f"updates: {learner.updates} ({learner.updates / elapsed:.1f}/s, "
+        f"learner busy {learner.busy_time / elapsed:.0%})"
+    )
+
+    return plot_scores, plot_mean_scores, plot_positioning_rewards, plot_win_rate
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="DQN training with a background learner thread"
+    )
+    parser.add_argument("--episodes", type=int, default=EPISODES)
+    parser.add_argument("--batch-size", type=int, default=MINIBATCH)
+    parser.add_argument("--update-every", type=int, default=UPDATE_EVERY)
+    parser.add_argument("--updates-per-step", type=float, default=UPDATES_PER_STEP)
+    parser.add_argument("--publish-every", type=int, default=PUBLISH_EVERY)
+    parser.add_argument("--min-memory", type=int, default=MIN_MEMORY)
+    parser.add_argument("--no-plot", action="store_true")
+    args = parser.parse_args()
+
+    results = train_async(
+        episodes=args.episodes,
+        batch_size=args.batch_size,
+        update_every=args.update_every,
+        updates_per_step=args.updates_per_step,
+        publish_every=args.publish_every,
+        min_memory=args.min_memory,
+    )
+    if not args.no_plot:
+        plot_training(*results)
@@ -0,0 +1,91 @@
+import os
+import queue
+import re
+import threading
+
+import torch
+
+CHECKPOINT_DIR = os.path.join("models", "checkpoints")
+_NAME = re.compile(r"checkpoint_(\d+)\.pt$")
+
+
+def list_checkpoints(directory=CHECKPOINT_DIR):
+    """Checkpoint files in ``directory``, oldest first."""
+    if not os.path.isdir(directory):
+        return []
+    found = []
+    for name in os.listdir(directory):
+        match = _NAME.match(name)
+        if match:
+            found.append((int(match.group(1)), os.path.join(directory, name)))
+    return [path for _, path in sorted(found)]
+
+
+def latest_checkpoint(directory=CHECKPOINT_DIR):
+    checkpoints = list_checkpoints(directory)
+    return checkpoints[-1] if checkpoints else None
+
+
+def load_checkpoint(path):
+    # our own files: they hold NumPy arrays and RNG states, not just tensors
+    return torch.load(path, map_location="cpu", weights_only=False)
+
+
+class CheckpointWriter(threading.Thread):
+    """Writes checkpoints on a background thread and keeps the newest ``keep``.
+
+    ``save`` only queues the state, which must not be modified afterwards
+    (``Agent.state_dict`` returns copies). Files are written under a temporary
+    name and renamed, so a crash never leaves a partial checkpoint behind.
+    An error in the thread is raised by the next ``save`` or ``close``.
+    """
+
+    def __init__(self, directory=CHECKPOINT_DIR, keep=3):
+        super().__init__(daemon=True)
+        self.directory = directory
+        self.keep = keep
+        self.written = 0
+        self._queue = queue.Queue(maxsize=2)
+        self._error = None
+        os.makedirs(directory, exist_ok=True)
+        self.start()
+
+    def save(self, step, state):
+        self._raise()
+        self._queue.put((step, state))
+
+    def wait(self):
+        """Block until every queued checkpoint is on disk."""
+        self._queue.join()
+        self._raise()
+
+    def close(self):
+        self._queue.put(None)
+        self.join()
+        self._raise()
+
+    def _raise(self):
+        if self._error is not None:
+            error, self._error = self._error, None
+            raise RuntimeError("writing a checkpoint failed") from error
+
+    def run(self):
+        while True:
+            item = self._queue.get()
+            try:
+                if item is None:
+                    return
+                self._write(*item)
+            except Exception as error:
+                self._error = error
+            finally:
+                self._queue.task_done()
+
+    def _write(self, step, state):
+        path = os.path.join(self.directory, f"checkpoint_{step:06d}.pt")
+        tmp = path + ".tmp"
+        torch.save(state, tmp)
+        os.replace(tmp, path)
+        self.written += 1
+        for old in list_checkpoints(self.directory)[: -self.keep]:
+            os.remove(old)
@@ -1,39 +1,118 @@
 from game.core_ai import ShootingGameEnv
-from training.rl.model import Linear_QNet, DEVICE
-import torch
-import sys
+import argparse
 
-filename = sys.argv[1] if sys.argv else "models/model_final.pth"
 
-model = Linear_QNet(9, 512, 2).to(DEVICE)
-model.load_state_dict(torch.load(filename, map_location=DEVICE))
-model.eval()
+def load_model_policy(filename):
+    if filename.endswith(".npz"):
+        # exported with training.rl.inference, no torch needed
+        from training.rl.inference import NumpyQNet
 
-env = ShootingGameEnv(render_mode=True, endless=True)
+        model = NumpyQNet.load(filename)
+    else:
+        model = _load_torch_model(filename)
 
-state = env.get_state()
-done = False
-total_reward = 0
-score = 0
+    def policy(state):
+        action_idx = model.act(state)
+        # 0 -> 1 (LEFT), 1 -> 2 (RIGHT)
+        return 1 if action_idx == 0 else 2
 
-print("Starting evaluation...")
+    return policy
 
-while not done:
-    state_tensor = torch.from_numpy(state).to(DEVICE)
 
-    with torch.no_grad():
-        prediction = model(state_tensor)
-        action_idx = torch.argmax(prediction).item()
+def _load_torch_model(filename):
+    import torch
+    from training.rl.model import Linear_QNet, DEVICE
 
-    # 0 -> 1 (LEFT), 1 -> 2 (RIGHT)
-    game_action = 1 if action_idx == 0 else 2
+    model = Linear_QNet(9, 512, 2).to(DEVICE)
+    model.load_state_dict(torch.load(filename, map_location=DEVICE))
+    model.eval()
+    return model
 
-    state, positioning_reward, game_score, done = env.step(game_action)
-    total_reward += positioning_reward
-    score = game_score
 
-print(f"Evaluation finished!")
-print(f"Final game score: {score}")
-print(f"Total positioning reward: {total_reward:.2f}")
+def evaluate(env, policy):
+    state = env.get_state()
+    done = False
+    total_reward = 0
+    score = 0
 
-env.close()
+    print("Starting evaluation...")
+
+    while not done:
+        game_action = policy(state)
+
+        state, positioning_reward, game_score, done = env.step(game_action)
+        total_reward += positioning_reward
+        score = game_score
+
+    print(f"Evaluation finished!")
+    print(f"Final game score: {score}")
+    print(f"Total positioning reward: {total_reward:.2f}")
+
+    return score, total_reward
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Watch an agent play")
+    parser.add_argument(
+        "model_file",
+        nargs="?",
+        default="models/model_final.pth",
+        help=".pth state dict or .npz weights from training.rl.inference",
+    )
+    parser.add_argument(
+        "--planner",
+        action="store_true",
+        help="use the lookahead planner instead of a trained model",
+    )
+    parser.add_argument("--depth", type=int, default=4)
+    parser.add_argument("--rollouts", type=int, default=2)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--headless", action="store_true")
+    parser.add_argument(
+        "--max-steps", type=int, default=-1, help="stop after this many ticks"
+    )
+    parser.add_argument(
+        "--render-every", type=int, default=1, help="draw only every Nth tick"
+    )
+    parser.add_argument(
+        "--display-fps",
+        type=float,
+        help="run the game at full speed and redraw at most this often",
+    )
+    parser.add_argument(
+        "--record", metavar="FILE", help="save a replayable recording (.npz)"
+    )
+    args = parser.parse_args()
+
+    env = ShootingGameEnv(
+        render_mode=not args.headless, endless=True, max_steps=args.max_steps
+    )
+    env.render_every = args.render_every
+    env.display_fps = args.display_fps
+
+    if args.planner:
+        from training.planner import LookaheadPlanner
+
+        policy = LookaheadPlanner(
+            env, depth=args.depth, rollouts=args.rollouts, workers=args.workers
+        )
+    else:
+        policy = load_model_policy(args.model_file)
+
+    if args.record:
+        from game.recording import Recorder
+
+        player = Recorder(env)
+    else:
+        player = env
+
+    try:
+        evaluate(player, policy)
+    finally:
+        if args.record:
+            player.save(args.record)
+            print(f"Recording saved to {args.record}")
+        if args.planner:
+            print(f"Planner: {policy.stats()}")
+            policy.close()
+        env.close()
@@ -0,0 +1,190 @@
+"""Torch-free inference for ``Linear_QNet`` policies.
+
+    python -m training.rl.inference export models/model_final.pth models/model_final.npz [--precision int8]
+    python -m training.rl.inference check models/model_final.pth [models/model_final.npz]
+
+The ``.npz`` file holds the two layers under their ``state_dict`` names.
+float16 weights are stored as they are, int8 weights with one float32 scale
+per output row (``<name>.scale``). Biases are always float32. Weights are
+expanded back to float32 on load: NumPy has no faster int8/float16 matmul, so
+quantization only shrinks the file.
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+PRECISIONS = ("float32", "float16", "int8")
+LAYERS = ("linear1", "linear2")
+
+
+def quantize(weights, precision):
+    """{name: array} to store for a float32 weight matrix."""
+    if precision == "float32":
+        return {"": weights.astype(np.float32)}
+    if precision == "float16":
+        return {"": weights.astype(np.float16)}
+    if precision == "int8":
+        scale = np.abs(weights).max(axis=1) / 127
+        scale[scale == 0] = 1
+        q = np.round(weights / scale[:, None]).astype(np.int8)
+        return {"": q, ".scale": scale.astype(np.float32)}
+    raise ValueError(f"precision must be one of {PRECISIONS}")
+
+
+def export(state_dict_file, out_file, precision="float32"):
+    """Convert a saved ``Linear_QNet`` state dict to a NumPy weights file."""
+    import torch
+
+    state_dict = torch.load(state_dict_file, map_location="cpu")
+    arrays = {"precision": np.array(precision)}
+    for layer in LAYERS:
+        weight = state_dict[f"{layer}.weight"].numpy()
+        for suffix, array in quantize(weight, precision).items():
+            arrays[f"{layer}.weight{suffix}"] = array
+        arrays[f"{layer}.bias"] = state_dict[f"{layer}.bias"].numpy()
+    np.savez(out_file, **arrays)
+
+
+class NumpyQNet:
+    """``Linear_QNet`` forward pass, ``relu(x W1^T + b1) W2^T + b2``, in NumPy.
+
+    ``act`` and ``act_batch`` pick the first highest Q-value like
+    ``torch.argmax``; with float32 weights they agree with the torch model.
+    """
+
+    def __init__(self, w1, b1, w2, b2):
+        # transposed once so a row of states multiplies without a copy
+        self.w1t = np.ascontiguousarray(w1.T, dtype=np.float32)
+        self.b1 = np.asarray(b1, dtype=np.float32)
+        self.w2t = np.ascontiguousarray(w2.T, dtype=np.float32)
+        self.b2 = np.asarray(b2, dtype=np.float32)
+        # scratch space for act(), so a call allocates only the Q-values
+        self._hidden = np.empty(len(self.b1), dtype=np.float32)
+
+    @classmethod
+    def zeros(cls, input_size, hidden_size, output_size):
+        return cls(
+            np.zeros((hidden_size, input_size)),
+            np.zeros(hidden_size),
+            np.zeros((output_size, hidden_size)),
+            np.zeros(output_size),
+        )
+
+    @classmethod
+    def load(cls, filename):
+        with np.load(filename) as data:
+            params = []
+            for layer in LAYERS:
+                weight = data[f"{layer}.weight"].astype(np.float32)
+                if f"{layer}.weight.scale" in data:
+                    weight *= data[f"{layer}.weight.scale"][:, None]
+                params += [weight, data[f"{layer}.bias"]]
+        return cls(*params)
+
+    @classmethod
+    def from_model(cls, model):
+        state_dict = model.state_dict()
+        return cls(
+            *(
+                state_dict[f"{layer}.{name}"].detach().cpu().numpy()
+                for layer in LAYERS
+                for name in ("weight", "bias")
+            )
+        )
+
+    def load_flat(self, flat):
+        """Copy weights from ``parameters_to_vector(model.parameters())``."""
+        hidden, inputs = self.w1t.shape[1], self.w1t.shape[0]
+        outputs = self.w2t.shape[1]
+        sizes = (hidden * inputs, hidden, outputs * hidden, outputs)
+        w1, b1, w2, b2 = np.split(flat, np.cumsum(sizes)[:-1])
+        self.w1t[:] = w1.reshape(hidden, inputs).T
+        self.b1[:] = b1
+        self.w2t[:] = w2.reshape(outputs, hidden).T
+        self.b2[:] = b2
+
+    def forward(self, states):
+        """Q-values for one state (n,) or a batch (batch, n)."""
+        hidden = states @ self.w1t
+        hidden += self.b1
+        np.maximum(hidden, 0, out=hidden)
+        q = hidden @ self.w2t
+        q += self.b2
+        return q
+
+    def act(self, state):
+        """Index of the highest Q-value for a single NumPy state."""
+        if state.dtype != np.float32:
+            return int(self.forward(state).argmax())
+        hidden = np.dot(state, self.w1t, out=self._hidden)
+        hidden += self.b1
+        np.maximum(hidden, 0, out=hidden)
+        q = hidden @ self.w2t
+        q += self.b2
+        return int(q.argmax())
+
+    def act_batch(self, states):
+        return self.forward(states).argmax(axis=1)
+
+
+def _states(count, seed=0):
+    # observations from an epsilon-random rollout, so Q-values are realistic
+    from game.core_ai import ShootingGameEnv
+
+    env = ShootingGameEnv(seed=seed, endless=True)
+    rng = np.random.default_rng(seed)
+    states = np.empty((count, 9), dtype=np.float32)
+    for i in range(count):
+        states[i] = env.step(int(rng.integers(1, 3)))[0]
+    return states
+
+
+def check(state_dict_file, weights_file=None, count=20_000):
+    """Compare actions and per-call time of torch and NumPy inference."""
+    import torch
+    from training.rl.model import DEVICE, Linear_QNet
+
+    torch.set_num_threads(1)
+    model = Linear_QNet(9, 512, 2).to(DEVICE)
+    model.load_state_dict(torch.load(state_dict_file, map_location=DEVICE))
+    model.eval()
+    states = _states(count)
+    expected = np.array([model.act(state) for state in states])
+
+    engines = {"float32": NumpyQNet.from_model(model)}
+    if weights_file:
+        engines[weights_file] = NumpyQNet.load(weights_file)
+    for name, engine in engines.items():
+        single = np.array([engine.act(state) for state in states])
+        batch = engine.act_batch(states)
+        print(
+            f"{name:24s} single {np.mean(single == expected):8.4%} "
+            f"batch {np.mean(batch == expected):8.4%} agree with torch"
+        )
+
+    for name, act in (("torch act", model.act), ("numpy act", engines["float32"].act)):
+        start = time.perf_counter()
+        for state in states:
+            act(state)
+        print(f"{name:24s} {(time.perf_counter() - start) / count * 1e6:8.2f} us/call")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export or check NumPy policies")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    export_parser = subparsers.add_parser("export", help=".pth -> .npz")
+    export_parser.add_argument("model_file")
+    export_parser.add_argument("out_file")
+    export_parser.add_argument("--precision", choices=PRECISIONS, default="float32")
+    check_parser = subparsers.add_parser("check", help="compare with torch")
+    check_parser.add_argument("model_file")
+    check_parser.add_argument("weights_file", nargs="?")
+    args = parser.parse_args()
+
+    if args.command == "export":
+        export(args.model_file, args.out_file, args.precision)
+        print(f"Weights saved to {args.out_file}")
+    else:
+        check(args.model_file, args.weights_file)
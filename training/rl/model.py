@@ -2,6 +2,7 @@ import torch
 import torch.nn as nn
 import torch.optim as optim
 import torch.nn.functional as F
+import copy
 import os
 
 # DEVICE = torch.device("cuda" if torch.cuda.is_available() else "cpu")
@@ -19,8 +20,13 @@ class Linear_QNet(nn.Module):
         x = self.linear2(x)
         return x
 
-    def save(self, file_name="model.pth"):
-        model_folder_path = "./models"
+    def act(self, state):
+        """Index of the highest Q-value for a single NumPy state."""
+        state_tensor = torch.from_numpy(state).to(DEVICE)
+        with torch.no_grad():
+            return torch.argmax(self(state_tensor)).item()
+
+    def save(self, file_name="model.pth", model_folder_path="./models"):
         if not os.path.exists(model_folder_path):
             os.makedirs(model_folder_path)
 
@@ -29,39 +35,84 @@ class Linear_QNet(nn.Module):
 
 
 class QTrainer:
-    def __init__(self, model, lr, gamma):
+    """DQN learner; ``train_step`` takes a single transition or a batch.
+
+    With ``target_update > 0`` next-state Q-values come from a frozen copy of
+    the model that is synced every ``target_update`` steps. Otherwise the
+    online model is used, like before.
+    """
+
+    def __init__(self, model, lr, gamma, target_update=0):
         self.lr = lr
         self.gamma = gamma
         self.model = model
         self.optimizer = optim.Adam(model.parameters(), lr=self.lr)
         self.criterion = nn.MSELoss()
+        self.target_update = target_update
+        self.updates = 0
+        self.target_model = None
+        if target_update > 0:
+            self.target_model = copy.deepcopy(model)
+            self.target_model.requires_grad_(False)
+            self.target_model.eval()
+
+    def sync_target(self):
+        if self.target_model is not None:
+            self.target_model.load_state_dict(self.model.state_dict())
+
+    def state_dict(self):
+        """Copies of the model, optimizer and target network state."""
+        state = {
+            "model": self.model.state_dict(),
+            "optimizer": self.optimizer.state_dict(),
+            "updates": self.updates,
+        }
+        if self.target_model is not None:
+            state["target_model"] = self.target_model.state_dict()
+        # state dicts share tensors with the live model, which keeps training
+        return copy.deepcopy(state)
+
+    def load_state_dict(self, state):
+        self.model.load_state_dict(state["model"])
+        self.optimizer.load_state_dict(state["optimizer"])
+        self.updates = state["updates"]
+        if self.target_model is not None:
+            self.target_model.load_state_dict(state.get("target_model", state["model"]))
 
     def train_step(self, state, action, reward, next_state, done):
         state = torch.from_numpy(state).to(DEVICE)
         next_state = torch.from_numpy(next_state).to(DEVICE)
         action = torch.from_numpy(action).to(DEVICE)
         reward = torch.from_numpy(reward).to(DEVICE)
+        done = torch.as_tensor(done, dtype=torch.bool, device=DEVICE)
 
         if len(state.shape) == 1:
             state = torch.unsqueeze(state, 0)
             next_state = torch.unsqueeze(next_state, 0)
             action = torch.unsqueeze(action, 0)
             reward = torch.unsqueeze(reward, 0)
-            done = (done,)
+            done = torch.unsqueeze(done, 0)
 
-        # Q-learning update
+        # Q-learning update, all next states in one forward pass
         pred = self.model(state)
+        if self.target_model is None:
+            # not detached, so gradients match the old per-sample loop
+            next_q = self.model(next_state)
+        else:
+            with torch.no_grad():
+                next_q = self.target_model(next_state)
+        Q_new = torch.where(
+            done, reward, reward + self.gamma * torch.max(next_q, dim=1).values
+        )
         target = pred.clone()
-
-        for idx in range(len(done)):
-            Q_new = reward[idx]
-            if not done[idx]:
-                Q_new = reward[idx] + self.gamma * torch.max(
-                    self.model(next_state[idx])
-                )
-            target[idx][action[idx]] = Q_new
+        target[torch.arange(len(action), device=DEVICE), action] = Q_new
 
         self.optimizer.zero_grad()
         loss = self.criterion(target, pred)
         loss.backward()
         self.optimizer.step()
+
+        self.updates += 1
+        if self.target_update > 0 and self.updates % self.target_update == 0:
+            self.sync_target()
+        return loss.item()
@@ -0,0 +1,155 @@
+import numpy as np
+
+
+class ReplayBuffer:
+    """Fixed-size replay memory backed by preallocated NumPy arrays.
+
+    ``push`` writes one transition in O(1) and ``sample`` draws a batch with
+    vectorized indexing, returning arrays ready for ``QTrainer.train_step``.
+
+    With ``shared_obs=True`` every observation is stored once: a transition's
+    ``next_state`` is the row after its ``state``, which the next transition
+    of the same episode starts from. This halves observation memory but
+    requires transitions to be pushed in episode order; one slot holds the
+    terminal observation of each episode (and the pending ``next_state`` of
+    the newest transition), so slightly fewer than ``capacity`` transitions
+    fit.
+    """
+
+    def __init__(self, capacity, state_size, shared_obs=False, seed=None):
+        self.capacity = capacity
+        self.shared_obs = shared_obs
+        self.states = np.zeros((capacity, state_size), dtype=np.float32)
+        if not shared_obs:
+            self.next_states = np.zeros((capacity, state_size), dtype=np.float32)
+        self.actions = np.zeros(capacity, dtype=np.int64)
+        self.rewards = np.zeros(capacity, dtype=np.float32)
+        self.dones = np.zeros(capacity, dtype=bool)
+        # slots holding a complete transition (always all written ones
+        # unless shared_obs)
+        self.valid = np.zeros(capacity, dtype=bool)
+        self._rng = np.random.default_rng(seed)
+        self._head = 0
+        self._filled = 0
+        self._size = 0
+        self._last_done = False
+
+    def __len__(self):
+        return self._size
+
+    def push(self, state, action, reward, next_state, done):
+        i = self._head
+        if self.shared_obs and self._last_done:
+            # keep the previous episode's terminal observation
+            i = (i + 1) % self.capacity
+
+        self._write(i, state, action, reward, done)
+        if self.shared_obs:
+            j = (i + 1) % self.capacity
+            if self.valid[j]:
+                self.valid[j] = False
+                self._size -= 1
+            self.states[j] = next_state
+            self._filled = max(self._filled, j + 1)
+            self._head = j
+        else:
+            self.next_states[i] = next_state
+            self._head = (i + 1) % self.capacity
+        self._last_done = done
+
+    def extend(self, states, actions, rewards, next_states, dones):
+        """Push a batch of transitions with one write per array."""
+        if self.shared_obs:
+            for transition in zip(states, actions, rewards, next_states, dones):
+                self.push(*transition)
+            return
+        count = len(actions)
+        n = min(count, self.capacity)
+        # only the newest ``capacity`` transitions survive a larger batch
+        indices = (self._head + count - n + np.arange(n)) % self.capacity
+        self._size += n - int(np.count_nonzero(self.valid[indices]))
+        self.valid[indices] = True
+        self.states[indices] = states[-n:]
+        self.actions[indices] = actions[-n:]
+        self.rewards[indices] = rewards[-n:]
+        self.next_states[indices] = next_states[-n:]
+        self.dones[indices] = dones[-n:]
+        self._filled = max(self._filled, int(indices.max()) + 1)
+        self._head = (self._head + count) % self.capacity
+
+    def sample(self, batch_size):
+        """``batch_size`` distinct transitions, or all of them if fewer.
+
+        Returns (states, actions, rewards, next_states, dones).
+        """
+        if self._size == self._filled:
+            indices = np.arange(self._filled)
+        else:
+            indices = np.flatnonzero(self.valid[: self._filled])
+        if self._size > batch_size:
+            indices = indices[self._rng.choice(len(indices), batch_size, replace=False)]
+        return self.get(indices)
+
+    def get(self, indices):
+        if self.shared_obs:
+            next_states = self.states[(indices + 1) % self.capacity]
+        else:
+            next_states = self.next_states[indices]
+        return (
+            self.states[indices],
+            self.actions[indices],
+            self.rewards[indices],
+            next_states,
+            self.dones[indices],
+        )
+
+    def state_dict(self):
+        """Copy of the written part of the buffer and its position."""
+        n = self._filled
+        state = {
+            "capacity": self.capacity,
+            "shared_obs": self.shared_obs,
+            "states": self.states[:n].copy(),
+            "actions": self.actions[:n].copy(),
+            "rewards": self.rewards[:n].copy(),
+            "dones": self.dones[:n].copy(),
+            "valid": self.valid[:n].copy(),
+            "head": self._head,
+            "filled": n,
+            "size": self._size,
+            "last_done": self._last_done,
+            "rng": self._rng.bit_generator.state,
+        }
+        if not self.shared_obs:
+            state["next_states"] = self.next_states[:n].copy()
+        return state
+
+    def load_state_dict(self, state):
+        if (state["capacity"], state["shared_obs"]) != (
+            self.capacity,
+            self.shared_obs,
+        ):
+            raise ValueError("replay buffer capacity or layout differs")
+        n = state["filled"]
+        arrays = ["states", "actions", "rewards", "dones", "valid"]
+        if not self.shared_obs:
+            arrays.append("next_states")
+        for name in arrays:
+            array = getattr(self, name)
+            array[:n] = state[name]
+            array[n:] = 0
+        self._head = state["head"]
+        self._filled = n
+        self._size = state["size"]
+        self._last_done = state["last_done"]
+        self._rng.bit_generator.state = state["rng"]
+
+    def _write(self, i, state, action, reward, done):
+        if not self.valid[i]:
+            self.valid[i] = True
+            self._size += 1
+        self.states[i] = state
+        self.actions[i] = action
+        self.rewards[i] = reward
+        self.dones[i] = done
+        self._filled = max(self._filled, i + 1)
@@ -0,0 +1,229 @@
+"""Training metrics: rolling statistics and an append-only log file.
+
+``TelemetryLog`` appends one record per episode (DQN) or generation (GA) to a
+JSONL or CSV file from a background thread; the training loop only appends to
+a list. The logs can be plotted at any time, also while training runs:
+
+    python -m training.telemetry plot logs/dqn.jsonl [--out dqn.png]
+"""
+
+import argparse
+import csv
+import json
+import os
+import queue
+import threading
+import time
+from collections import deque
+
+
+class RollingMean:
+    """Mean of the last ``window`` values, updated in O(1) per value."""
+
+    def __init__(self, window):
+        self.values = deque(maxlen=window)
+        self.total = 0.0
+        self._adds = 0
+
+    def __len__(self):
+        return len(self.values)
+
+    def add(self, value):
+        values = self.values
+        if len(values) == values.maxlen:
+            self.total -= values[0]
+        values.append(value)
+        self.total += value
+        self._adds += 1
+        if self._adds % values.maxlen == 0:
+            # drop the rounding error the subtractions piled up
+            self.total = sum(values)
+
+    @property
+    def mean(self):
+        return self.total / len(self.values) if self.values else 0.0
+
+
+class RollingRate:
+    """Events per second over the last ``window`` (count, seconds) samples."""
+
+    def __init__(self, window):
+        self.counts = RollingMean(window)
+        self.seconds = RollingMean(window)
+
+    def add(self, count, seconds):
+        self.counts.add(count)
+        self.seconds.add(seconds)
+
+    @property
+    def rate(self):
+        return self.counts.total / self.seconds.total if self.seconds.total else 0.0
+
+
+class TelemetryLog:
+    """Append-only JSONL or CSV log (by file extension) with a writer thread.
+
+    ``log`` adds a ``time`` field and buffers the record; a batch is handed to
+    the thread every ``flush_every`` records or ``flush_seconds`` seconds. CSV
+    columns are those of the first record in the file, so a CSV log takes one
+    kind of record only; a record with other fields fails the write. A failed
+    write stops the thread and is raised by the next ``flush`` or ``close``.
+    """
+
+    def __init__(self, filename, flush_every=50, flush_seconds=5.0):
+        self.filename = filename
+        self.csv = filename.endswith(".csv")
+        self.flush_every = flush_every
+        self.flush_seconds = flush_seconds
+        self._buffer = []
+        self._last_flush = time.monotonic()
+        self._queue = queue.Queue()
+        self._fields = None
+        self._error = None
+        directory = os.path.dirname(filename)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        if self.csv and os.path.exists(filename) and os.path.getsize(filename):
+            with open(filename, newline="") as f:
+                self._fields = next(csv.reader(f))
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def log(self, record=None, **fields):
+        record = dict(record or (), **fields)
+        record.setdefault("time", round(time.time(), 3))
+        self._buffer.append(record)
+        if (
+            len(self._buffer) >= self.flush_every
+            or time.monotonic() - self._last_flush >= self.flush_seconds
+        ):
+            self.flush()
+
+    def flush(self):
+        self._check()
+        if self._buffer:
+            self._queue.put(self._buffer)
+            self._buffer = []
+        self._last_flush = time.monotonic()
+
+    def close(self):
+        self.flush()
+        self._queue.put(None)
+        self._thread.join()
+        self._check()
+
+    def _check(self):
+        if self._error is not None:
+            raise RuntimeError(f"writing {self.filename} failed") from self._error
+
+    def _run(self):
+        while True:
+            batch = self._queue.get()
+            if batch is None:
+                return
+            try:
+                with open(self.filename, "a", newline="") as f:
+                    if self.csv:
+                        self._write_csv(f, batch)
+                    else:
+                        f.writelines(json.dumps(record) + "\n" for record in batch)
+            except Exception as error:
+                self._error = error
+                return
+
+    def _write_csv(self, f, batch):
+        if self._fields is None:
+            self._fields = list(batch[0])
+            csv.writer(f).writerow(self._fields)
+        for record in batch:
+            extra = record.keys() - set(self._fields)
+            if extra:
+                raise ValueError(
+                    f"record fields {sorted(extra)} are not columns of {self.filename}"
+                )
+        csv.DictWriter(f, self._fields).writerows(batch)
+
+
+def _number(value):
+    for kind in (int, float):
+        try:
+            return kind(value)
+        except ValueError:
+            pass
+    return value
+
+
+def read_log(filename):
+    """Records of a JSONL or CSV log as a list of dicts."""
+    with open(filename, newline="") as f:
+        if filename.endswith(".csv"):
+            return [
+                {key: _number(value) for key, value in row.items()}
+                for row in csv.DictReader(f)
+            ]
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def plot(filename, out=None):
+    """Draw the training plots of ``train()`` or ``main()`` from a log."""
+    records = read_log(filename)
+    episodes = [r for r in records if "episode" in r]
+    if episodes:
+        from training.rl.agent import plot_training
+
+        plot_training(
+            [r["score"] for r in episodes],
+            [r["mean_score"] for r in episodes],
+            [r["positioning"] for r in episodes],
+            [r["win_rate"] for r in episodes],
+            out=out,
+        )
+        return
+
+    import numpy as np
+    from training.pygad_train import plot_results
+
+    trials = {}
+    for r in records:
+        if "generation" in r:
+            stats = trials.setdefault(
+                r["trial"], {"generation_stats": {"generation": [], "best_fitness": []}}
+            )
+            stats["generation_stats"]["generation"].append(r["generation"])
+            stats["generation_stats"]["best_fitness"].append(r["best_fitness"])
+    ended = {r["trial"]: r for r in records if r.get("event") == "trial_end"}
+    all_trial_stats = []
+    generations_needed = []
+    successful = []
+    for trial in sorted(trials):
+        stats = trials[trial]
+        end = ended.get(trial, {})
+        stats["evaluation_results"] = [
+            {
+                "final_score": end.get("eval_score", np.nan),
+                "positioning_reward": end.get("eval_positioning", np.nan),
+            }
+        ]
+        all_trial_stats.append(stats)
+        generations_needed.append(
+            end.get("generations", stats["generation_stats"]["generation"][-1])
+        )
+        successful.append(end.get("successful", False))
+    plot_results(
+        all_trial_stats, np.array(generations_needed), np.array(successful), out=out
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Plot a training log")
+    parser.add_argument("command", choices=["plot"])
+    parser.add_argument("log")
+    parser.add_argument("--out", help="save the figure instead of showing it")
+    args = parser.parse_args()
+    plot(args.log, args.out)